@@ -1,3 +1,4 @@
+import argparse
 import asyncio
 import logging
 import signal
@@ -55,5 +56,45 @@ async def run_mcp_server(**kwargs):
         logger.info("Shutdown complete")
 
 
+async def run_crawl_worker(concurrency: int = None):
+    """Run queued crawl jobs: the crawler pool and the job queue, without the HTTP server."""
+    from component.crawl4ai import worker_farm
+    from component.crawl4ai.crawler_pool import close_all, janitor, prewarm_pool, CRAWL_RULES
+    from component.crawl4ai.job_queue import CrawlJobWorker
+
+    init_crawler_pool(app)
+    app_context.set(app)
+    if app.config.CRAWLER_WORKER_PROCESSES > 0:
+        worker_farm.start(app.config.CRAWLER_WORKER_PROCESSES, [group.model_dump() for group in CRAWL_RULES])
+    else:
+        await prewarm_pool(app.config.CRAWLER_PREWARM)
+    janitor_task = asyncio.create_task(janitor())
+    worker = CrawlJobWorker(concurrency)
+
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        try:
+            # stop taking jobs, finish the running ones
+            loop.add_signal_handler(signum, worker.stop)
+        except (NotImplementedError, RuntimeError):
+            pass
+
+    try:
+        await worker.run()
+    finally:
+        logger.info("Cleaning up resources...")
+        janitor_task.cancel()
+        await worker_farm.stop()
+        await close_all()
+        logger.info("Shutdown complete")
+
+
 if __name__ == '__main__':
-    asyncio.run(run_mcp_server())
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--worker", action="store_true", help="run queued crawl jobs instead of the server")
+    parser.add_argument("--concurrency", type=int, default=None, help="crawl jobs a worker runs at a time")
+    args = parser.parse_args()
+    if args.worker:
+        asyncio.run(run_crawl_worker(args.concurrency))
+    else:
+        asyncio.run(run_mcp_server())
@@ -80,18 +80,31 @@ def init_apps(app: AduibAIApp):
     init_cache(app)
     log.info("middlewares initialized successfully")
 
-def init_crawler_pool(app: AduibAIApp):
-    MAX_PAGES = config.CRAWLER_MAX_PAGES
-    GLOBAL_SEM = asyncio.Semaphore(MAX_PAGES)
+def init_crawler_runtime():
+    """Patch crawl4ai so every page crawl in this process goes through the shared scheduler."""
     from crawl4ai import AsyncWebCrawler
+    from component.crawl4ai.crawl_scheduler import get_scheduler
+    from component.crawl4ai.crawler_pool import get_page_pool
+    from component.crawl4ai.page_pool import lease_page
+    from component.crawl4ai.page_report import collect_page_report, attach_page_report
+    scheduler = get_scheduler()
     orig_arun = AsyncWebCrawler.arun
 
-    async def capped_arun(self, *a, **kw):
-        async with GLOBAL_SEM:
-            return await orig_arun(self, *a, **kw)
+    async def capped_arun(self, url, config=None, **kw):
+        async with scheduler.slot(url) as ticket:
+            async with lease_page(get_page_pool(self), url, config) as leased_config:
+                with collect_page_report() as report:
+                    result = await orig_arun(self, url, config=leased_config, **kw)
+                ticket.status_code = getattr(result, "status_code", None)
+                attach_page_report(result, report)
+                return result
 
     AsyncWebCrawler.arun = capped_arun
 
+
+def init_crawler_pool(app: AduibAIApp):
+    init_crawler_runtime()
+
     # ── static playground ──────────────────────────────────────
     STATIC_DIR = pathlib.Path(__file__).parent / "static" / "playground"
     if not STATIC_DIR.exists():
@@ -150,10 +163,13 @@ async def lifespan(app: AduibAIApp) -> AsyncIterator[None]:
     asyncio.create_task(run_service_register(app))
     # --- 初始化 ---
     # 预热 crawler
-    from component.crawl4ai.crawler_pool import get_crawler, janitor, close_all
-    from crawl4ai import BrowserConfig
-    from configs.crawl4ai.crawl_rule import browser_config
-    await get_crawler(BrowserConfig.load(browser_config))
+    from component.crawl4ai.crawler_pool import prewarm_pool, janitor, close_all, CRAWL_RULES
+    from component.crawl4ai import worker_farm
+    if config.CRAWLER_WORKER_PROCESSES > 0:
+        # browsers live in the worker processes, each worker pre-warms its own
+        worker_farm.start(config.CRAWLER_WORKER_PROCESSES, [group.model_dump() for group in CRAWL_RULES])
+    else:
+        await prewarm_pool(config.CRAWLER_PREWARM)
 
     # 开启 janitor 清理闲置浏览器
     janitor_task = asyncio.create_task(janitor())
@@ -203,4 +219,5 @@ async def lifespan(app: AduibAIApp) -> AsyncIterator[None]:
     # --- 清理 ---
     if hasattr(app.state, 'janitor') and app.state.janitor:
         app.state.janitor.cancel()
+    await worker_farm.stop()
     await close_all()
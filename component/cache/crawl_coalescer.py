@@ -0,0 +1,165 @@
+"""Single-flight coalescing of identical crawls.
+
+Pages are identified by their result cache key. The first request to need a
+page leads its crawl; requests in this process that need the same page while
+it is in flight wait on the leader's future instead of navigating again. Across
+nodes the leader holds a short Redis lease on the key: a node that finds the
+lease taken waits for the result to appear in the shared result cache, and
+crawls the page itself only if the lease goes away without one.
+"""
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+
+from component.cache.crawl_result_cache import RESULT_CACHE
+from component.cache.redis_cache import async_redis_client, redis_fallback
+from configs import config
+
+logger = logging.getLogger(__name__)
+
+LEASE_PREFIX = "crawl_lease:"
+POLL_INTERVAL_SEC = 0.2
+NODE_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+# deletes the lease only while this node still holds it
+_RELEASE_LUA = """if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) else return 0 end"""
+
+COALESCE_STATS = {"led": 0, "local_followers": 0, "remote_followers": 0, "remote_timeouts": 0}
+
+
+@redis_fallback(default_return=True)
+async def _acquire_lease(key: str) -> bool:
+    if not config.REDIS_ENABLED:
+        return True
+    return bool(await async_redis_client.set(LEASE_PREFIX + key, NODE_ID, nx=True,
+                                             px=int(config.CRAWL_COALESCE_LEASE_SEC * 1000)))
+
+
+@redis_fallback(default_return=False)
+async def _lease_held(key: str) -> bool:
+    return bool(await async_redis_client.exists(LEASE_PREFIX + key))
+
+
+@redis_fallback()
+async def _release_lease(key: str):
+    await async_redis_client.eval(_RELEASE_LUA, 1, LEASE_PREFIX + key, NODE_ID)
+
+
+class Flight:
+    """The pages of one request, split into the ones it crawls and the ones it waits for."""
+
+    def __init__(self, coalescer: "CrawlCoalescer", keys_by_url: dict[str, str], cache_ttl: int):
+        self.coalescer = coalescer
+        self.keys_by_url = keys_by_url
+        self.led: dict[str, str] = {}  # url -> key crawled by this request
+        self.remote: dict[str, str] = {}  # url -> key led here but crawled by another node
+        self.followed: dict[str, asyncio.Future] = {}  # url -> future of the local leader
+        self.futures: dict[str, asyncio.Future] = {}  # key -> future this request leads
+        self.leases: list[str] = []
+        self.cache_ttl = cache_ttl
+        # registered before any await, so requests joining meanwhile follow these pages
+        for url, key in keys_by_url.items():
+            future = coalescer.inflight.get(key)
+            if future is not None:
+                self.followed[url] = future
+                COALESCE_STATS["local_followers"] += 1
+                continue
+            future = coalescer.inflight[key] = asyncio.get_running_loop().create_future()
+            self.futures[key] = future
+
+    async def lead(self):
+        """Take the lease of every page this process leads; the pages leased by other nodes are waited for."""
+        pages = [(url, key) for url, key in self.keys_by_url.items() if key in self.futures]
+        # a lease only helps other nodes when they can read the result from the shared cache
+        if self.cache_ttl:
+            acquired = await asyncio.gather(*(_acquire_lease(key) for _, key in pages))
+        else:
+            acquired = [True] * len(pages)
+        for (url, key), leased in zip(pages, acquired):
+            if leased:
+                self.led[url] = key
+                if self.cache_ttl and config.REDIS_ENABLED:
+                    self.leases.append(key)
+                COALESCE_STATS["led"] += 1
+            else:
+                self.remote[url] = key
+                COALESCE_STATS["remote_followers"] += 1
+
+    @property
+    def crawl_urls(self) -> list[str]:
+        return list(self.led)
+
+    def publish(self, url: str, result: dict | None):
+        """Hand the result of a led page to the requests waiting for it; None makes them crawl it."""
+        self._resolve(self.keys_by_url[url], result)
+
+    def _resolve(self, key: str, result: dict | None):
+        future = self.futures.pop(key, None)
+        if future is None:
+            return
+        if self.coalescer.inflight.get(key) is future:
+            del self.coalescer.inflight[key]
+        if not future.done():
+            future.set_result(result)
+
+    async def wait(self) -> dict[str, dict | None]:
+        """Results of the pages crawled by other requests; None for the ones that failed."""
+        shared: dict[str, dict | None] = {}
+        for url, future in self.followed.items():
+            shared[url] = _mark(await asyncio.shield(future), "local")
+        remote = await asyncio.gather(*(self.coalescer.wait_remote(key) for key in self.remote.values()))
+        for (url, key), result in zip(self.remote.items(), remote):
+            self._resolve(key, result)
+            shared[url] = _mark(result, "remote")
+        return shared
+
+    async def close(self):
+        """Release the leases and unblock followers of pages that were never published."""
+        for key in list(self.futures):
+            self._resolve(key, None)
+        await asyncio.gather(*(_release_lease(key) for key in self.leases))
+
+
+class CrawlCoalescer:
+
+    def __init__(self):
+        self.inflight: dict[str, asyncio.Future] = {}  # key -> result of the crawl leading it in this process
+
+    async def join(self, keys_by_url: dict[str, str], cache_ttl: int) -> Flight:
+        flight = Flight(self, keys_by_url, cache_ttl)
+        try:
+            await flight.lead()
+        except BaseException:
+            await flight.close()
+            raise
+        return flight
+
+    async def wait_remote(self, key: str) -> dict | None:
+        """Wait for another node's crawl of ``key`` to land in the shared result cache."""
+        deadline = time.monotonic() + config.CRAWL_COALESCE_LEASE_SEC
+        while time.monotonic() < deadline:
+            await asyncio.sleep(POLL_INTERVAL_SEC)
+            result = await RESULT_CACHE.peek(key)
+            if result is not None:
+                return result
+            if not await _lease_held(key):
+                return await RESULT_CACHE.peek(key)  # the leader failed, or finished between the two reads
+        COALESCE_STATS["remote_timeouts"] += 1
+        return None
+
+    def stats(self) -> dict:
+        return {**COALESCE_STATS, "in_flight": len(self.inflight)}
+
+
+def _mark(result: dict | None, leader: str) -> dict | None:
+    if result is None:
+        return None
+    metadata = result.get("metadata") or {}
+    report = {**(metadata.get("crawl_report") or {}), "coalesced": {"leader": leader}}
+    return {**result, "metadata": {**metadata, "crawl_report": report}}
+
+
+COALESCER = CrawlCoalescer()
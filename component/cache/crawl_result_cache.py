@@ -0,0 +1,353 @@
+"""Crawl result cache.
+
+Processed crawl results are cached under a content-addressed key: the digest of
+the normalized URL, the matched rule and every browser and crawler config
+option that can change what is extracted. Lookups go to an in-process LRU bounded in bytes
+first, then to the Redis tier shared by every process; results found in Redis
+are promoted into the local LRU for the rest of their TTL.
+
+Expired results are not simply dropped: their ETag, Last-Modified and body
+digest are replayed in a conditional request, and the page is only crawled
+again when the origin reports a changed entity.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import aiohttp
+from crawl4ai import BrowserConfig, CrawlerRunConfig
+
+from component.cache.redis_cache import async_redis_client, redis_fallback
+from configs import config
+from configs.crawl4ai.types import CrawlRule, CrawlMode
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "crawl_result:"
+NOT_MODIFIED = "not_modified"  # the origin answered 304
+UNCHANGED = "unchanged"  # the origin answered 200 with the same entity
+CHANGED = "changed"
+FAILED = "failed"
+MAX_ITEM_SHARE = 4  # results larger than 1/4 of the local budget are only cached in Redis
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+# run config options that decide how a page is scheduled, cached or logged, not what it yields;
+# every other option is part of the cache key, options crawl4ai adds later included
+_UNKEYED_RUN_OPTIONS = frozenset({
+    "cache_mode", "bypass_cache", "disable_cache", "no_cache_read", "no_cache_write", "session_id",
+    "shared_data", "semaphore_count", "mean_delay", "max_range", "page_timeout", "stream", "verbose",
+    "log_console", "url", "url_matcher", "match_mode", "deep_crawl_strategy",
+})
+# browser config options that decide where the browser runs and how it is reached, not what pages yield
+_UNKEYED_BROWSER_OPTIONS = frozenset({
+    "verbose", "debugging_port", "host", "cdp_url", "user_data_dir", "chrome_channel", "channel",
+    "sleep_on_close", "accept_downloads", "downloads_path",
+})
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form of ``url``: lower-case scheme and host, no default port, sorted query, no fragment."""
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, parts.path or "/", query, ""))
+
+
+def result_cache_key(url: str, crawl_rule: CrawlRule, browser_config: BrowserConfig,
+                     crawler_config: CrawlerRunConfig, query: list[str] | str = None) -> str:
+    """Cache key of the processed result of crawling ``url`` under ``crawl_rule``."""
+    fingerprint = {
+        "url": normalize_url(url),
+        "rule": crawl_rule.model_dump(mode="json"),
+        "browser_config": browser_config_fingerprint(browser_config),
+        "run_config": run_config_fingerprint(crawler_config),
+        "query": query if crawl_rule.extraction_strategy else None,
+    }
+    digest = hashlib.sha256(json.dumps(fingerprint, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def run_config_fingerprint(crawler_config: CrawlerRunConfig) -> dict:
+    """The options of ``crawler_config`` that change its results: js_code, wait_for, the markdown
+    generator and its content filter, ... As dumped by crawl4ai, which leaves out default values."""
+    options = crawler_config.dump().get("params", {})
+    return {name: value for name, value in options.items() if name not in _UNKEYED_RUN_OPTIONS}
+
+
+def browser_config_fingerprint(browser_config: BrowserConfig) -> dict:
+    """The options of ``browser_config`` that change its pages: user agent, proxy, headers, text
+    mode, viewport, ... and the browser_mode/use_persistent_context the browser pool keys browsers by."""
+    options = browser_config.dump().get("params", {})
+    fingerprint = {name: value for name, value in options.items()
+                   if name not in _UNKEYED_BROWSER_OPTIONS and name != "headers"}
+    if browser_config.user_agent_mode == "random":
+        fingerprint.pop("user_agent", None)  # drawn anew for every loaded config
+    # sec-ch-ua is derived from the user agent
+    headers = {name: value for name, value in (browser_config.headers or {}).items() if name.lower() != "sec-ch-ua"}
+    if headers:
+        fingerprint["headers"] = headers
+    return fingerprint
+
+
+def result_shareable(crawl_rule: CrawlRule | None, crawler_config: CrawlerRunConfig) -> bool:
+    """Whether each page of this crawl yields one result that other requests can reuse."""
+    if crawl_rule is None or crawl_rule.crawl_mode != CrawlMode.CLASSIC:
+        return False
+    return not (crawl_rule.deep_crawl or crawler_config.stream)
+
+
+def result_cache_ttl(crawl_rule: CrawlRule | None, crawler_config: CrawlerRunConfig) -> int:
+    """Seconds results of this crawl stay cached; 0 when they are not cacheable."""
+    if not config.CRAWL_RESULT_CACHE_ENABLED or not result_shareable(crawl_rule, crawler_config):
+        return 0
+    if crawl_rule.cache_ttl_sec is not None:
+        return max(0, crawl_rule.cache_ttl_sec)
+    return config.CRAWL_RESULT_CACHE_TTL_SEC
+
+
+def crawl_validators(result, fetched_over_http: bool) -> dict:
+    """Validators of a crawled page: its ETag and Last-Modified, and the digest of the
+    response body when the page was fetched over plain HTTP."""
+    headers = {name.lower(): value for name, value in (getattr(result, "response_headers", None) or {}).items()}
+    validators = {"etag": headers.get("etag"), "last_modified": headers.get("last-modified")}
+    if fetched_over_http and result.html:
+        validators["body_sha256"] = hashlib.sha256(result.html.encode("utf-8")).hexdigest()
+    return {name: value for name, value in validators.items() if value}
+
+
+_SESSION: aiohttp.ClientSession | None = None
+
+
+def _revalidation_session() -> aiohttp.ClientSession:
+    global _SESSION
+    if _SESSION is None or _SESSION.closed:
+        _SESSION = aiohttp.ClientSession(
+            headers={"User-Agent": config.DEFAULT_USER_AGENT},
+            timeout=aiohttp.ClientTimeout(total=config.CRAWL_RESULT_REVALIDATE_TIMEOUT_SEC),
+        )
+    return _SESSION
+
+
+async def close_revalidation_session():
+    global _SESSION
+    if _SESSION is not None:
+        await _SESSION.close()
+        _SESSION = None
+
+
+async def revalidate(url: str, validators: dict) -> tuple[str, dict]:
+    """Ask the origin whether ``url`` changed since ``validators`` were taken.
+
+    Returns the outcome and the validators of the current response.
+    """
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    try:
+        async with _revalidation_session().get(url, headers=headers) as response:
+            current = {name: value for name, value in (("etag", response.headers.get("ETag")),
+                                                       ("last_modified", response.headers.get("Last-Modified")))
+                       if value}
+            if response.status == 304:
+                return NOT_MODIFIED, current
+            if response.status != 200:
+                return CHANGED, {}
+            body = await response.read()
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+        logger.debug(f"Revalidation of {url} failed: {e}")
+        return FAILED, {}
+    current["body_sha256"] = hashlib.sha256(
+        body.decode(response.charset or "utf-8", errors="replace").encode("utf-8")).hexdigest()
+    # origins that ignore conditional requests still answer with the same entity
+    if current.get("etag") and current["etag"] == validators.get("etag"):
+        return UNCHANGED, current
+    if current["body_sha256"] == validators.get("body_sha256"):
+        return UNCHANGED, current
+    return CHANGED, current
+
+
+@dataclass
+class CachedResult:
+    result: dict
+    validators: dict
+    expires_at: float
+    tier: str
+    size: int
+
+    @property
+    def fresh(self) -> bool:
+        return self.expires_at > time.time()
+
+
+class CrawlResultCache:
+    """Two-tier cache of processed crawl results, stored as JSON bytes.
+
+    Results stay fresh for their TTL; results with validators are kept
+    ``CRAWL_RESULT_CACHE_STALE_SEC`` longer so that they can be revalidated
+    with the origin instead of crawled again.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()  # key -> (drop_at, payload)
+        self.size = 0
+        self.counters = {"local_hits": 0, "redis_hits": 0, "stale": 0, "misses": 0, "stores": 0, "evictions": 0,
+                         "bytes_served": 0}
+        self.revalidations = {NOT_MODIFIED: 0, UNCHANGED: 0, CHANGED: 0, FAILED: 0}
+
+    async def get_many(self, keys: list[str]) -> dict[str, CachedResult]:
+        """Cached results of ``keys``, fresh or stale; keys that are not cached are left out."""
+        found: dict[str, CachedResult] = {}
+        remote = []
+        now = time.time()
+        for key in keys:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] > now:
+                self.entries.move_to_end(key)
+                found[key] = self._load(entry[1], "local")
+            else:
+                if entry is not None:
+                    self._drop(key)
+                remote.append(key)
+        if remote:
+            for key, payload in (await self._redis_get(remote)).items():
+                cached = self._load(payload, "redis")
+                self._store_local(key, payload, self._drop_at(cached.expires_at, cached.validators))
+                found[key] = cached
+        for cached in found.values():
+            self.counters[f"{cached.tier}_hits" if cached.fresh else "stale"] += 1
+        self.counters["misses"] += len(keys) - len(found)
+        return found
+
+    async def lookup(self, keys_by_url: dict[str, str], ttl: int) -> tuple[dict[str, dict], dict[str, dict]]:
+        """Results that can be served for ``keys_by_url`` without crawling.
+
+        Stale results are revalidated with their origin first. Returns the
+        results by key and, for pages that have to be crawled again, the
+        validators their revalidation returned.
+        """
+        entries = await self.get_many(list(dict.fromkeys(keys_by_url.values())))
+        served = {key: self._serve(cached) for key, cached in entries.items() if cached.fresh}
+        stale = {key: (url, entries[key]) for url, key in keys_by_url.items()
+                 if key in entries and not entries[key].fresh}
+        outcomes = await asyncio.gather(*(revalidate(url, cached.validators) for url, cached in stale.values()))
+        changed, writes = {}, []
+        for (key, (url, cached)), (outcome, validators) in zip(stale.items(), outcomes):
+            self.revalidations[outcome] += 1
+            if outcome in (NOT_MODIFIED, UNCHANGED):
+                writes.append(self.store(key, cached.result, ttl, {**cached.validators, **validators}))
+                served[key] = self._serve(cached, outcome)
+            else:
+                changed[key] = validators
+        await self.write(writes)
+        return served, changed
+
+    async def peek(self, key: str) -> dict | None:
+        """Fresh result of ``key`` from either tier, without counting a lookup."""
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] > time.time():
+            cached = self._load(entry[1], "local")
+        else:
+            payload = (await self._redis_get([key])).get(key)
+            if payload is None:
+                return None
+            cached = self._load(payload, "redis")
+        return self._serve(cached) if cached.fresh else None
+
+    async def put(self, key: str, result: dict, ttl: int, validators: dict = None):
+        await self.write([self.store(key, result, ttl, validators)])
+
+    def store(self, key: str, result: dict, ttl: int, validators: dict = None) -> tuple[str, bytes, int]:
+        """Cache ``result`` in the local tier; returns its Redis write, to be sent by ``write``.
+
+        The writes of one request are sent together, in one round trip.
+        """
+        validators = validators or {}
+        expires_at = time.time() + ttl
+        payload = json.dumps({"expires_at": expires_at, "validators": validators, "result": result},
+                             default=str).encode("utf-8")
+        drop_at = self._drop_at(expires_at, validators)
+        self._store_local(key, payload, drop_at)
+        self.counters["stores"] += 1
+        return key, payload, max(1, int(drop_at - time.time()))
+
+    async def write(self, writes: list[tuple[str, bytes, int]]):
+        """Send the Redis writes returned by ``store`` in one pipeline."""
+        if writes:
+            await self._redis_set(writes)
+
+    @staticmethod
+    def _drop_at(expires_at: float, validators: dict) -> float:
+        return expires_at + (config.CRAWL_RESULT_CACHE_STALE_SEC if validators else 0)
+
+    def _load(self, payload: bytes, tier: str) -> CachedResult:
+        envelope = json.loads(payload)
+        return CachedResult(envelope["result"], envelope["validators"], envelope["expires_at"], tier, len(payload))
+
+    def _serve(self, cached: CachedResult, revalidated: str = None) -> dict:
+        result = cached.result
+        self.counters["bytes_served"] += cached.size
+        metadata = result.get("metadata") or {}
+        report = {**(metadata.get("crawl_report") or {}), "cache": {"hit": cached.tier}}
+        if revalidated:
+            report["cache"]["revalidated"] = revalidated
+        return {**result, "metadata": {**metadata, "crawl_report": report}}
+
+    def _store_local(self, key: str, payload: bytes, drop_at: float):
+        if len(payload) > self.max_bytes // MAX_ITEM_SHARE:
+            return
+        self._drop(key)
+        self.entries[key] = (drop_at, payload)
+        self.size += len(payload)
+        while self.size > self.max_bytes:
+            evicted, (_, evicted_payload) = self.entries.popitem(last=False)
+            self.size -= len(evicted_payload)
+            self.counters["evictions"] += 1
+
+    def _drop(self, key: str):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry[1])
+
+    @staticmethod
+    @redis_fallback(default_return={})
+    async def _redis_get(keys: list[str]) -> dict[str, bytes]:
+        if not config.REDIS_ENABLED:
+            return {}
+        payloads = await async_redis_client.mget([KEY_PREFIX + key for key in keys])
+        return {key: payload for key, payload in zip(keys, payloads) if payload is not None}
+
+    @staticmethod
+    @redis_fallback()
+    async def _redis_set(writes: list[tuple[str, bytes, int]]):
+        if not config.REDIS_ENABLED:
+            return
+        async with async_redis_client.pipeline(transaction=False) as pipe:
+            for key, payload, ex in writes:
+                pipe.set(KEY_PREFIX + key, payload, ex=ex)
+            await pipe.execute()
+
+    def stats(self) -> dict:
+        hits = (self.counters["local_hits"] + self.counters["redis_hits"]
+                + self.revalidations[NOT_MODIFIED] + self.revalidations[UNCHANGED])
+        lookups = (self.counters["local_hits"] + self.counters["redis_hits"] + self.counters["stale"]
+                   + self.counters["misses"])
+        return {
+            **self.counters,
+            "revalidations": dict(self.revalidations),
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "local_entries": len(self.entries),
+            "local_bytes": self.size,
+        }
+
+
+RESULT_CACHE = CrawlResultCache(config.CRAWL_RESULT_CACHE_MAX_BYTES)
@@ -1,10 +1,14 @@
 import functools
+import inspect
 import logging
 from collections.abc import Callable
 from typing import Any
 
 import redis
+import redis.asyncio
 from redis import RedisError
+from redis.asyncio.cluster import ClusterNode as AsyncClusterNode, RedisCluster as AsyncRedisCluster
+from redis.asyncio.sentinel import Sentinel as AsyncSentinel
 from redis.cache import CacheConfig
 from redis.cluster import ClusterNode, RedisCluster
 from redis.connection import Connection
@@ -50,6 +54,8 @@ class RedisClientWrapper:
 
 
 redis_client = RedisClientWrapper()
+# the same deployment through redis.asyncio, for code running on the event loop
+async_redis_client = RedisClientWrapper()
 
 
 def init_cache(app: AduibAIApp):
@@ -57,7 +63,7 @@ def init_cache(app: AduibAIApp):
     if not config.REDIS_ENABLED:
         logger.info("Redis is not enabled, skipping initialization")
         return
-    global redis_client
+    global redis_client, async_redis_client
     connection_class: type[Connection] = Connection
     resp_protocol = config.REDIS_SERIALIZATION_PROTOCOL
     if config.REDIS_ENABLE_CLIENT_SIDE_CACHE:
@@ -79,27 +85,30 @@ def init_cache(app: AduibAIApp):
         "cache_config": clientside_cache_config,
     }
 
+    # redis.asyncio has no client side cache, its clients share everything else
+    async_redis_params = {k: v for k, v in redis_params.items() if k != "cache_config"}
+
     if config.REDIS_USE_SENTINEL:
         assert config.REDIS_SENTINELS is not None, "REDIS_SENTINELS must be set when REDIS_USE_SENTINEL is True"
         sentinel_hosts = [
             (node.split(":")[0], int(node.split(":")[1])) for node in config.REDIS_SENTINELS.split(",")
         ]
-        sentinel = Sentinel(
-            sentinel_hosts,
-            sentinel_kwargs={
-                "socket_timeout": config.REDIS_SENTINEL_SOCKET_TIMEOUT,
-                "username": config.REDIS_SENTINEL_USERNAME,
-                "password": config.REDIS_SENTINEL_PASSWORD,
-            },
-        )
+        sentinel_kwargs = {
+            "socket_timeout": config.REDIS_SENTINEL_SOCKET_TIMEOUT,
+            "username": config.REDIS_SENTINEL_USERNAME,
+            "password": config.REDIS_SENTINEL_PASSWORD,
+        }
+        sentinel = Sentinel(sentinel_hosts, sentinel_kwargs=sentinel_kwargs)
         master = sentinel.master_for(config.REDIS_SENTINEL_SERVICE_NAME, **redis_params)
         redis_client.initialize(master)
+        async_sentinel = AsyncSentinel(sentinel_hosts, sentinel_kwargs=sentinel_kwargs)
+        async_redis_client.initialize(
+            async_sentinel.master_for(config.REDIS_SENTINEL_SERVICE_NAME, **async_redis_params)
+        )
     elif config.REDIS_USE_CLUSTERS:
         assert config.REDIS_CLUSTERS is not None, "REDIS_CLUSTERS must be set when REDIS_USE_CLUSTERS is True"
-        nodes = [
-            ClusterNode(host=node.split(":")[0], port=int(node.split(":")[1]))
-            for node in config.REDIS_CLUSTERS.split(",")
-        ]
+        cluster_hosts = [(node.split(":")[0], int(node.split(":")[1])) for node in config.REDIS_CLUSTERS.split(",")]
+        nodes = [ClusterNode(host=host, port=port) for host, port in cluster_hosts]
         redis_client.initialize(
             RedisCluster(
                 startup_nodes=nodes,
@@ -108,7 +117,16 @@ def init_cache(app: AduibAIApp):
                 cache_config=clientside_cache_config,
             )
         )
+        async_redis_client.initialize(
+            AsyncRedisCluster(
+                startup_nodes=[AsyncClusterNode(host=host, port=port) for host, port in cluster_hosts],
+                password=config.REDIS_CLUSTERS_PASSWORD,
+                protocol=resp_protocol,
+            )
+        )
     else:
+        async_redis_client.initialize(redis.asyncio.Redis(connection_pool=redis.asyncio.ConnectionPool(
+            host=config.REDIS_HOST, port=config.REDIS_PORT, **async_redis_params)))
         redis_params.update(
             {
                 "host": config.REDIS_HOST,
@@ -122,6 +140,7 @@ def init_cache(app: AduibAIApp):
         redis_client.initialize(redis.Redis(connection_pool=pool))
 
     app.extensions["cache"] = redis_client
+    app.extensions["async_cache"] = async_redis_client
     logger.info("Redis initialized successfully")
 
 
@@ -135,6 +154,17 @@ def redis_fallback(default_return: Any = None):
     """
 
     def decorator(func: Callable):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                try:
+                    return await func(*args, **kwargs)
+                except RedisError as e:
+                    logger.warning("Redis operation failed in %s: %s", func.__name__, str(e), exc_info=True)
+                    return default_return
+
+            return async_wrapper
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
             try:
@@ -0,0 +1,102 @@
+import logging
+import os
+
+import psutil
+from crawl4ai import AsyncWebCrawler
+
+logger = logging.getLogger(__name__)
+
+BROWSER_PROCESS_NAMES = ("chrome", "chromium", "headless_shell")
+FOOTPRINT_EWMA_ALPHA = 0.3
+DEFAULT_FOOTPRINT_BYTES = 400 * 1024 * 1024
+
+
+def _tree_rss(root: psutil.Process) -> tuple[int, set[int]]:
+    """RSS of a process and all of its children, plus the pids counted."""
+    total, pids = 0, set()
+    try:
+        processes = [root] + root.children(recursive=True)
+    except psutil.Error:
+        return 0, pids
+    for proc in processes:
+        try:
+            total += proc.memory_info().rss
+            pids.add(proc.pid)
+        except psutil.Error:
+            continue
+    return total, pids
+
+
+def browser_pid(crawler: AsyncWebCrawler) -> int | None:
+    """Pid of the Chromium launched for a managed-browser crawler, if known."""
+    manager = getattr(getattr(crawler, "crawler_strategy", None), "browser_manager", None)
+    managed = getattr(manager, "managed_browser", None)
+    process = getattr(managed, "browser_process", None)
+    return getattr(process, "pid", None)
+
+
+def _unattributed_browser_rss(exclude: set[int]) -> int:
+    """RSS of Chromium processes under this process that no managed browser owns.
+
+    Playwright-launched browsers are children of the driver process and do not
+    expose their pid, so their memory is only known in aggregate.
+    """
+    total = 0
+    try:
+        descendants = psutil.Process(os.getpid()).children(recursive=True)
+    except psutil.Error:
+        return 0
+    for proc in descendants:
+        if proc.pid in exclude:
+            continue
+        try:
+            if any(name in proc.name().lower() for name in BROWSER_PROCESS_NAMES):
+                total += proc.memory_info().rss
+        except psutil.Error:
+            continue
+    return total
+
+
+def measure_browsers(crawlers: dict[str, AsyncWebCrawler]) -> dict[str, int]:
+    """RSS in bytes of each crawler's browser process tree, keyed by signature."""
+    usage: dict[str, int] = {}
+    counted: set[int] = set()
+    unknown = []
+    for sig, crawler in crawlers.items():
+        pid = browser_pid(crawler)
+        if pid is None:
+            unknown.append(sig)
+            continue
+        try:
+            rss, pids = _tree_rss(psutil.Process(pid))
+        except psutil.Error:
+            unknown.append(sig)
+            continue
+        usage[sig] = rss
+        counted |= pids
+    if unknown:
+        shared = _unattributed_browser_rss(counted) // len(unknown)
+        for sig in unknown:
+            usage[sig] = shared
+    return usage
+
+
+class FootprintHistory:
+    """Exponentially weighted browser footprint per signature, used for admission."""
+
+    def __init__(self):
+        self.footprints: dict[str, float] = {}
+
+    def observe(self, sig: str, rss: int):
+        if rss <= 0:
+            return
+        previous = self.footprints.get(sig)
+        self.footprints[sig] = rss if previous is None else (
+                FOOTPRINT_EWMA_ALPHA * rss + (1 - FOOTPRINT_EWMA_ALPHA) * previous)
+
+    def predict(self, sig: str) -> float:
+        if sig in self.footprints:
+            return self.footprints[sig]
+        if self.footprints:
+            return max(self.footprints.values())
+        return DEFAULT_FOOTPRINT_BYTES
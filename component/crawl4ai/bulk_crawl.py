@@ -0,0 +1,61 @@
+"""Planning of bulk crawls.
+
+A bulk crawl takes thousands of urls at once, typically pushed by an indexing
+pipeline. Its urls are normalized and deduplicated, grouped by host and matched
+crawl rule, and cut into batches of a single group, so every batch is crawled
+under the rule of its own urls. Batches are interleaved across the groups: a
+host holding most of the urls does not hold back the others, and the shared
+scheduler keeps every host within its per-domain limits while they run.
+"""
+from dataclasses import dataclass, field
+from itertools import zip_longest
+from urllib.parse import urlsplit
+
+from component.cache.crawl_result_cache import normalize_url
+from component.crawl4ai.crawler_pool import get_rule_by_url
+
+
+@dataclass
+class BulkCrawlPlan:
+    groups: dict[tuple[str, str], list[str]] = field(default_factory=dict)  # (host, rule name) -> urls
+    duplicates: int = 0  # urls dropped as equal to an earlier one once normalized
+    invalid: list[str] = field(default_factory=list)  # urls without a host, not crawled
+
+    @property
+    def urls(self) -> list[str]:
+        return [url for urls in self.groups.values() for url in urls]
+
+    def batches(self, size: int) -> list[list[str]]:
+        """Batches of at most ``size`` urls of one group, taking turns between the groups."""
+        size = max(1, size)
+        per_group = [[urls[i:i + size] for i in range(0, len(urls), size)] for urls in self.groups.values()]
+        return [batch for turn in zip_longest(*per_group) for batch in turn if batch]
+
+    def summary(self) -> dict:
+        return {"urls": sum(len(urls) for urls in self.groups.values()), "groups": len(self.groups),
+                "duplicates": self.duplicates, "invalid": len(self.invalid)}
+
+
+def plan_bulk_crawl(urls: list[str]) -> BulkCrawlPlan:
+    """Deduplicate ``urls`` and group them by host and matched rule, keeping their order within a group."""
+    plan = BulkCrawlPlan()
+    seen = set()
+    for url in urls:
+        url = url.strip()
+        if not url.startswith(('http://', 'https://')):
+            url = 'https://' + url
+        try:
+            host = (urlsplit(url).hostname or "").lower()
+            key = normalize_url(url)
+        except ValueError:  # e.g. a port out of range
+            host = ""
+        if not host:
+            plan.invalid.append(url)
+            continue
+        if key in seen:
+            plan.duplicates += 1
+            continue
+        seen.add(key)
+        rule = get_rule_by_url(url)
+        plan.groups.setdefault((host, rule.name if rule else ""), []).append(url)
+    return plan
@@ -0,0 +1,323 @@
+"""Process-wide crawl scheduler.
+
+Every page crawl of this process (``arun`` directly, through ``arun_many`` or
+through a deep-crawl strategy) acquires a slot from the single ``CrawlScheduler``
+before touching a browser. The scheduler enforces the global page limit
+(``CRAWLER_MAX_PAGES``), a per-domain concurrency limit (``SEMAPHORE_COUNT``) and
+per-domain politeness delays with crawl4ai's ``RateLimiter`` backoff, across all
+requests instead of within one.
+
+Waiters are ordered by priority class, then earliest deadline, then arrival. The
+class and deadline come from the ``CRAWL_PRIORITY`` context variable, which the
+service sets per request so every page of that request inherits it.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import random
+import statistics
+import time
+import uuid
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from typing import AsyncIterator
+from urllib.parse import urlparse
+
+from crawl4ai import RateLimiter, CrawlerRunConfig, AsyncWebCrawler
+from crawl4ai.async_dispatcher import BaseDispatcher
+from crawl4ai.models import DomainState, CrawlerTaskResult, CrawlResult
+
+from configs import config
+from configs.crawl4ai.types import CrawlPriority
+
+logger = logging.getLogger(__name__)
+
+WAIT_SAMPLES = 1024
+PRIORITY_RANK = {CrawlPriority.INTERACTIVE: 0, CrawlPriority.NORMAL: 1, CrawlPriority.BACKGROUND: 2}
+
+# (priority class, absolute deadline) of the crawls started from this context
+CRAWL_PRIORITY: ContextVar[tuple[CrawlPriority, float | None]] = ContextVar(
+    "crawl_priority", default=(CrawlPriority.NORMAL, None)
+)
+
+
+def set_crawl_priority(priority: CrawlPriority | str | None = None, deadline_sec: float | None = None) -> Token:
+    """Schedule the crawls of the current context in ``priority`` within ``deadline_sec``.
+
+    ``None`` keeps the class inherited from the caller, and a nested deadline can
+    only tighten the inherited one. Undo with ``CRAWL_PRIORITY.reset(token)``.
+    """
+    inherited_priority, inherited_deadline = CRAWL_PRIORITY.get()
+    priority = CrawlPriority(priority) if priority else inherited_priority
+    deadline = time.time() + deadline_sec if deadline_sec else None
+    if inherited_deadline is not None:
+        deadline = inherited_deadline if deadline is None else min(deadline, inherited_deadline)
+    return CRAWL_PRIORITY.set((priority, deadline))
+
+
+@dataclass(order=True)
+class _Waiter:
+    key: tuple
+    domain: str = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    priority: CrawlPriority = field(compare=False)
+    deadline: float | None = field(compare=False)
+
+
+@dataclass
+class SlotTicket:
+    """A granted crawl slot; set ``status_code`` so the rate limiter can back off."""
+    url: str
+    domain: str
+    priority: CrawlPriority
+    waited_sec: float
+    status_code: int | None = None
+
+
+class CrawlScheduler:
+    """Owns every crawl slot of the process.
+
+    Waiters are granted in (class, deadline, arrival) order, skipping those whose
+    domain is at its concurrency limit or still inside its politeness delay, so
+    one busy domain never blocks crawls of other domains.
+    """
+
+    def __init__(self, max_slots: int, max_domain_slots: int, rate_limiter: RateLimiter | None = None):
+        self.max_slots = max_slots
+        self.max_domain_slots = max_domain_slots
+        self.rate_limiter = rate_limiter
+        self._waiters: list[_Waiter] = []
+        self._seq = itertools.count()
+        self._in_flight = 0
+        self._domain_in_flight: dict[str, int] = {}
+        self._timer: asyncio.TimerHandle | None = None
+        # metrics
+        self.granted = 0
+        self.rate_limited = 0
+        self.deadline_missed = 0
+        self.wait_max_sec = 0.0
+        self._waits: dict[CrawlPriority, deque[float]] = {
+            priority: deque(maxlen=WAIT_SAMPLES) for priority in CrawlPriority
+        }
+
+    @staticmethod
+    def _domain(url: str) -> str:
+        if not url.startswith(("http://", "https://")):
+            return ""  # raw html and local files are not subject to politeness
+        return urlparse(url).netloc
+
+    def _cooldown_until(self, domain: str) -> float:
+        if not domain or self.rate_limiter is None:
+            return 0.0
+        state = self.rate_limiter.domains.get(domain)
+        if state is None or not state.last_request_time:
+            return 0.0
+        return state.last_request_time + state.current_delay
+
+    def _grant(self, waiter: _Waiter, now: float):
+        self._in_flight += 1
+        self.granted += 1
+        domain = waiter.domain
+        if domain:
+            self._domain_in_flight[domain] = self._domain_in_flight.get(domain, 0) + 1
+            if self.rate_limiter:
+                state = self.rate_limiter.domains.setdefault(domain, DomainState())
+                if state.current_delay == 0:
+                    state.current_delay = random.uniform(*self.rate_limiter.base_delay)
+                state.last_request_time = now
+        waiter.future.set_result(None)
+
+    def _dispatch(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        now = time.time()
+        wake_at = None
+        deferred = []
+        while self._waiters and self._in_flight < self.max_slots:
+            waiter = heapq.heappop(self._waiters)
+            if waiter.future.done():
+                continue  # the caller gave up while queued
+            domain = waiter.domain
+            if domain and self._domain_in_flight.get(domain, 0) >= self.max_domain_slots:
+                deferred.append(waiter)
+                continue
+            cooldown = self._cooldown_until(domain)
+            if cooldown > now:
+                deferred.append(waiter)
+                wake_at = cooldown if wake_at is None else min(wake_at, cooldown)
+                continue
+            self._grant(waiter, now)
+        for waiter in deferred:
+            heapq.heappush(self._waiters, waiter)
+        if wake_at is not None:
+            self._timer = asyncio.get_running_loop().call_later(wake_at - now, self._dispatch)
+
+    def _release(self, domain: str):
+        self._in_flight -= 1
+        if domain:
+            self._domain_in_flight[domain] -= 1
+            if not self._domain_in_flight[domain]:
+                del self._domain_in_flight[domain]
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[SlotTicket]:
+        """Wait for a crawl slot for ``url`` and hold it for the duration of the block."""
+        domain = self._domain(url)
+        priority, deadline = CRAWL_PRIORITY.get()
+        future = asyncio.get_running_loop().create_future()
+        key = (PRIORITY_RANK[priority], math.inf if deadline is None else deadline, next(self._seq))
+        heapq.heappush(self._waiters, _Waiter(key, domain, future, priority, deadline))
+        started = time.perf_counter()
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._release(domain)  # granted right before the caller was cancelled
+            raise
+        ticket = SlotTicket(url=url, domain=domain, priority=priority, waited_sec=time.perf_counter() - started)
+        self._waits[priority].append(ticket.waited_sec)
+        if deadline is not None and time.time() > deadline:
+            self.deadline_missed += 1
+        self.wait_max_sec = max(self.wait_max_sec, ticket.waited_sec)
+        try:
+            yield ticket
+        finally:
+            if domain and self.rate_limiter and ticket.status_code:
+                if not self.rate_limiter.update_delay(url, ticket.status_code):
+                    self.rate_limited += 1
+                    logger.warning(f"Rate limit retry count exceeded for domain {domain}")
+            self._release(domain)
+
+    @staticmethod
+    def _wait_stats(waits: list[float]) -> dict:
+        return {
+            "wait_avg_ms": statistics.fmean(waits) * 1000 if waits else 0.0,
+            "wait_p95_ms": statistics.quantiles(waits, n=20)[18] * 1000 if len(waits) > 1 else 0.0,
+        }
+
+    def stats(self) -> dict:
+        queued = [waiter for waiter in self._waiters if not waiter.future.done()]
+        return {
+            "max_slots": self.max_slots,
+            "max_domain_slots": self.max_domain_slots,
+            "in_flight": self._in_flight,
+            "queued": len(queued),
+            "domains_in_flight": dict(self._domain_in_flight),
+            "granted": self.granted,
+            "rate_limited": self.rate_limited,
+            "deadline_missed": self.deadline_missed,
+            **self._wait_stats([wait for waits in self._waits.values() for wait in waits]),
+            "wait_max_ms": self.wait_max_sec * 1000,
+            "classes": {
+                priority.value: {
+                    "queued": sum(waiter.priority is priority for waiter in queued),
+                    **self._wait_stats(list(self._waits[priority])),
+                }
+                for priority in CrawlPriority
+            },
+        }
+
+
+def _stream_window() -> int:
+    return max(1, config.CRAWL_STREAM_WINDOW)
+
+
+class SharedCrawlDispatcher(BaseDispatcher):
+    """``arun_many`` dispatcher that leaves concurrency and politeness to the scheduler.
+
+    It only fans the URLs out; each ``arun`` waits for its own scheduler slot. The
+    dispatcher keeps no per-run state, so one instance serves every request.
+    """
+
+    def __init__(self):
+        super().__init__(rate_limiter=None, monitor=None)
+
+    async def crawl_url(
+            self,
+            url: str,
+            config: CrawlerRunConfig | list[CrawlerRunConfig],
+            task_id: str,
+            monitor=None,
+            crawler: AsyncWebCrawler | None = None,
+    ) -> CrawlerTaskResult:
+        start_time = time.time()
+        selected_config = self.select_config(url, config)
+        if selected_config is None:
+            error_message = f"No matching configuration found for URL: {url}"
+            result = CrawlResult(url=url, html="", metadata={"status": "no_config_match"}, success=False,
+                                 error_message=error_message)
+        else:
+            try:
+                result = await crawler.arun(url, config=selected_config)
+                error_message = "" if result.success else (result.error_message or "")
+            except Exception as e:
+                error_message = str(e)
+                result = CrawlResult(url=url, html="", metadata={}, success=False, error_message=error_message)
+        return CrawlerTaskResult(
+            task_id=task_id,
+            url=url,
+            result=result,
+            memory_usage=0,
+            peak_memory=0,
+            start_time=start_time,
+            end_time=time.time(),
+            error_message=error_message,
+        )
+
+    async def run_urls(self, crawler: AsyncWebCrawler, urls: list[str],
+                       config: CrawlerRunConfig | list[CrawlerRunConfig]) -> list[CrawlerTaskResult]:
+        return await asyncio.gather(
+            *(self.crawl_url(url, config, str(uuid.uuid4()), crawler=crawler) for url in urls)
+        )
+
+    async def run_urls_stream(self, crawler: AsyncWebCrawler, urls: list[str],
+                              config: CrawlerRunConfig | list[CrawlerRunConfig]) -> AsyncIterator[CrawlerTaskResult]:
+        """Yield results as pages finish, with at most ``CRAWL_STREAM_WINDOW`` pages crawled ahead.
+
+        A page is only started when the consumer has taken a result, so a slow
+        client holds the crawl back instead of piling up finished pages.
+        """
+        pending = iter(urls)
+        running: set[asyncio.Task] = set()
+
+        def start_next():
+            url = next(pending, None)
+            if url is not None:
+                running.add(asyncio.create_task(self.crawl_url(url, config, str(uuid.uuid4()), crawler=crawler)))
+
+        for _ in range(_stream_window()):
+            start_next()
+        try:
+            while running:
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    running.discard(task)
+                    yield task.result()
+                    start_next()
+        finally:
+            for task in running:
+                task.cancel()
+
+
+SCHEDULER: CrawlScheduler | None = None
+DISPATCHER = SharedCrawlDispatcher()
+
+
+def get_scheduler() -> CrawlScheduler:
+    """The scheduler of this process, created on first use from the crawler config."""
+    global SCHEDULER
+    if SCHEDULER is None:
+        SCHEDULER = CrawlScheduler(
+            max_slots=config.CRAWLER_MAX_PAGES,
+            max_domain_slots=config.SEMAPHORE_COUNT,
+            rate_limiter=RateLimiter(base_delay=config.RATE_LIMITER_BASE_DELAY)
+            if config.RATE_LIMITER_ENABLED else None,
+        )
+    return SCHEDULER
@@ -1,5 +1,6 @@
 import asyncio
 import hashlib
+import heapq
 import json
 import logging
 import subprocess
@@ -8,19 +9,40 @@ import traceback
 from typing import Dict
 
 import psutil
-from crawl4ai import AsyncWebCrawler, BrowserConfig, UndetectedAdapter, AsyncLogger
-from crawl4ai.async_crawler_strategy import AsyncPlaywrightCrawlerStrategy
+from crawl4ai import AsyncWebCrawler, BrowserConfig, UndetectedAdapter, AsyncLogger, HTTPCrawlerConfig
+from crawl4ai.async_crawler_strategy import AsyncPlaywrightCrawlerStrategy, AsyncHTTPCrawlerStrategy
 from patchright.async_api import BrowserContext, Page
 
+from component.crawl4ai.browser_memory import FootprintHistory, measure_browsers
+from component.crawl4ai.page_pool import PagePool
+from component.crawl4ai.page_readiness import prepare_readiness, wait_until_ready
+from component.crawl4ai.resource_policy import install_resource_guard, report_resource_savings
+from component.crawl4ai.rule_index import RuleIndex
 from configs import config
-from configs.crawl4ai.crawl_rule import CrawlRules
-from configs.crawl4ai.types import CrawlRuleGroup, CrawlRule
-from utils import get_domain_url
+from configs.crawl4ai.crawl_rule import CrawlRules, browser_config
+from configs.crawl4ai.types import CrawlRuleGroup, CrawlRule, PrewarmSpec
 
 POOL: Dict[str, AsyncWebCrawler] = {}
 LAST_USED: Dict[str, float] = {}
+STARTING: Dict[str, asyncio.Future] = {}  # sig -> in-flight browser startup
+PAGE_POOLS: Dict[str, PagePool] = {}
+BROWSER_RSS: Dict[str, int] = {}  # sig -> bytes used by the browser process tree
+FOOTPRINTS = FootprintHistory()
+CONFIGS: Dict[str, BrowserConfig] = {}  # sig -> config used to (re)start the browser
+EXPIRY_HEAP: list[tuple[float, str]] = []  # (idle deadline, sig), lazily re-armed
+EXPIRY_DEADLINES: Dict[str, float] = {}  # sig -> deadline of its live heap entry, older entries are stale
+JANITOR_WAKE = asyncio.Event()
+PROBE_LATENCY_MS: Dict[str, float] = {}
+RESTARTS: Dict[str, int] = {}
+BACKGROUND: set[asyncio.Task] = set()  # browser replacements and standby starts
+WARM_SPECS: Dict[str, PrewarmSpec] = {}  # sig -> pre-warm spec
+STANDBY: Dict[str, list[AsyncWebCrawler]] = {}  # sig -> started browsers waiting to be pooled
+REFILLING: Dict[str, int] = {}  # sig -> standby starts in flight
 LOCK = asyncio.Lock()
+HTTP_CRAWLER: AsyncWebCrawler | None = None  # browserless crawler for rules fetched over plain HTTP
+HTTP_CRAWLER_LOCK = asyncio.Lock()
 CRAWL_RULES: list[CrawlRuleGroup] = []
+RULE_INDEX = RuleIndex([])
 PARSER_CACHE: Dict[str, any] = {}
 MEMORY_WARNING_THRESHOLD = 70  # percent
 MEMORY_CRITICAL_THRESHOLD = 85  # percent
@@ -35,6 +57,24 @@ def install_browsers_if_needed():
         logger.error("Playwright CLI 未找到，请先安装 Python 包。")
 
 
+def _load_rule_groups(rules: list[dict]) -> list[CrawlRuleGroup]:
+    groups = []
+    for r in rules:
+        try:
+            groups.append(CrawlRuleGroup.model_validate(r))
+        except Exception as e:
+            logger.error(f"Invalid crawl rule config: {r}, error: {e}")
+    return groups
+
+
+def _install_rules(groups: list[CrawlRuleGroup]):
+    """Publish a rule set; lookups only read RULE_INDEX, which is swapped in one step."""
+    global RULE_INDEX
+    index = RuleIndex(groups)
+    CRAWL_RULES[:] = groups
+    RULE_INDEX = index
+
+
 def init_crawler_env():
     from component.crawl4ai.config_loader.config_loader import ConfigLoader
     from libs import app_context
@@ -44,53 +84,29 @@ def init_crawler_env():
     except Exception:
         data_dict = None
     if data_dict is None:
-        for r in CrawlRules().crawl_rules:
-            CRAWL_RULES.append(CrawlRuleGroup.model_validate(r))
+        _install_rules([CrawlRuleGroup.model_validate(r) for r in CrawlRules().crawl_rules])
     else:
-        for r in json.loads(data_dict):
-            try:
-                CRAWL_RULES.append(CrawlRuleGroup.model_validate(r))
-            except Exception as e:
-                logger.error(f"Invalid crawl rule config: {r}, error: {e}")
+        _install_rules(_load_rule_groups(json.loads(data_dict)))
 
 
 def get_rule_by_url(url: str) -> CrawlRule | None:
     """Get crawl rule by matching domain name from URL."""
-    res = None
-    for group in CRAWL_RULES:
-        for rule in group.rules:
-            if rule.url == get_domain_url(url):
-                res = rule
-                break
-    return res if res is not None else get_rule_by_url("default")
+    return RULE_INDEX.match(url)
 
 def get_rules_by_group(group_name:str)->CrawlRuleGroup |None:
     """Get crawl rule group by group name."""
-    for group in CRAWL_RULES:
-        if group.name == group_name:
-            return group
-    return None
+    return RULE_INDEX.groups.get(group_name)
 
 def get_rule_by_group_and_url(group_name:str, url: str) -> CrawlRule | None:
     """Get crawl rule by matching domain name from URL within a specific group."""
-    group = get_rules_by_group(group_name)
-    if group is None:
-        return None
-    for rule in group.rules:
-        if rule.url == get_domain_url(url):
-            return rule
-    return None
+    return RULE_INDEX.match_in_group(group_name, url)
 
 
 def change_crawl_rule(new_rules: list[dict]):
     """Change the current crawl rules to new ones."""
-    global CRAWL_RULES
-    CRAWL_RULES.clear()
-    for r in new_rules:
-        try:
-            CRAWL_RULES.append(CrawlRuleGroup.model_validate(r))
-        except Exception as e:
-            logger.error(f"Invalid crawl rule config: {r}, error: {e}")
+    _install_rules(_load_rule_groups(new_rules))
+    from component.crawl4ai import worker_farm
+    worker_farm.broadcast_rules(new_rules)
 
 def html_parser(crawl_rule_name: str):
     """decorator to set HTML parser based on crawl rule name."""
@@ -114,17 +130,29 @@ async def on_browser_created(browser, **kwargs):
 
 
 async def on_page_context_created(page: Page, context: BrowserContext, **kwargs):
-    # Called right after a new page + context are created (ideal for auth or route config).
+    # Called right after a page + context are handed to a crawl (ideal for auth or route config).
+    # Pooled pages (see page_pool.py) reach this hook once per lease, not once per creation.
     logger.debug("[HOOK] on_page_context_created - Setting up page & context.")
 
     return page
 
 
+def _hook_crawl_rule(url: str, **kwargs) -> CrawlRule | None:
+    """The rule the crawl was matched against, or the rule for ``url`` otherwise."""
+    run_config = kwargs.get("config")
+    crawl_rule = (getattr(run_config, "shared_data", None) or {}).get("crawl_rule")
+    return crawl_rule if crawl_rule is not None else get_rule_by_url(url)
+
+
 async def before_goto(
         page: Page, context: BrowserContext, url: str, **kwargs
 ):
     # Called before navigating to each URL.
     logger.debug(f"[HOOK] before_goto - About to navigate: {url}")
+    run_config = kwargs.get("config")
+    crawl_rule = _hook_crawl_rule(url, **kwargs)
+    await install_resource_guard(page, crawl_rule, screenshot=bool(getattr(run_config, "screenshot", False)))
+    prepare_readiness(page, crawl_rule)
     # await page.add_script_tag(content=load_js_script("auto_toggle"))
     # await page.add_script_tag(content=load_js_script("auto_toggle2"))
     # await page.add_script_tag(content=load_js_script("auto_toggle3"))
@@ -137,12 +165,8 @@ async def after_goto(
 ):
     # Called after navigation completes.
     logger.debug(f"[HOOK] after_goto - Successfully loaded: {url}")
-    # e.g., wait for a certain element if we want to verify
-    try:
-        await page.wait_for_selector('.content', timeout=1000)
-        logger.debug("[HOOK] Found .content element!")
-    except:
-        logger.debug("[HOOK] .content not found, continuing anyway.")
+    # wait for the page to be ready as the matched rule defines it
+    await wait_until_ready(page, url, _hook_crawl_rule(url, **kwargs))
     return page
 
 
@@ -174,144 +198,527 @@ async def before_return_html(
 ):
     # Called just before returning the HTML in the result.
     logger.debug(f"[HOOK] before_return_html - HTML length: {len(html)}")
+    await report_resource_savings(page)
     return page
 
 
+SIGNATURE_FIELDS = ("browser_mode", "use_persistent_context")  # browser config fields that get their own browser
+
+
 def _sig(cfg: BrowserConfig) -> str:
-    payload = json.dumps({"browser_mode":cfg.browser_mode,"use_persistent_context":cfg.use_persistent_context}, sort_keys=True, separators=(",", ":"))
+    payload = json.dumps({name: getattr(cfg, name) for name in SIGNATURE_FIELDS}, sort_keys=True, separators=(",", ":"))
     return hashlib.sha1(payload.encode()).hexdigest()
 
 
-async def check_memory_and_cleanup() -> bool:
+async def sample_browser_memory():
+    """Refresh the per-browser RSS accounting and the footprint history.
+
+    Only the measurement runs in a thread; the pool is read and the results are
+    applied on the event loop, for the browsers that are still pooled.
+    """
+    measured = dict(POOL)
+    usage = await asyncio.to_thread(measure_browsers, measured)
+    for sig in [sig for sig in BROWSER_RSS if sig not in POOL]:
+        del BROWSER_RSS[sig]
+    for sig, rss in usage.items():
+        if POOL.get(sig) is measured[sig]:
+            BROWSER_RSS[sig] = rss
+            FOOTPRINTS.observe(sig, rss)
+
+
+def _eviction_candidates(now: float) -> list[str]:
+    """Idle browsers ordered by bytes freed weighted by idle seconds, best first."""
+    scored = []
+    for sig in POOL:
+        page_pool = PAGE_POOLS.get(sig)
+        if page_pool and page_pool.in_use:
+            continue  # never evict a browser that is crawling right now
+        if _below_warm_floor(sig):
+            continue
+        idle_sec = max(now - LAST_USED.get(sig, now), 1.0)
+        scored.append((BROWSER_RSS.get(sig, 0) * idle_sec, sig))
+    scored.sort(reverse=True)
+    return [sig for _, sig in scored]
+
+
+def _admission_shortfall(sig: str | None, memory) -> float:
+    """Bytes missing to start another browser of ``sig`` without crossing the critical threshold."""
+    reserve = memory.total * (100 - MEMORY_CRITICAL_THRESHOLD) / 100
+    return FOOTPRINTS.predict(sig) + reserve - memory.available
+
+
+async def check_memory_and_cleanup(sig: str | None = None) -> bool:
     """Check memory pressure and cleanup if needed.
 
+    Admission predicts the new browser's footprint from the history of its
+    signature; when that would push the host past MEMORY_CRITICAL_THRESHOLD, the
+    cheapest set of idle browsers that frees enough memory is evicted. Nothing is
+    evicted if even evicting every idle browser would not make room.
+
     Returns:
         bool: True if new browser can be created, False if denied
     """
     from contextlib import suppress
 
     memory = psutil.virtual_memory()
-
-    if memory.percent >= MEMORY_CRITICAL_THRESHOLD:
-        logger.warning(
-            f"Critical memory pressure: {memory.percent:.1f}%, "
-            f"available: {memory.available // (1024*1024)}MB"
-        )
-        # Try to evict oldest crawler
-        async with LOCK:
-            if POOL and LAST_USED:
-                oldest_sig = min(LAST_USED, key=LAST_USED.get)
-                crawler = POOL.pop(oldest_sig, None)
-                LAST_USED.pop(oldest_sig, None)
-                if crawler:
-                    with suppress(Exception):
-                        await crawler.close()
-                    logger.info("Evicted oldest crawler due to memory pressure")
-        return False  # Still deny new browser after cleanup
+    await sample_browser_memory()
+    predicted = FOOTPRINTS.predict(sig)
+    shortfall = _admission_shortfall(sig, memory)
 
     if memory.percent >= MEMORY_WARNING_THRESHOLD:
         logger.info(
             f"Memory warning: {memory.percent:.1f}%, "
-            f"available: {memory.available // (1024*1024)}MB"
+            f"available: {memory.available // (1024*1024)}MB, "
+            f"predicted browser footprint: {predicted // (1024*1024):.0f}MB"
         )
-        return True  # Allow but logged warning
-
-    return True  # Normal
+    if shortfall <= 0:
+        return True  # Normal
+
+    logger.warning(
+        f"Critical memory pressure: {memory.percent:.1f}%, "
+        f"available: {memory.available // (1024*1024)}MB, "
+        f"need {shortfall // (1024*1024):.0f}MB more for a new browser"
+    )
+    async with LOCK:
+        victims, freed = [], 0
+        for victim in _eviction_candidates(time.time()):
+            if freed >= shortfall:
+                break
+            victims.append(victim)
+            freed += BROWSER_RSS.get(victim, 0)
+        if freed < shortfall:
+            logger.warning(f"Evicting idle browsers would free only {freed // (1024*1024)}MB, keeping them warm")
+            return False
+        for victim in victims:
+            crawler = _forget(victim)
+            if crawler:
+                with suppress(Exception):
+                    await crawler.close()
+        logger.info(f"Evicted {len(victims)} idle browser(s) freeing ~{freed // (1024*1024)}MB")
+    return True
+
+
+def _crawler_log_level():
+    from crawl4ai.async_logger import LogLevel
+    if config.LOG_LEVEL == "DEBUG":
+        return LogLevel.DEBUG
+    elif config.LOG_LEVEL == "INFO":
+        return LogLevel.INFO
+    elif config.LOG_LEVEL == "WARNING":
+        return LogLevel.WARNING
+    elif config.LOG_LEVEL == "ERROR":
+        return LogLevel.ERROR
+    return LogLevel.INFO
+
+
+async def _start_crawler(cfg: BrowserConfig) -> AsyncWebCrawler:
+    """Build a crawler with the pool hooks installed and launch its browser."""
+    crawler_logger = AsyncLogger(verbose=False, log_level=_crawler_log_level(), log_file=config.LOG_FILE)
+    undetected_adapter = UndetectedAdapter()
+    # Create the crawler strategy with undetected adapter
+    crawler_strategy = AsyncPlaywrightCrawlerStrategy(
+        browser_config=cfg,
+        browser_adapter=undetected_adapter if not cfg.enable_stealth else None,
+        logger=crawler_logger
+    )
+    crawler_strategy.set_hook("on_browser_created", on_browser_created)
+    crawler_strategy.set_hook(
+        "on_page_context_created", on_page_context_created
+    )
+    crawler_strategy.set_hook("before_goto", before_goto)
+    crawler_strategy.set_hook("after_goto", after_goto)
+    crawler_strategy.set_hook(
+        "on_user_agent_updated", on_user_agent_updated
+    )
+    crawler_strategy.set_hook(
+        "on_execution_started", on_execution_started
+    )
+    crawler_strategy.set_hook(
+        "before_retrieve_html", before_retrieve_html
+    )
+    crawler_strategy.set_hook(
+        "before_return_html", before_return_html
+    )
+    crawler = AsyncWebCrawler(config=cfg, thread_safe=False, crawler_strategy=crawler_strategy,
+                              logger=crawler_logger)
+    await crawler.start()
+    return crawler
 
 
 async def get_crawler(cfg: BrowserConfig) -> AsyncWebCrawler:
-    sig = None
+    """Return the pooled crawler for ``cfg``, starting it if needed.
+
+    Browser startup is single-flight per signature: the first caller launches the
+    browser outside of ``LOCK`` and concurrent callers for the same signature await
+    its startup future, so a cold start never blocks lookups for other signatures.
+    """
+    sig = _sig(cfg)
+    logger.debug(f"Getting crawler with signature: {sig}")
+    async with LOCK:
+        if sig in POOL:
+            LAST_USED[sig] = time.time()
+            return POOL[sig]
+        startup = STARTING.get(sig)
+        leader = startup is None
+        if leader:
+            startup = asyncio.get_running_loop().create_future()
+            STARTING[sig] = startup
+    if not leader:
+        logger.debug(f"Waiting for in-flight browser startup: {sig}")
+        return await asyncio.shield(startup)
+
+    crawler = None
     try:
-        sig = _sig(cfg)
-        logger.debug(f"Getting crawler with signature: {sig}")
-        from crawl4ai.async_logger import LogLevel
-        if config.LOG_LEVEL == "DEBUG":
-            log_level = LogLevel.DEBUG
-        elif config.LOG_LEVEL == "INFO":
-            log_level = LogLevel.INFO
-        elif config.LOG_LEVEL == "WARNING":
-            log_level = LogLevel.WARNING
-        elif config.LOG_LEVEL == "ERROR":
-            log_level = LogLevel.ERROR
+        if STANDBY.get(sig):
+            crawler = STANDBY[sig].pop()
+            logger.info(f"Promoting warm standby browser {sig}")
         else:
-            log_level = LogLevel.INFO
-        crawler_logger = AsyncLogger(verbose=False, log_level=log_level, log_file=config.LOG_FILE)
-        async with LOCK:
-            if sig in POOL:
-                LAST_USED[sig] = time.time();
-                return POOL[sig]
-        if not await check_memory_and_cleanup():
-            memory = psutil.virtual_memory()
-            raise MemoryError(
-                f"RAM pressure ({memory.percent:.1f}%) - new browser denied"
-            )
-        async with LOCK:
-            if sig in POOL:
-                LAST_USED[sig] = time.time();
-                return POOL[sig]
-            undetected_adapter = UndetectedAdapter()
-            # Create the crawler strategy with undetected adapter
-            crawler_strategy = AsyncPlaywrightCrawlerStrategy(
-                browser_config=cfg,
-                browser_adapter=undetected_adapter if not cfg.enable_stealth else None,
-                logger=crawler_logger
-            )
-            crawler_strategy.set_hook("on_browser_created", on_browser_created)
-            crawler_strategy.set_hook(
-                "on_page_context_created", on_page_context_created
-            )
-            crawler_strategy.set_hook("before_goto", before_goto)
-            crawler_strategy.set_hook("after_goto", after_goto)
-            crawler_strategy.set_hook(
-                "on_user_agent_updated", on_user_agent_updated
-            )
-            crawler_strategy.set_hook(
-                "on_execution_started", on_execution_started
-            )
-            crawler_strategy.set_hook(
-                "before_retrieve_html", before_retrieve_html
-            )
-            crawler_strategy.set_hook(
-                "before_return_html", before_return_html
-            )
-            crawler = AsyncWebCrawler(config=cfg, thread_safe=False, crawler_strategy=crawler_strategy,
-                                      logger=crawler_logger)
-            await crawler.start()
-            POOL[sig] = crawler;
-            LAST_USED[sig] = time.time()
-            return crawler
+            if not await check_memory_and_cleanup(sig):
+                memory = psutil.virtual_memory()
+                raise MemoryError(
+                    f"RAM pressure ({memory.percent:.1f}%) - new browser denied"
+                )
+            crawler = await _start_crawler(cfg)
+        POOL[sig] = crawler
+        CONFIGS[sig] = cfg
+        LAST_USED[sig] = time.time()
+        _schedule_expiry(sig, LAST_USED[sig] + config.IDLE_TTL_SEC)
+        _create_page_pool(sig, crawler)
+        _refill_standby(sig)
+        # seed the footprint history with the fresh browser
+        _spawn(sample_browser_memory())
     except MemoryError as e:
-        raise MemoryError(f"RAM pressure – new browser denied: {e}")
+        error = MemoryError(f"RAM pressure – new browser denied: {e}")
+        startup.set_exception(error)
+        startup.exception()  # mark retrieved, followers re-raise it themselves
+        raise error
     except Exception as e:
         traceback.print_exc()
         install_browsers_if_needed()
         logger.error(f"Failed to start browser, please check if the browser is installed properly: {e}")
         # raise RuntimeError(f"Failed to start browser: {e}")
+    except BaseException:
+        startup.cancel()
+        raise
     finally:
-        if sig in POOL:
-            LAST_USED[sig] = time.time()
-        else:
-            # If we failed to start the browser, we should remove it from the pool
-            POOL.pop(sig, None)
-            LAST_USED.pop(sig, None)
-        # If we failed to start the browser, we should remove it from the pool
+        STARTING.pop(sig, None)
+    if not startup.done():
+        startup.set_result(crawler)
+    return crawler
+
+
+async def get_http_crawler() -> AsyncWebCrawler:
+    """Return the shared HTTP-only crawler: one pooled aiohttp session, no browser."""
+    global HTTP_CRAWLER
+    async with HTTP_CRAWLER_LOCK:
+        if HTTP_CRAWLER is None:
+            crawler_logger = AsyncLogger(verbose=False, log_level=_crawler_log_level(), log_file=config.LOG_FILE)
+            crawler_strategy = AsyncHTTPCrawlerStrategy(
+                browser_config=HTTPCrawlerConfig(headers={"User-Agent": config.DEFAULT_USER_AGENT}),
+                logger=crawler_logger,
+                max_connections=config.CRAWLER_HTTP_MAX_CONNECTIONS,
+            )
+            crawler = AsyncWebCrawler(config=BrowserConfig(verbose=False), crawler_strategy=crawler_strategy,
+                                      logger=crawler_logger)
+            await crawler.start()
+            HTTP_CRAWLER = crawler
+        return HTTP_CRAWLER
+
+
+def _forget(sig: str) -> AsyncWebCrawler | None:
+    """Remove a browser from every pool structure; the caller closes it."""
+    LAST_USED.pop(sig, None)
+    EXPIRY_DEADLINES.pop(sig, None)
+    BROWSER_RSS.pop(sig, None)
+    PROBE_LATENCY_MS.pop(sig, None)
+    _drop_page_pool(sig)
+    return POOL.pop(sig, None)
+
+
+def _create_page_pool(sig: str, crawler: AsyncWebCrawler):
+    if config.CRAWLER_PAGE_POOL_SIZE <= 0:
+        return
+    page_pool = PagePool(crawler, size=config.CRAWLER_PAGE_POOL_SIZE)
+    PAGE_POOLS[sig] = page_pool
+    if config.CRAWLER_PAGE_POOL_PREWARM > 0:
+        _spawn(page_pool.prewarm(config.CRAWLER_PAGE_POOL_PREWARM))
+
+
+def _drop_page_pool(sig: str):
+    page_pool = PAGE_POOLS.pop(sig, None)
+    if page_pool:
+        page_pool.close()
+
+
+def get_page_pool(crawler: AsyncWebCrawler) -> PagePool | None:
+    """Get the page pool of a pooled crawler."""
+    for sig, pooled in POOL.items():
+        if pooled is crawler:
+            return PAGE_POOLS.get(sig)
+    return None
+
+
+def get_pool_stats() -> dict:
+    """Snapshot of the crawler pool metrics."""
+    return {
+        "browsers": len(POOL),
+        "starting": len(STARTING),
+        "browser_rss_bytes": dict(BROWSER_RSS),
+        "predicted_footprint_bytes": dict(FOOTPRINTS.footprints),
+        "probe_latency_ms": dict(PROBE_LATENCY_MS),
+        "restarts": dict(RESTARTS),
+        "standby": {sig: len(crawlers) for sig, crawlers in STANDBY.items()},
+        "warm_floor": {sig: spec.min_warm for sig, spec in WARM_SPECS.items()},
+        "page_pools": {sig: page_pool.stats() for sig, page_pool in PAGE_POOLS.items()},
+    }
 
 
 async def close_all():
+    global HTTP_CRAWLER
+    from contextlib import suppress
+    # standby starts and replacements still running would launch browsers into the cleared pool
+    background = list(BACKGROUND)
+    for task in background:
+        task.cancel()
+    await asyncio.gather(*background, return_exceptions=True)
+    if HTTP_CRAWLER is not None:
+        with suppress(Exception):
+            await HTTP_CRAWLER.close()
+        HTTP_CRAWLER = None
+    from component.cache.crawl_result_cache import close_revalidation_session
+    with suppress(Exception):
+        await close_revalidation_session()
+    async with LOCK:
+        for sig in list(PAGE_POOLS):
+            _drop_page_pool(sig)
+        standbys = [c for crawlers in STANDBY.values() for c in crawlers]
+        await asyncio.gather(*(c.close() for c in [*POOL.values(), *standbys]), return_exceptions=True)
+        for state in (POOL, STANDBY, STARTING, CONFIGS, LAST_USED, EXPIRY_DEADLINES, BROWSER_RSS, PROBE_LATENCY_MS,
+                      REFILLING, WARM_SPECS):
+            state.clear()
+        EXPIRY_HEAP.clear()
+
+
+def _schedule_expiry(sig: str, deadline: float):
+    EXPIRY_DEADLINES[sig] = deadline
+    heapq.heappush(EXPIRY_HEAP, (deadline, sig))
+    if EXPIRY_HEAP[0][1] == sig:
+        JANITOR_WAKE.set()
+
+
+async def _evict_expired(now: float):
+    """Pop due heap entries; entries whose browser was used since are re-armed."""
+    from contextlib import suppress
+    while EXPIRY_HEAP and EXPIRY_HEAP[0][0] <= now:
+        entry_deadline, sig = heapq.heappop(EXPIRY_HEAP)
+        async with LOCK:
+            if sig not in POOL or EXPIRY_DEADLINES.get(sig) != entry_deadline:
+                continue  # evicted, or replaced and re-armed under a newer entry
+            deadline = LAST_USED.get(sig, now) + config.IDLE_TTL_SEC
+            page_pool = PAGE_POOLS.get(sig)
+            if deadline > now:
+                _schedule_expiry(sig, deadline)
+                continue
+            if page_pool and page_pool.in_use:
+                _schedule_expiry(sig, now + config.CRAWLER_PROBE_INTERVAL_SEC)
+                continue
+            if _below_warm_floor(sig):
+                _schedule_expiry(sig, now + config.IDLE_TTL_SEC)
+                continue
+            crawler = _forget(sig)
+            # the signature went idle: keep only the standbys the floor asks for
+            standby = STANDBY.get(sig, [])
+            floor = WARM_SPECS[sig].min_warm if sig in WARM_SPECS else 0
+            surplus, standby[floor:] = standby[floor:], []
+        logger.info(f"Evicting idle browser {sig}")
+        for idle in [crawler, *surplus]:
+            with suppress(Exception):
+                await idle.close()
+
+
+def _browser_is_alive(crawler: AsyncWebCrawler) -> bool:
+    manager = crawler.crawler_strategy.browser_manager
+    process = getattr(manager.managed_browser, "browser_process", None)
+    if process is not None and process.poll() is not None:
+        return False
+    return manager.browser is not None and manager.browser.is_connected()
+
+
+async def _probe(sig: str, crawler: AsyncWebCrawler) -> bool:
+    """Cheap liveness probe: process/connection check plus one CDP round trip."""
+    started = time.perf_counter()
+    try:
+        if not _browser_is_alive(crawler):
+            return False
+        manager = crawler.crawler_strategy.browser_manager
+        if manager.config.browser_type == "chromium":
+            async def round_trip():
+                session = await manager.browser.new_browser_cdp_session()
+                await session.send("Browser.getVersion")
+                await session.detach()
+
+            await asyncio.wait_for(round_trip(), timeout=config.CRAWLER_PROBE_TIMEOUT_SEC)
+        return True
+    except Exception as e:
+        logger.warning(f"Liveness probe failed for browser {sig}: {e}")
+        return False
+    finally:
+        PROBE_LATENCY_MS[sig] = (time.perf_counter() - started) * 1000
+
+
+async def _replace_crawler(sig: str, crawler: AsyncWebCrawler):
+    """Drop a dead or wedged browser and start a fresh one for its signature."""
+    from contextlib import suppress
     async with LOCK:
-        await asyncio.gather(*(c.close() for c in POOL.values()), return_exceptions=True)
-        POOL.clear();
-        LAST_USED.clear()
+        if POOL.get(sig) is not crawler:
+            return
+        _forget(sig)
+    RESTARTS[sig] = RESTARTS.get(sig, 0) + 1
+    logger.error(f"Browser {sig} is dead or unresponsive, replacing it (restart #{RESTARTS[sig]})")
+    with suppress(Exception):
+        await crawler.close()
+    cfg = CONFIGS.get(sig)
+    if cfg is not None:
+        await get_crawler(cfg)
+
+
+async def _probe_all():
+    # a browser busy with leased pages can be slow to answer without being wedged
+    pooled = [(sig, crawler) for sig, crawler in POOL.items()
+              if not (PAGE_POOLS.get(sig) and PAGE_POOLS[sig].in_use)]
+    standbys = [(sig, crawler) for sig, crawlers in STANDBY.items() for crawler in crawlers]
+    alive = await asyncio.gather(*(_probe(sig, crawler) for sig, crawler in pooled + standbys))
+    for (sig, crawler), ok in zip(pooled, alive):
+        if not ok:
+            _spawn(_replace_crawler(sig, crawler))
+    for (sig, crawler), ok in zip(standbys, alive[len(pooled):]):
+        if not ok and crawler in STANDBY.get(sig, []):
+            logger.error(f"Warm standby browser {sig} is dead, replacing it")
+            STANDBY[sig].remove(crawler)
+            _spawn(crawler.close())
+            _refill_standby(sig)
 
 
 async def janitor():
+    """Evict idle browsers at their exact deadline and replace dead ones.
+
+    Idle expiry is driven by EXPIRY_HEAP (one live entry per browser, re-armed
+    lazily when the browser was used after the entry was pushed; entries older
+    than EXPIRY_DEADLINES are dropped as they surface), so the janitor never
+    scans the pool or the heap for expiry. Liveness probes and memory sampling
+    run every CRAWLER_PROBE_INTERVAL_SEC; browsers with leased pages are not
+    probed.
+    """
+    next_probe = time.time() + config.CRAWLER_PROBE_INTERVAL_SEC
     while True:
-        await asyncio.sleep(60)
         now = time.time()
-        async with LOCK:
-            for sig, crawler in list(POOL.items()):
-                if now - LAST_USED[sig] > config.IDLE_TTL_SEC:
-                    from contextlib import suppress
-                    with suppress(Exception): await crawler.close()
-                    POOL.pop(sig, None);
-                    LAST_USED.pop(sig, None)
+        wake_at = min(EXPIRY_HEAP[0][0], next_probe) if EXPIRY_HEAP else next_probe
+        JANITOR_WAKE.clear()
+        if wake_at > now:
+            try:
+                await asyncio.wait_for(JANITOR_WAKE.wait(), timeout=wake_at - now)
+                continue  # an earlier deadline was scheduled
+            except asyncio.TimeoutError:
+                pass
+        now = time.time()
+        await _evict_expired(now)
+        if now >= next_probe:
+            next_probe = now + config.CRAWLER_PROBE_INTERVAL_SEC
+            await _probe_all()
+            await sample_browser_memory()
+
+
+# ── warm standby ─────────────────────────────────────────────
+
+def _spawn(coro) -> asyncio.Task:
+    task = asyncio.create_task(coro)
+    BACKGROUND.add(task)
+    task.add_done_callback(BACKGROUND.discard)
+    return task
+
+
+def _warm_count(sig: str) -> int:
+    return (sig in POOL) + len(STANDBY.get(sig, []))
+
+
+def _below_warm_floor(sig: str) -> bool:
+    """Whether evicting the pooled browser of ``sig`` would break its min-warm floor."""
+    spec = WARM_SPECS.get(sig)
+    return spec is not None and _warm_count(sig) - 1 < spec.min_warm
+
+
+async def _start_standby(sig: str):
+    """Start one standby browser; standbys never evict pooled browsers to make room."""
+    try:
+        if _admission_shortfall(sig, psutil.virtual_memory()) > 0:
+            logger.warning(f"RAM pressure - warm standby for {sig} not started")
+            return
+        crawler = await _start_crawler(CONFIGS[sig])
+    except Exception as e:
+        logger.error(f"Failed to start warm standby browser {sig}: {e}")
+        return
+    finally:
+        if REFILLING.get(sig):  # close_all clears it
+            REFILLING[sig] -= 1
+    if sig not in WARM_SPECS:
+        await crawler.close()  # the pool was closed while the browser started
+        return
+    STANDBY.setdefault(sig, []).append(crawler)
+
+
+def _standby_starts(sig: str, starting: int = 0) -> list:
+    """Coroutines starting the standbys ``sig`` is missing to reach its warm count.
+
+    ``starting`` counts browsers of ``sig`` being started outside of the standby
+    path, such as the pooled browser at boot.
+    """
+    spec = WARM_SPECS.get(sig)
+    if spec is None:
+        return []
+    missing = spec.count - _warm_count(sig) - REFILLING.get(sig, 0) - starting
+    if missing <= 0:
+        return []
+    REFILLING[sig] = REFILLING.get(sig, 0) + missing
+    return [_start_standby(sig) for _ in range(missing)]
+
+
+def _refill_standby(sig: str):
+    for start in _standby_starts(sig):
+        _spawn(start)
+
+
+async def prewarm_pool(specs: list[dict]):
+    """Start every browser of the pre-warm spec in parallel.
+
+    Each spec names a browser config (overrides on top of the default one), how
+    many browsers to keep warm for its signature and the floor the janitor never
+    evicts below. The first browser of a signature is pooled, the others wait as
+    standbys and are promoted when the pooled browser is evicted or replaced.
+
+    Browsers are pooled by their SIGNATURE_FIELDS only, so specs overriding other
+    fields, or naming a signature twice, are skipped: their browsers would be
+    shared with, and counted against, another spec.
+    """
+    starts, seen = [], set()
+    for raw in specs:
+        spec = PrewarmSpec.model_validate(raw)
+        unkeyed = sorted(set(spec.browser_config) - set(SIGNATURE_FIELDS))
+        if unkeyed:
+            logger.error(f"Pre-warm spec {raw} skipped: browsers are pooled by {', '.join(SIGNATURE_FIELDS)} "
+                         f"only, not by {', '.join(unkeyed)}")
+            continue
+        cfg = BrowserConfig.load({**browser_config, **spec.browser_config})
+        sig = _sig(cfg)
+        if sig in seen:
+            logger.error(f"Pre-warm spec {raw} skipped: another spec pre-warms the same browsers")
+            continue
+        seen.add(sig)
+        WARM_SPECS[sig] = spec
+        CONFIGS[sig] = cfg
+        # in BACKGROUND, so close_all stops the starts still running
+        starts.append(_spawn(get_crawler(cfg)))
+        starts.extend(_spawn(start) for start in _standby_starts(sig, starting=0 if sig in POOL else 1))
+    started = time.perf_counter()
+    await asyncio.gather(*starts, return_exceptions=True)
+    logger.info(f"Pre-warmed {sum(_warm_count(sig) for sig in WARM_SPECS)} browsers "
+                f"in {time.perf_counter() - started:.2f}s")
@@ -0,0 +1,159 @@
+"""HTTP-only fast path for static pages.
+
+A ``CrawlRule`` picks how its pages are fetched with ``fetch_mode``: ``browser``
+renders them in a pooled browser, ``http`` downloads them over the shared
+aiohttp session of the HTTP crawler, and ``auto`` tries HTTP first and falls
+back to the browser when the response looks like a javascript-only shell.
+Domains whose pages keep falling back go straight to the browser.
+"""
+import asyncio
+import copy
+import logging
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+from urllib.parse import urlparse
+
+from crawl4ai import BrowserConfig, CrawlerRunConfig
+
+from configs.crawl4ai.types import CrawlRule, CrawlMode
+
+logger = logging.getLogger(__name__)
+
+FETCH_BROWSER = "browser"
+FETCH_HTTP = "http"
+FETCH_AUTO = "auto"
+
+MIN_TEXT_CHARS = 200  # less extracted text than this is treated as an unrendered page
+MAX_FALLBACKS = 3  # fallbacks without a single usable HTTP fetch before a domain skips HTTP
+MAX_DOMAINS = 10_000
+
+# markers of pages that only render their content with javascript
+_JS_SHELL_MARKERS = re.compile(
+    r"(enable|requires?|need to enable)\s+javascript"
+    r"|<div[^>]+id=[\"'](root|app|__next|__nuxt)[\"'][^>]*>\s*</div>",
+    re.IGNORECASE,
+)
+
+FETCH_STATS = {"http": 0, "browser": 0, "fallbacks": 0}
+
+
+@dataclass
+class DomainFetch:
+    http_ok: int = 0
+    fallbacks: int = 0
+
+    @property
+    def needs_browser(self) -> bool:
+        return not self.http_ok and self.fallbacks >= MAX_FALLBACKS
+
+
+DOMAINS: OrderedDict[str, DomainFetch] = OrderedDict()  # domain -> outcome of its HTTP fetches, LRU
+
+
+def _domain_fetch(url: str) -> DomainFetch:
+    domain = urlparse(url).netloc
+    fetch = DOMAINS.get(domain)
+    if fetch is None:
+        fetch = DOMAINS[domain] = DomainFetch()
+        if len(DOMAINS) > MAX_DOMAINS:
+            DOMAINS.popitem(last=False)
+    else:
+        DOMAINS.move_to_end(domain)
+    return fetch
+
+
+def fetch_mode(crawl_rule: CrawlRule | None, crawler_config: CrawlerRunConfig) -> str:
+    """Fetch mode of a crawl; anything the HTTP crawler cannot serve uses the browser."""
+    mode = getattr(crawl_rule, "fetch_mode", None) or FETCH_BROWSER
+    if mode == FETCH_BROWSER or crawl_rule.crawl_mode != CrawlMode.CLASSIC:
+        return FETCH_BROWSER
+    if crawl_rule.deep_crawl or crawler_config.stream:
+        return FETCH_BROWSER
+    if crawler_config.screenshot or crawler_config.pdf:
+        return FETCH_BROWSER
+    return mode
+
+
+def fetched_over_http(result, mode: str) -> bool:
+    """Whether ``result`` holds the raw HTTP response body rather than a rendered DOM."""
+    if mode == FETCH_HTTP:
+        return True
+    fetch = ((getattr(result, "metadata", None) or {}).get("crawl_report") or {}).get("fetch") or {}
+    return fetch.get("mode") == FETCH_HTTP
+
+
+def http_run_config(crawler_config: CrawlerRunConfig) -> CrawlerRunConfig:
+    """The run config for the HTTP crawler.
+
+    crawl4ai applies ``css_selector`` in the browser only; over HTTP the same
+    selection is made while scraping, through ``target_elements``.
+    """
+    if not crawler_config.css_selector or crawler_config.target_elements:
+        return crawler_config
+    http_config = copy.copy(crawler_config)
+    http_config.target_elements = [s.strip() for s in crawler_config.css_selector.split(",")]
+    return http_config
+
+
+def js_shell_reason(result) -> str | None:
+    """Why an HTTP fetch cannot stand in for a rendered page, or None when it can."""
+    if not result.success:
+        return "failed"
+    if result.status_code and result.status_code >= 400:
+        return f"status {result.status_code}"
+    markdown = getattr(result.markdown, "raw_markdown", None) or ""
+    text_chars = len(markdown.strip())
+    if text_chars >= MIN_TEXT_CHARS:
+        return None
+    if _JS_SHELL_MARKERS.search(result.html or ""):
+        return "javascript shell"
+    return "too little text"
+
+
+async def crawl_auto(url: str, crawler_config: CrawlerRunConfig, browser_config: BrowserConfig, **kwargs):
+    """Crawl ``url`` over HTTP, falling back to the browser when the page needs rendering."""
+    from component.crawl4ai.crawler_pool import get_crawler, get_http_crawler
+    domain = _domain_fetch(url)
+    if not domain.needs_browser:
+        http_crawler = await get_http_crawler()
+        result = await http_crawler.arun(url, config=http_run_config(crawler_config), **kwargs)
+        reason = js_shell_reason(result)
+        if reason is None:
+            domain.http_ok += 1
+            FETCH_STATS["http"] += 1
+            _mark(result, {"mode": FETCH_HTTP})
+            return result
+        domain.fallbacks += 1
+        FETCH_STATS["fallbacks"] += 1
+        logger.debug(f"HTTP fetch of {url} unusable ({reason}), falling back to the browser")
+    else:
+        reason = "domain needs browser"
+    crawler = await get_crawler(browser_config)
+    result = await crawler.arun(url, config=crawler_config, **kwargs)
+    FETCH_STATS["browser"] += 1
+    _mark(result, {"mode": FETCH_BROWSER, "fallback_reason": reason})
+    return result
+
+
+async def crawl_many_auto(urls: list[str], config: CrawlerRunConfig, browser_config: BrowserConfig,
+                          dispatcher=None):
+    """``crawl_auto`` for each url; a single result for one url, like ``arun``.
+
+    Pages are scheduled one by one by the shared scheduler, so ``dispatcher`` is unused.
+    """
+    results = await asyncio.gather(*(crawl_auto(url, config, browser_config) for url in urls))
+    return results[0] if len(urls) == 1 else list(results)
+
+
+def _mark(result, fetch: dict):
+    metadata = getattr(result, "metadata", None) or {}
+    report = metadata.get("crawl_report")
+    if report is None:
+        report = metadata["crawl_report"] = {}
+        result.metadata = metadata
+    report.setdefault("fetch", {}).update(fetch)
+
+
+def get_fetch_stats() -> dict:
+    return {**FETCH_STATS, "browser_only_domains": sum(1 for d in DOMAINS.values() if d.needs_browser)}
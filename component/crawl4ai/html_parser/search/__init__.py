@@ -0,0 +1,5 @@
+"""Parsers of search engine result pages, registered under the names of their crawl rules."""
+from component.crawl4ai.html_parser.search import baidu_html_parser, bing_html_parser, brave_html_parser, \
+    duckduckgo_html_parser
+
+__all__ = ["baidu_html_parser", "bing_html_parser", "brave_html_parser", "duckduckgo_html_parser"]
@@ -0,0 +1,31 @@
+import logging
+
+from component.crawl4ai.crawler_pool import html_parser
+from component.crawl4ai.html_parser.html_parser import HtmlParser
+
+logger = logging.getLogger(__name__)
+
+
+@html_parser("baidu")
+class BaiduHtmlParser(HtmlParser):
+    """A parser for Baidu search result HTML content."""
+    def parse(self, html_content):
+        """Parse the HTML content and extract search results."""
+        from bs4 import BeautifulSoup
+
+        soup = BeautifulSoup(html_content, 'lxml')
+        results = []
+
+        # ads are not marked as results, their containers carry other classes
+        for item in soup.select('#content_left > .result, #content_left > .result-op'):
+            node = item.select_one('h3 a')
+            if node and node.get('href'):
+                # the title links to a baidu.com/link redirect, ``mu`` holds the page itself
+                link = item.get('mu') if (item.get('mu') or '').startswith('http') else node['href']
+                snippet = item.select_one('.c-abstract, [class^="content-right"], .c-span-last')
+                results.append({'title': node.get_text(strip=True),
+                                'link': link,
+                                'snippet': snippet.get_text(' ', strip=True) if snippet else ''})
+
+        logger.debug(f"results: {results}")
+        return results
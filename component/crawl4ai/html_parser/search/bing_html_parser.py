@@ -1,6 +1,6 @@
 import base64
 import logging
-import urllib
+import urllib.parse
 
 from component.crawl4ai.crawler_pool import html_parser
 from component.crawl4ai.html_parser.html_parser import HtmlParser
@@ -41,7 +41,7 @@ class BingHtmlParser(HtmlParser):
         """Parse the HTML content and extract search results."""
         from bs4 import BeautifulSoup
 
-        soup = BeautifulSoup(html_content, '"lxml-xml')
+        soup = BeautifulSoup(html_content, 'lxml')
         results = []
 
         for item in soup.select('#b_results h2'):
@@ -50,7 +50,7 @@ class BingHtmlParser(HtmlParser):
                 title = node.get_text(strip=True)
                 link = decode_bing_url(node['href'])
                 snippet = item.find_next_sibling('p')
-                results.append({'title': title, 'link': link, 'snippet': snippet.get_text(strip=True)})
+                results.append({'title': title, 'link': link, 'snippet': snippet.get_text(strip=True) if snippet else ''})
 
         logger.debug(f"results: {results}")
         return results
\ No newline at end of file
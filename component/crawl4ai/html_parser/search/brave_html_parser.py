@@ -0,0 +1,30 @@
+import logging
+
+from component.crawl4ai.crawler_pool import html_parser
+from component.crawl4ai.html_parser.html_parser import HtmlParser
+
+logger = logging.getLogger(__name__)
+
+
+@html_parser("brave")
+class BraveHtmlParser(HtmlParser):
+    """A parser for Brave search result HTML content."""
+    def parse(self, html_content):
+        """Parse the HTML content and extract search results."""
+        from bs4 import BeautifulSoup
+
+        soup = BeautifulSoup(html_content, 'lxml')
+        results = []
+
+        # web results only, news, videos and discussions clusters have other types
+        for item in soup.select('#results .snippet[data-type="web"]'):
+            node = item.select_one('a[href^="http"]')
+            if node:
+                title = item.select_one('.title, .snippet-title') or node
+                snippet = item.select_one('.snippet-description, .generic-snippet .content')
+                results.append({'title': title.get_text(strip=True),
+                                'link': node['href'],
+                                'snippet': snippet.get_text(' ', strip=True) if snippet else ''})
+
+        logger.debug(f"results: {results}")
+        return results
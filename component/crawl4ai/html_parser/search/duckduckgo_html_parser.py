@@ -0,0 +1,49 @@
+import logging
+import urllib.parse
+
+from component.crawl4ai.crawler_pool import html_parser
+from component.crawl4ai.html_parser.html_parser import HtmlParser
+
+logger = logging.getLogger(__name__)
+
+
+def decode_duckduckgo_url(duckduckgo_url: str) -> str:
+    """The target of a ``duckduckgo.com/l/?uddg=...`` redirect, other links unchanged."""
+    url = urllib.parse.urlparse(duckduckgo_url)
+    target = urllib.parse.parse_qs(url.query).get('uddg')
+    if url.path.startswith('/l/') and target and target[0].startswith('http'):
+        return target[0]
+    if duckduckgo_url.startswith('//'):
+        return 'https:' + duckduckgo_url
+    return duckduckgo_url
+
+
+@html_parser("duckduckgo")
+class DuckDuckGoHtmlParser(HtmlParser):
+    """A parser for DuckDuckGo search result HTML content, of the script and of the html-only site."""
+    def parse(self, html_content):
+        """Parse the HTML content and extract search results."""
+        from bs4 import BeautifulSoup
+
+        soup = BeautifulSoup(html_content, 'lxml')
+        results = []
+
+        for item in soup.select('article[data-testid="result"]'):
+            node = item.select_one('a[data-testid="result-title-a"]')
+            if node and node.get('href'):
+                snippet = item.select_one('[data-result="snippet"]')
+                results.append({'title': node.get_text(strip=True),
+                                'link': node['href'],
+                                'snippet': snippet.get_text(' ', strip=True) if snippet else ''})
+
+        # html.duckduckgo.com, whose links go through a redirect
+        for item in soup.select('#links .result:not(.result--ad)'):
+            node = item.select_one('a.result__a')
+            if node and node.get('href'):
+                snippet = item.select_one('.result__snippet')
+                results.append({'title': node.get_text(strip=True),
+                                'link': decode_duckduckgo_url(node['href']),
+                                'snippet': snippet.get_text(' ', strip=True) if snippet else ''})
+
+        logger.debug(f"results: {results}")
+        return results
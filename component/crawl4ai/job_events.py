@@ -0,0 +1,124 @@
+"""Progress events of crawl jobs.
+
+Every job has a Redis stream ``aduib_task:{task_id}:events`` next to its status
+hash. Status changes are appended by whoever changes the status, and every page
+of the job is appended as it finishes, by the crawl running under
+``report_job_pages(task_id)``, on the async client. Clients follow the stream
+over SSE or long-poll instead of polling the status hash; an event id is a
+position they can resume from.
+"""
+import json
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from component.cache.redis_cache import redis_client, async_redis_client, redis_fallback
+from configs.crawl4ai.types import TaskStatus
+
+MAX_EVENTS = 10_000  # per job, older events are trimmed
+EVENTS_TTL_SEC = 7 * 24 * 60 * 60  # like the status hash
+FINAL_STATUSES = {TaskStatus.COMPLETED.value, TaskStatus.FAILED.value}
+
+JOB_PROGRESS: ContextVar[str | None] = ContextVar("job_progress", default=None)  # job whose pages are reported
+
+
+def events_key(task_id: str) -> str:
+    return f"aduib_task:{task_id}:events"
+
+
+@redis_fallback()
+def publish_event(task_id: str, event: dict, pipe=None):
+    """Append ``event`` to the events of ``task_id``; progress never fails the job.
+
+    With ``pipe`` the commands are only queued on that pipeline, sync or async, to
+    go out with the status update they belong to. Without one they are sent at
+    once, blocking: code running on the event loop uses ``apublish_events``.
+    """
+    if pipe is None:
+        with redis_client.pipeline(transaction=False) as own:
+            publish_event(task_id, event, own)
+            own.execute()
+        return
+    key = events_key(task_id)
+    pipe.xadd(key, {"event": json.dumps({**event, "at": time.time()}, ensure_ascii=False)},
+              maxlen=MAX_EVENTS, approximate=True)
+    pipe.expire(key, EVENTS_TTL_SEC)
+
+
+@redis_fallback()
+async def apublish_events(task_id: str, events: list[dict]):
+    """Append ``events`` to the events of ``task_id`` in one round trip, on the async client."""
+    if not events:
+        return
+    async with async_redis_client.pipeline(transaction=False) as pipe:
+        for event in events:
+            publish_event(task_id, event, pipe)
+        await pipe.execute()
+
+
+def publish_status(task_id: str, status: str, pipe=None, **fields):
+    publish_event(task_id, {"type": "status", "status": str(getattr(status, "value", status)), **fields}, pipe)
+
+
+@contextmanager
+def report_job_pages(task_id: str):
+    """Report the pages crawled in this context as progress of ``task_id``."""
+    token = JOB_PROGRESS.set(task_id)
+    try:
+        yield
+    finally:
+        JOB_PROGRESS.reset(token)
+
+
+def page_event(url: str, success: bool, source: str = "crawl", error: str = None) -> dict:
+    """A page of a job finished; ``source`` tells whether it was crawled, cached or shared."""
+    event = {"type": "page", "url": url, "success": success, "source": source}
+    if error:
+        event["error"] = error
+    return event
+
+
+async def areport_pages(events: list[dict]):
+    """Report the ``page_event`` of finished pages of the current job, in one round trip."""
+    task_id = JOB_PROGRESS.get()
+    if task_id is not None:
+        await apublish_events(task_id, events)
+
+
+async def areport_page(url: str, success: bool, source: str = "crawl", error: str = None):
+    await areport_pages([page_event(url, success, source, error)])
+
+
+async def areport_result_pages(result, source: str):
+    """Report every page of a finished ``handle_crawl_request`` result at once."""
+    if JOB_PROGRESS.get() is None or not isinstance(result, dict) or not isinstance(result.get("results"), list):
+        return
+    await areport_pages([page_event(page.get("url"), bool(result.get("success")), source)
+                         for page in result["results"]])
+
+
+def is_final(event: dict) -> bool:
+    return event.get("type") == "status" and event.get("status") in FINAL_STATUSES
+
+
+def _text(value) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def parse_events(found) -> list[tuple[str, dict]]:
+    """The ``(event id, event)`` pairs of an XREAD reply."""
+    if isinstance(found, dict):  # RESP3 replies are keyed by stream
+        found = found.items()
+    return [(_text(event_id), json.loads(fields.get(b"event") or fields.get("event")))
+            for _, messages in found or [] for event_id, fields in messages]
+
+
+async def read_events(task_id: str, after: str = "0", block_ms: int = None,
+                      count: int = 100) -> list[tuple[str, dict]]:
+    """Events of ``task_id`` after the event id ``after``, waiting up to ``block_ms`` for the first one."""
+    return parse_events(await async_redis_client.xread({events_key(task_id): after}, count=count, block=block_ms))
+
+
+async def wait_events(task_id: str, after: str = "0", timeout: float = 30.0) -> list[tuple[str, dict]]:
+    """``read_events`` waiting up to ``timeout`` seconds; the wait holds a connection, not a thread."""
+    return await read_events(task_id, after, max(1, int(timeout * 1000)))
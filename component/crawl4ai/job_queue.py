@@ -0,0 +1,238 @@
+"""Durable crawl job queue on Redis Streams.
+
+With ``CRAWL_JOB_QUEUE_ENABLED`` the ``/v1/crawl/job`` endpoint enqueues jobs
+instead of running them in the API process. Every priority class has its own
+stream, read by the ``crawl_workers`` consumer group; worker processes
+(``python app.py --worker``) always take the most urgent job first.
+
+A job stays pending in the group until its worker acknowledges it, and the
+worker keeps re-claiming it while it runs. A job left idle for longer than
+``CRAWL_JOB_VISIBILITY_SEC`` belonged to a worker that died and is taken over by
+another one. Failed jobs wait in a delay set with exponential backoff before
+they are queued again, and are dead-lettered once they run out of attempts.
+Progress is reported through the ``aduib_task:{task_id}`` hash, exactly like
+jobs run in the API process.
+"""
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime
+
+from component.cache.crawl_coalescer import NODE_ID
+from component.cache.redis_cache import redis_client, async_redis_client
+from component.crawl4ai.job_events import publish_status
+from configs import config
+from configs.crawl4ai.types import CrawlPriority, TaskStatus
+
+logger = logging.getLogger(__name__)
+
+STREAM_PREFIX = "crawl_jobs:"
+GROUP = "crawl_workers"
+DELAYED_KEY = "crawl_jobs:delayed"  # zset of retries, scored by when they are due
+DEAD_LETTER_STREAM = "crawl_jobs:dead"
+PRIORITIES = [CrawlPriority.INTERACTIVE, CrawlPriority.NORMAL, CrawlPriority.BACKGROUND]  # read in this order
+READ_BLOCK_MS = 1000
+
+JOB_STATS = {"enqueued": 0, "completed": 0, "retried": 0, "dead_lettered": 0, "reclaimed": 0}
+
+
+def is_enabled() -> bool:
+    return config.CRAWL_JOB_QUEUE_ENABLED and config.REDIS_ENABLED
+
+
+def job_stream(priority: CrawlPriority | str | None) -> str:
+    return STREAM_PREFIX + CrawlPriority(priority or CrawlPriority.BACKGROUND).value
+
+
+def retry_delay(attempt: int) -> float:
+    """Seconds before the attempt after ``attempt`` is started."""
+    return config.CRAWL_JOB_RETRY_BACKOFF_SEC * 2 ** (attempt - 1)
+
+
+def enqueue(job: dict, pipe=None) -> str | None:
+    """Queue ``job`` (the arguments of ``Crawl4AIService.run_crawl_job``) and return its message id.
+
+    With ``pipe`` the command is only queued on that pipeline and no id is returned.
+    """
+    job = {**job, "attempt": job.get("attempt", 1)}
+    JOB_STATS["enqueued"] += 1
+    if pipe is not None:
+        pipe.xadd(job_stream(job.get("priority")), {"job": json.dumps(job)})
+        return None
+    message_id = redis_client.xadd(job_stream(job.get("priority")), {"job": json.dumps(job)})
+    return message_id.decode() if isinstance(message_id, bytes) else message_id
+
+
+def ensure_groups():
+    for priority in PRIORITIES:
+        try:
+            redis_client.xgroup_create(job_stream(priority), GROUP, id="0", mkstream=True)
+        except Exception as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+
+def promote_due_retries(now: float = None) -> int:
+    """Move the retries whose backoff is over back to their stream."""
+    promoted = 0
+    for member in redis_client.zrangebyscore(DELAYED_KEY, 0, now or time.time(), start=0, num=100):
+        # only the worker that removes the retry queues it again
+        if redis_client.zrem(DELAYED_KEY, member):
+            job = json.loads(member)
+            redis_client.xadd(job_stream(job.get("priority")), {"job": member})
+            promoted += 1
+    return promoted
+
+
+def _set_task(task_id: str, **fields):
+    redis_client.hset(f"aduib_task:{task_id}", mapping=fields)
+
+
+class CrawlJobWorker:
+    """Runs queued crawl jobs, ``concurrency`` at a time."""
+
+    def __init__(self, concurrency: int = None, consumer: str = NODE_ID):
+        self.concurrency = max(1, concurrency or config.CRAWL_JOB_WORKER_CONCURRENCY)
+        self.consumer = consumer
+        self.running: set[asyncio.Task] = set()
+        self.stopping = asyncio.Event()
+
+    @property
+    def visibility_ms(self) -> int:
+        return int(config.CRAWL_JOB_VISIBILITY_SEC * 1000)
+
+    def stop(self):
+        self.stopping.set()
+
+    async def run(self):
+        from service.crawl4ai_service import Crawl4AIService
+        await asyncio.to_thread(ensure_groups)
+        logger.info(f"Crawl job worker {self.consumer} started, {self.concurrency} jobs at a time")
+        last_reclaim = 0.0
+        while not self.stopping.is_set():
+            try:
+                await asyncio.to_thread(promote_due_retries)
+                free = self.concurrency - len(self.running)
+                if free <= 0:
+                    await asyncio.wait(self.running, timeout=READ_BLOCK_MS / 1000, return_when=asyncio.FIRST_COMPLETED)
+                    continue
+                messages = []
+                if time.monotonic() - last_reclaim > config.CRAWL_JOB_VISIBILITY_SEC / 4:
+                    last_reclaim = time.monotonic()
+                    messages = await asyncio.to_thread(self._reclaim, free)
+                messages = messages or await asyncio.to_thread(self._read, free)
+                for stream, message_id, fields in messages:
+                    task = asyncio.create_task(self._run_job(Crawl4AIService, stream, message_id, fields))
+                    self.running.add(task)
+                    task.add_done_callback(self.running.discard)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Crawl job worker loop error: {e}", exc_info=True)
+                await asyncio.sleep(1)
+        # unfinished jobs are taken over by other workers after the visibility timeout
+        if self.running:
+            await asyncio.wait(self.running, timeout=config.CRAWL_JOB_VISIBILITY_SEC)
+
+    def _read(self, count: int) -> list[tuple[str, str, dict]]:
+        streams = [job_stream(p) for p in PRIORITIES]
+        for stream in streams:
+            found = redis_client.xreadgroup(GROUP, self.consumer, {stream: ">"}, count=count)
+            if found:
+                return _flatten(found)
+        # nothing queued: wait for the first job of any priority
+        return _flatten(redis_client.xreadgroup(GROUP, self.consumer, {s: ">" for s in streams}, count=count,
+                                                block=READ_BLOCK_MS))
+
+    def _reclaim(self, count: int) -> list[tuple[str, str, dict]]:
+        """Jobs of workers that stopped re-claiming them."""
+        claimed = []
+        for priority in PRIORITIES:
+            stream = job_stream(priority)
+            _, messages, *_ = redis_client.xautoclaim(stream, GROUP, self.consumer, self.visibility_ms,
+                                                      start_id="0-0", count=count - len(claimed))
+            claimed.extend((stream, _text(message_id), fields) for message_id, fields in messages if fields)
+            if len(claimed) >= count:
+                break
+        JOB_STATS["reclaimed"] += len(claimed)
+        return claimed
+
+    def _deliveries(self, stream: str, message_id: str) -> int:
+        pending = redis_client.xpending_range(stream, GROUP, min=message_id, max=message_id, count=1)
+        return pending[0]["times_delivered"] if pending else 1
+
+    async def _heartbeat(self, stream: str, message_id: str):
+        while True:
+            await asyncio.sleep(config.CRAWL_JOB_VISIBILITY_SEC / 3)
+            # JUSTID resets the idle time without counting another delivery
+            await asyncio.to_thread(redis_client.xclaim, stream, GROUP, self.consumer, 0, [message_id], justid=True)
+
+    async def _run_job(self, service, stream: str, message_id: str, fields: dict):
+        raw = fields.get(b"job") or fields.get("job")
+        job = json.loads(raw)
+        # deliveries after the first are lost workers, they count as attempts too
+        attempt = job["attempt"] + await asyncio.to_thread(self._deliveries, stream, message_id) - 1
+        heartbeat = asyncio.create_task(self._heartbeat(stream, message_id))
+        try:
+            if attempt > config.CRAWL_JOB_MAX_ATTEMPTS:
+                await asyncio.to_thread(dead_letter, job, "worker lost while running the job")
+            else:
+                await service.run_crawl_job(**{k: v for k, v in job.items() if k != "attempt"})
+                JOB_STATS["completed"] += 1
+        except Exception as e:
+            logger.warning(f"Crawl job {job['task_id']} attempt {attempt} failed: {e}")
+            await asyncio.to_thread(retry_or_dead_letter, job, attempt, str(e))
+        finally:
+            heartbeat.cancel()
+            await asyncio.to_thread(_ack, stream, message_id)
+
+
+def retry_or_dead_letter(job: dict, attempt: int, error: str):
+    if attempt >= config.CRAWL_JOB_MAX_ATTEMPTS:
+        dead_letter(job, error)
+        return
+    delay = retry_delay(attempt)
+    redis_client.zadd(DELAYED_KEY, {json.dumps({**job, "attempt": attempt + 1}): time.time() + delay})
+    _set_task(job["task_id"], error=f"attempt {attempt} failed, retrying in {delay:.0f}s: {error}")
+    publish_status(job["task_id"], TaskStatus.PROCESSING, retry_in_sec=delay, attempt=attempt, error=error)
+    JOB_STATS["retried"] += 1
+
+
+def dead_letter(job: dict, error: str):
+    redis_client.xadd(DEAD_LETTER_STREAM, {"job": json.dumps(job), "error": error, "failed_at": str(time.time())})
+    _set_task(job["task_id"], status=TaskStatus.FAILED, completed_at=datetime.now().isoformat(), error=error)
+    publish_status(job["task_id"], TaskStatus.FAILED, error=error)
+    JOB_STATS["dead_lettered"] += 1
+
+
+def _ack(stream: str, message_id: str):
+    redis_client.xack(stream, GROUP, message_id)
+    redis_client.xdel(stream, message_id)
+
+
+def _text(value) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _flatten(found) -> list[tuple[str, str, dict]]:
+    if isinstance(found, dict):  # RESP3 replies are keyed by stream
+        found = found.items()
+    return [(_text(stream), _text(message_id), fields) for stream, messages in found or []
+            for message_id, fields in messages if fields]
+
+
+async def stats() -> dict:
+    if not is_enabled():
+        return {"enabled": False}
+    try:
+        async with async_redis_client.pipeline(transaction=False) as pipe:
+            for p in PRIORITIES:
+                pipe.xlen(job_stream(p))
+            pipe.zcard(DELAYED_KEY)
+            pipe.xlen(DEAD_LETTER_STREAM)
+            *lengths, delayed, dead = await pipe.execute()
+        depth = {p.value: length for p, length in zip(PRIORITIES, lengths)}
+    except Exception as e:
+        return {"enabled": True, "error": str(e), **JOB_STATS}
+    return {"enabled": True, "queued": depth, "delayed": delayed, "dead_letters": dead, **JOB_STATS}
@@ -0,0 +1,228 @@
+import asyncio
+import logging
+import time
+import uuid
+from contextlib import asynccontextmanager, suppress
+from typing import AsyncIterator
+from urllib.parse import urlparse
+
+from crawl4ai import AsyncWebCrawler, CrawlerRunConfig
+
+logger = logging.getLogger(__name__)
+
+PAGE_RESET_ROUTES = "routes"
+PAGE_RESET_STORAGE = "storage"
+PAGE_RESET_COOKIES = "cookies"
+DEFAULT_PAGE_RESET = [PAGE_RESET_ROUTES, PAGE_RESET_STORAGE, PAGE_RESET_COOKIES]
+# run config options crawl4ai applies to the context it creates for a crawl; pooled pages live in
+# contexts created without them
+CONTEXT_RUN_OPTIONS = ("proxy_config", "locale", "timezone_id", "geolocation", "user_agent", "user_agent_mode",
+                       "magic", "override_navigator", "simulate_user")
+
+
+def context_options(config: CrawlerRunConfig) -> dict:
+    """The options of ``config`` that need a browser context of their own."""
+    return {name: getattr(config, name) for name in CONTEXT_RUN_OPTIONS if getattr(config, name, None)}
+
+
+class PagePool:
+    """Bounded pool of pre-created pages leased to crawls of one pooled browser.
+
+    Pooled pages are registered as crawl4ai sessions on the crawler's browser
+    manager, so a crawl that runs with a leased ``session_id`` reuses the page
+    (and its context) instead of creating and closing one per URL. Pages are reset
+    between leases according to the matched crawl rule's ``page_reset`` list.
+
+    Unless the browser is managed, where every page shares the default context
+    anyway, crawls whose run config sets context options (proxy, locale, user
+    agent, ...) are not served from the pool. Neither are crawls that find every
+    page leased: they already hold a scheduler slot, so they get a page of their
+    own rather than idling the slot.
+    """
+
+    def __init__(self, crawler: AsyncWebCrawler, size: int):
+        self.crawler = crawler
+        self.size = size
+        self._idle: asyncio.Queue[str] = asyncio.Queue()
+        self._created = 0
+        self._closed = False
+        # metrics
+        self.leases = 0
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0  # crawls that needed a context of their own
+        self.overflows = 0  # crawls that found every page leased
+        self.wait_total_sec = 0.0
+        self.wait_max_sec = 0.0
+
+    @property
+    def _browser_manager(self):
+        return self.crawler.crawler_strategy.browser_manager
+
+    @property
+    def _shared_context(self) -> bool:
+        return bool(self._browser_manager.config.use_managed_browser)
+
+    def serves(self, config: CrawlerRunConfig) -> bool:
+        """Whether a crawl with ``config`` can run on a pooled page."""
+        return self._shared_context or not context_options(config)
+
+    async def _create_page(self) -> str:
+        manager = self._browser_manager
+        if self._shared_context:
+            context = manager.default_context
+        else:
+            context = await manager.create_browser_context()
+            await manager.setup_context(context)
+        page = await context.new_page()
+        session_id = f"page_pool_{uuid.uuid4().hex[:12]}"
+        manager.sessions[session_id] = (context, page, time.time())
+        return session_id
+
+    async def _discard(self, session_id: str):
+        self._created -= 1
+        with suppress(Exception):
+            await self._browser_manager.kill_session(session_id)
+
+    def _is_alive(self, session_id: str) -> bool:
+        session = self._browser_manager.sessions.get(session_id)
+        return session is not None and not session[1].is_closed()
+
+    async def prewarm(self, count: int):
+        """Create up to ``count`` idle pages ahead of the first lease."""
+        while self._created < min(count, self.size) and not self._closed:
+            self._created += 1
+            try:
+                self._idle.put_nowait(await self._create_page())
+            except Exception as e:
+                self._created -= 1
+                logger.warning(f"Page pool prewarm failed: {e}")
+                return
+
+    @property
+    def exhausted(self) -> bool:
+        """Whether every page is leased and no more may be created."""
+        return self._idle.empty() and self._created >= self.size
+
+    async def _acquire(self) -> str:
+        try:
+            session_id = self._idle.get_nowait()
+            self.hits += 1
+        except asyncio.QueueEmpty:
+            if self._created < self.size:
+                self.misses += 1
+                self._created += 1
+                try:
+                    return await self._create_page()
+                except Exception:
+                    self._created -= 1
+                    raise
+            session_id = await self._idle.get()
+            self.hits += 1
+        if not self._is_alive(session_id):
+            # crawl4ai expired the session or the page crashed: replace it
+            await self._discard(session_id)
+            self._created += 1
+            try:
+                return await self._create_page()
+            except Exception:
+                self._created -= 1
+                raise
+        return session_id
+
+    async def _reset(self, session_id: str, page_reset: list[str]):
+        context, page, _ = self._browser_manager.sessions[session_id]
+        if PAGE_RESET_ROUTES in page_reset:
+            await page.unroute_all(behavior="ignoreErrors")
+        if PAGE_RESET_STORAGE in page_reset:
+            await page.evaluate(
+                "() => { try { localStorage.clear(); sessionStorage.clear(); } catch (e) {} }"
+            )
+        if PAGE_RESET_COOKIES in page_reset:
+            if self._shared_context:
+                # the managed browser shares one context between pages: only drop
+                # the cookies of the site this lease visited
+                host = urlparse(page.url).hostname
+                if host:
+                    await context.clear_cookies(domain=host)
+            else:
+                await context.clear_cookies()
+        await page.goto("about:blank")
+
+    async def _release(self, session_id: str, page_reset: list[str]):
+        if self._closed or not self._is_alive(session_id):
+            await self._discard(session_id)
+            return
+        try:
+            await self._reset(session_id, page_reset)
+        except Exception as e:
+            logger.debug(f"Page pool reset failed, discarding page: {e}")
+            await self._discard(session_id)
+            return
+        self._idle.put_nowait(session_id)
+
+    @asynccontextmanager
+    async def lease(self, page_reset: list[str] | None = None) -> AsyncIterator[str]:
+        """Lease a pooled page and yield its crawl4ai session id."""
+        started = time.perf_counter()
+        session_id = await self._acquire()
+        waited = time.perf_counter() - started
+        self.leases += 1
+        self.wait_total_sec += waited
+        self.wait_max_sec = max(self.wait_max_sec, waited)
+        try:
+            yield session_id
+        finally:
+            await self._release(session_id, DEFAULT_PAGE_RESET if page_reset is None else page_reset)
+
+    @property
+    def in_use(self) -> int:
+        """Pages currently leased to a crawl."""
+        return self._created - self._idle.qsize()
+
+    def close(self):
+        """Stop handing out pages; the browser close reclaims the sessions."""
+        self._closed = True
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "created": self._created,
+            "idle": self._idle.qsize(),
+            "in_use": self.in_use,
+            "leases": self.leases,
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "overflows": self.overflows,
+            "hit_rate": self.hits / self.leases if self.leases else 0.0,
+            "lease_wait_avg_ms": self.wait_total_sec * 1000 / self.leases if self.leases else 0.0,
+            "lease_wait_max_ms": self.wait_max_sec * 1000,
+        }
+
+
+@asynccontextmanager
+async def lease_page(pool: PagePool | None, url: str, config: CrawlerRunConfig | None) -> AsyncIterator[
+    CrawlerRunConfig | None]:
+    """Yield ``config`` bound to a leased pooled page when the crawl can use one.
+
+    Crawls that already carry a ``session_id``, that do not navigate (raw HTML,
+    local files), that need a context of their own or that find every pooled page
+    leased keep their config untouched, crawl4ai creates their page.
+    """
+    config = config or CrawlerRunConfig()
+    if pool is None or config.session_id or not url.startswith(("http://", "https://")):
+        yield config
+        return
+    if not pool.serves(config):
+        pool.bypassed += 1
+        yield config
+        return
+    if pool.exhausted:
+        # the crawl holds its scheduler slot already, waiting for a page would leave the slot idle
+        pool.overflows += 1
+        yield config
+        return
+    crawl_rule = (config.shared_data or {}).get("crawl_rule")
+    async with pool.lease(getattr(crawl_rule, "page_reset", None)) as session_id:
+        yield config.clone(session_id=session_id)
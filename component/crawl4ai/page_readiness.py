@@ -0,0 +1,193 @@
+"""Rule-driven page readiness.
+
+After navigation a page is waited on according to the matched ``CrawlRule``:
+``selector`` (an element is attached), ``network_idle`` (no request in flight for
+``ready_quiet_ms``), ``dom_settle`` (no DOM mutation for ``ready_quiet_ms``) or
+``none``. Observed waits are tracked per domain and shrink the timeout of
+domains that become ready quickly; a condition that keeps timing out on a domain
+is skipped there, and re-checked every ``RETRY_EVERY`` crawls.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from contextlib import suppress
+from dataclasses import dataclass
+from urllib.parse import urlparse
+from weakref import WeakKeyDictionary
+
+from patchright.async_api import Page
+
+from component.crawl4ai.page_report import report_section
+from configs.crawl4ai.types import CrawlRule
+
+logger = logging.getLogger(__name__)
+
+READY_NONE = "none"
+READY_SELECTOR = "selector"
+READY_NETWORK_IDLE = "network_idle"
+READY_DOM_SETTLE = "dom_settle"
+
+EWMA_ALPHA = 0.2
+MIN_SAMPLES = 3
+TIMEOUT_FACTOR = 3.0  # adapted timeout: this many times the usual wait of the domain
+MIN_TIMEOUT_MS = 250
+MAX_MISSES = 3  # consecutive timeouts before a domain stops waiting on its condition
+RETRY_EVERY = 20
+MAX_DOMAINS = 10_000
+
+_DOM_SETTLE_JS = """([settleMs, timeoutMs]) => new Promise(resolve => {
+    let timer = null;
+    const observer = new MutationObserver(() => { clearTimeout(timer); timer = setTimeout(done, settleMs); });
+    const deadline = setTimeout(done, timeoutMs);
+    function done() { observer.disconnect(); clearTimeout(timer); clearTimeout(deadline); resolve(); }
+    observer.observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+    timer = setTimeout(done, settleMs);
+})"""
+
+
+@dataclass
+class DomainReadiness:
+    ewma_ms: float = 0.0
+    samples: int = 0
+    misses: int = 0
+    skipped: int = 0
+
+    def budget_ms(self, timeout_ms: int) -> int:
+        """Wait budget for the next crawl; 0 skips the condition."""
+        if self.misses >= MAX_MISSES:
+            if self.skipped < RETRY_EVERY:
+                return 0
+            self.skipped = 0
+        if self.samples < MIN_SAMPLES:
+            return timeout_ms
+        return int(min(timeout_ms, max(MIN_TIMEOUT_MS, TIMEOUT_FACTOR * self.ewma_ms)))
+
+    def observe(self, waited_ms: float, timed_out: bool):
+        self.misses = self.misses + 1 if timed_out else 0
+        self.ewma_ms = waited_ms if not self.samples else EWMA_ALPHA * waited_ms + (1 - EWMA_ALPHA) * self.ewma_ms
+        self.samples += 1
+
+
+READINESS: OrderedDict[str, DomainReadiness] = OrderedDict()  # domain -> observed readiness, LRU
+
+
+def _domain_readiness(url: str) -> DomainReadiness:
+    domain = urlparse(url).netloc
+    readiness = READINESS.get(domain)
+    if readiness is None:
+        readiness = READINESS[domain] = DomainReadiness()
+        if len(READINESS) > MAX_DOMAINS:
+            READINESS.popitem(last=False)
+    else:
+        READINESS.move_to_end(domain)
+    return readiness
+
+
+def ready_condition(crawl_rule: CrawlRule | None) -> str:
+    if crawl_rule is None:
+        return READY_NONE
+    if crawl_rule.ready_condition:
+        return crawl_rule.ready_condition
+    # rules that extract a css selector are ready once it is there
+    return READY_SELECTOR if crawl_rule.css_selector else READY_NONE
+
+
+class _NetworkTracker:
+    """Requests in flight on a page, tracked from before the navigation starts."""
+
+    def __init__(self, page: Page):
+        self.page = page
+        self.in_flight: set = set()
+        self.last_activity = time.monotonic()
+        page.on("request", self._started)
+        page.on("requestfinished", self._finished)
+        page.on("requestfailed", self._finished)
+
+    def _started(self, request):
+        self.in_flight.add(request)
+        self.last_activity = time.monotonic()
+
+    def _finished(self, request):
+        self.in_flight.discard(request)
+        self.last_activity = time.monotonic()
+
+    async def wait_idle(self, quiet_ms: int, timeout_ms: int):
+        deadline = time.monotonic() + timeout_ms / 1000
+        quiet = quiet_ms / 1000
+        while True:
+            now = time.monotonic()
+            if not self.in_flight and now - self.last_activity >= quiet:
+                return
+            if now >= deadline:
+                raise asyncio.TimeoutError()
+            await asyncio.sleep(min(quiet / 4, deadline - now))
+
+    def close(self):
+        for event, listener in (("request", self._started), ("requestfinished", self._finished),
+                                ("requestfailed", self._finished)):
+            with suppress(Exception):
+                self.page.remove_listener(event, listener)
+
+
+_TRACKERS: WeakKeyDictionary = WeakKeyDictionary()  # page -> network tracker of the current crawl
+
+
+def prepare_readiness(page: Page, crawl_rule: CrawlRule | None):
+    """Start what the readiness condition has to observe from before navigation."""
+    previous = _TRACKERS.pop(page, None)
+    if previous is not None:
+        previous.close()
+    if ready_condition(crawl_rule) == READY_NETWORK_IDLE:
+        _TRACKERS[page] = _NetworkTracker(page)
+
+
+async def wait_until_ready(page: Page, url: str, crawl_rule: CrawlRule | None):
+    """Wait for the rule's readiness condition and record how long it took."""
+    condition = ready_condition(crawl_rule)
+    tracker = _TRACKERS.pop(page, None)
+    try:
+        if condition == READY_NONE:
+            return
+        readiness = _domain_readiness(url)
+        budget_ms = readiness.budget_ms(crawl_rule.ready_timeout_ms)
+        if budget_ms == 0:
+            readiness.skipped += 1
+            report_section("readiness").update({"condition": condition, "skipped": True})
+            return
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            if condition == READY_SELECTOR:
+                await page.wait_for_selector(crawl_rule.ready_selector or crawl_rule.css_selector,
+                                             state="attached", timeout=budget_ms)
+            elif condition == READY_NETWORK_IDLE and tracker is not None:
+                await tracker.wait_idle(crawl_rule.ready_quiet_ms, budget_ms)
+            elif condition == READY_DOM_SETTLE:
+                await asyncio.wait_for(
+                    page.evaluate(_DOM_SETTLE_JS, [crawl_rule.ready_quiet_ms, budget_ms]),
+                    timeout=budget_ms / 1000 + 1,
+                )
+        except Exception as e:
+            timed_out = True
+            logger.debug(f"Readiness condition {condition} not met for {url} within {budget_ms}ms: {e}")
+        waited_ms = (time.perf_counter() - started) * 1000
+        readiness.observe(waited_ms, timed_out)
+        report_section("readiness").update({
+            "condition": condition,
+            "waited_ms": round(waited_ms, 1),
+            "timeout_ms": budget_ms,
+            "timed_out": timed_out,
+        })
+    finally:
+        if tracker is not None:
+            tracker.close()
+
+
+def get_readiness_stats(limit: int = 50) -> dict:
+    """Readiness of the most recently crawled domains."""
+    domains = list(READINESS.items())[-limit:]
+    return {
+        domain: {"ewma_ms": round(r.ewma_ms, 1), "samples": r.samples, "misses": r.misses}
+        for domain, r in reversed(domains)
+    }
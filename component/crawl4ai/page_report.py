@@ -0,0 +1,32 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+# report of the page crawl running in the current task, filled in by the crawler hooks
+PAGE_REPORT: ContextVar[dict | None] = ContextVar("page_report", default=None)
+
+
+@contextmanager
+def collect_page_report() -> Iterator[dict]:
+    """Collect what the hooks report about one page crawl."""
+    report = {}
+    token = PAGE_REPORT.set(report)
+    try:
+        yield report
+    finally:
+        PAGE_REPORT.reset(token)
+
+
+def report_section(name: str) -> dict:
+    """Section ``name`` of the current page report; a detached dict outside of a crawl."""
+    report = PAGE_REPORT.get()
+    if report is None:
+        return {}
+    return report.setdefault(name, {})
+
+
+def attach_page_report(result, report: dict):
+    """Expose the report as ``metadata["crawl_report"]`` of a single crawl result."""
+    if not report or not hasattr(result, "metadata"):
+        return  # deep crawls return lists or generators of already reported pages
+    result.metadata = {**(result.metadata or {}), "crawl_report": report}
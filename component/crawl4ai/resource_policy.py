@@ -0,0 +1,170 @@
+"""Per-rule network resource blocking.
+
+A ``ResourceGuard`` intercepts every request of a crawled page and aborts the
+resource types and URL patterns the matched ``CrawlRule`` blocks, unless the
+request goes to one of the rule's allowed domains. Routes are installed on the
+page, not on the context: the managed browser shares one context between pooled
+pages that may be crawling under different rules.
+"""
+import fnmatch
+import logging
+import re
+from contextlib import suppress
+from urllib.parse import urlparse
+from weakref import WeakKeyDictionary
+
+from patchright.async_api import Page, Route
+
+from component.crawl4ai.page_report import report_section
+from configs.crawl4ai.types import CrawlRule, CrawlResultType
+
+logger = logging.getLogger(__name__)
+
+# blocked for text results when no screenshot is taken
+DEFAULT_BLOCKED_RESOURCE_TYPES = ["image", "media", "font"]
+DEFAULT_BLOCKED_URL_PATTERNS = [
+    "*://*.google-analytics.com/*",
+    "*://*.googletagmanager.com/*",
+    "*://*.googlesyndication.com/*",
+    "*://*.doubleclick.net/*",
+    "*://connect.facebook.net/*",
+    "*://*.hotjar.com/*",
+    "*://*.scorecardresearch.com/*",
+    "*://hm.baidu.com/*",
+    "*://*.cnzz.com/*",
+]
+SIZE_EWMA_ALPHA = 0.1
+# transfer size per resource type, seeded with typical values and refined from
+# the Resource Timing entries of pages that did load them
+OBSERVED_SIZES: dict[str, float] = {
+    "image": 40_000, "media": 400_000, "font": 50_000, "script": 30_000, "stylesheet": 20_000,
+}
+DEFAULT_SIZE_BYTES = 10_000
+FONT_SUFFIXES = (".woff", ".woff2", ".ttf", ".otf", ".eot")
+
+RESOURCE_STATS = {"crawls": 0, "blocked_requests": 0, "estimated_saved_bytes": 0, "estimated_saved_ms": 0.0}
+
+_GUARDS: WeakKeyDictionary = WeakKeyDictionary()  # page -> installed guard
+
+_TIMING_JS = """() => {
+    const nav = performance.getEntriesByType('navigation')[0];
+    const resources = performance.getEntriesByType('resource');
+    return {
+        load_ms: nav ? (nav.loadEventEnd || nav.duration) : performance.now(),
+        transferred: (nav ? nav.transferSize : 0) + resources.reduce((sum, r) => sum + (r.transferSize || 0), 0),
+        resources: resources.map(r => [r.initiatorType, r.name, r.transferSize || 0]),
+    };
+}"""
+
+
+def _resource_type(initiator_type: str, url: str) -> str | None:
+    """Map a Resource Timing entry onto the Playwright resource type it was requested as."""
+    if urlparse(url).path.lower().endswith(FONT_SUFFIXES):
+        return "font"
+    return {"img": "image", "image": "image", "video": "media", "audio": "media",
+            "script": "script", "link": "stylesheet", "css": "stylesheet"}.get(initiator_type)
+
+
+def _observe_sizes(resources: list):
+    for initiator_type, url, size in resources:
+        resource_type = _resource_type(initiator_type, url)
+        if resource_type and size > 0:
+            previous = OBSERVED_SIZES.get(resource_type, size)
+            OBSERVED_SIZES[resource_type] = SIZE_EWMA_ALPHA * size + (1 - SIZE_EWMA_ALPHA) * previous
+
+
+class ResourceGuard:
+    """Request interception enforcing one crawl rule's resource policy on one page."""
+
+    def __init__(self, block_types: list[str], block_patterns: list[str], allow_domains: list[str]):
+        self.block_types = frozenset(block_types)
+        self.pattern = re.compile("|".join(fnmatch.translate(p) for p in block_patterns)) if block_patterns else None
+        self.allow_domains = tuple(domain.lower().lstrip(".") for domain in allow_domains)
+        self.blocked: dict[str, int] = {}
+        self.allowed = 0
+
+    @classmethod
+    def for_rule(cls, crawl_rule: CrawlRule | None, screenshot: bool) -> "ResourceGuard":
+        if crawl_rule is None:
+            return cls([], DEFAULT_BLOCKED_URL_PATTERNS, [])
+        block_types = crawl_rule.block_resource_types
+        if block_types is None:
+            renders_page = screenshot or crawl_rule.crawl_result_type == CrawlResultType.PDF
+            block_types = [] if renders_page else DEFAULT_BLOCKED_RESOURCE_TYPES
+        block_patterns = crawl_rule.block_url_patterns
+        if block_patterns is None:
+            block_patterns = DEFAULT_BLOCKED_URL_PATTERNS
+        return cls(block_types, block_patterns, crawl_rule.allow_domains)
+
+    @property
+    def active(self) -> bool:
+        return bool(self.block_types or self.pattern)
+
+    def should_block(self, url: str, resource_type: str) -> bool:
+        if resource_type == "document":
+            return False  # never abort the navigation itself or its frames
+        host = urlparse(url).hostname or ""
+        if any(host == domain or host.endswith("." + domain) for domain in self.allow_domains):
+            return False
+        if resource_type in self.block_types:
+            return True
+        return self.pattern is not None and self.pattern.match(url) is not None
+
+    async def handle(self, route: Route):
+        request = route.request
+        with suppress(Exception):  # the page may close while requests are in flight
+            if self.should_block(request.url, request.resource_type):
+                self.blocked[request.resource_type] = self.blocked.get(request.resource_type, 0) + 1
+                await route.abort("blockedbyclient")
+            else:
+                self.allowed += 1
+                await route.fallback()
+
+    def report(self, timing: dict | None) -> dict:
+        saved_bytes = sum(count * OBSERVED_SIZES.get(resource_type, DEFAULT_SIZE_BYTES)
+                          for resource_type, count in self.blocked.items())
+        report = {
+            "blocked_requests": sum(self.blocked.values()),
+            "blocked_by_type": dict(self.blocked),
+            "allowed_requests": self.allowed,
+            "estimated_saved_bytes": int(saved_bytes),
+        }
+        if timing and timing.get("transferred") and timing.get("load_ms"):
+            # transfer time of the blocked bytes at the throughput this page achieved
+            throughput = timing["transferred"] / timing["load_ms"]
+            report.update({
+                "transferred_bytes": timing["transferred"],
+                "load_ms": round(timing["load_ms"], 1),
+                "estimated_saved_ms": round(saved_bytes / throughput, 1),
+            })
+        return report
+
+
+async def install_resource_guard(page: Page, crawl_rule: CrawlRule | None, screenshot: bool):
+    """Replace the page's resource guard with one for ``crawl_rule``."""
+    previous = _GUARDS.pop(page, None)
+    if previous is not None:
+        with suppress(Exception):
+            await page.unroute("**/*", previous.handle)
+    guard = ResourceGuard.for_rule(crawl_rule, screenshot)
+    if not guard.active:
+        return
+    await page.route("**/*", guard.handle)
+    _GUARDS[page] = guard
+
+
+async def report_resource_savings(page: Page):
+    """Add the guard's savings to the current page report."""
+    guard = _GUARDS.get(page)
+    if guard is None:
+        return
+    timing = None
+    with suppress(Exception):
+        timing = await page.evaluate(_TIMING_JS)
+        _observe_sizes(timing.pop("resources"))
+    report = guard.report(timing)
+    report_section("resource_policy").update(report)
+    RESOURCE_STATS["crawls"] += 1
+    RESOURCE_STATS["blocked_requests"] += report["blocked_requests"]
+    RESOURCE_STATS["estimated_saved_bytes"] += report["estimated_saved_bytes"]
+    RESOURCE_STATS["estimated_saved_ms"] += report.get("estimated_saved_ms", 0.0)
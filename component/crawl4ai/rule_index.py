@@ -0,0 +1,117 @@
+from dataclasses import dataclass, field
+
+from configs.crawl4ai.types import CrawlRuleGroup, CrawlRule
+
+DEFAULT_RULE_URL = "default"
+WILDCARD_PREFIX = "*."
+
+
+def split_url(url: str) -> tuple[str, str]:
+    """Split a URL (or bare host) into ``(host, path)``; the host keeps its port."""
+    if "://" in url:
+        url = url.split("://", 1)[1]
+    host, sep, path = url.partition("/")
+    path = sep + path.split("?", 1)[0].split("#", 1)[0]
+    return host.lower(), path or "/"
+
+
+@dataclass
+class _Entries:
+    """Rules attached to one host, ordered by match precedence."""
+    rules: list[tuple[int, str, CrawlRule]] = field(default_factory=list)
+
+    def add(self, group_rank: int, path_prefix: str, rule: CrawlRule):
+        if any(rank == group_rank and prefix == path_prefix for rank, prefix, _ in self.rules):
+            return  # first rule for a host/prefix wins within a group
+        self.rules.append((group_rank, path_prefix, rule))
+        # later groups first, then the longest path prefix
+        self.rules.sort(key=lambda item: (-item[0], -len(item[1])))
+
+    def match(self, path: str) -> CrawlRule | None:
+        for _, prefix, rule in self.rules:
+            if path.startswith(prefix):
+                return rule
+        return None
+
+
+@dataclass
+class _TrieNode:
+    children: dict[str, "_TrieNode"] = field(default_factory=dict)
+    entries: _Entries | None = None
+
+
+class _HostIndex:
+    """Exact-host hash map plus a reversed-label trie for ``*.domain`` rules."""
+
+    def __init__(self):
+        self.exact: dict[str, _Entries] = {}
+        self.wildcards = _TrieNode()
+
+    def add(self, group_rank: int, rule: CrawlRule):
+        host, path = split_url(rule.url)
+        path_prefix = "" if path == "/" else path
+        if host.startswith(WILDCARD_PREFIX):
+            node = self.wildcards
+            for label in reversed(host[len(WILDCARD_PREFIX):].split(".")):
+                node = node.children.setdefault(label, _TrieNode())
+            if node.entries is None:
+                node.entries = _Entries()
+            node.entries.add(group_rank, path_prefix, rule)
+        else:
+            self.exact.setdefault(host, _Entries()).add(group_rank, path_prefix, rule)
+
+    def match(self, host: str, path: str) -> CrawlRule | None:
+        entries = self.exact.get(host)
+        if entries is not None:
+            rule = entries.match(path)
+            if rule is not None:
+                return rule
+        # walk labels from the TLD down; the deepest matching wildcard wins
+        labels = host.split(":", 1)[0].split(".")
+        node = self.wildcards
+        best = None
+        for depth, label in enumerate(reversed(labels)):
+            node = node.children.get(label)
+            if node is None:
+                break
+            # a wildcard only covers strict subdomains
+            if node.entries is not None and depth < len(labels) - 1:
+                rule = node.entries.match(path)
+                if rule is not None:
+                    best = rule
+        return best
+
+
+class RuleIndex:
+    """Precompiled crawl rule lookup built once per rule (re)load.
+
+    Matching precedence mirrors the original linear scan: across groups the last
+    matching group wins, within a group the first matching rule wins. Exact hosts
+    beat wildcard subdomain rules, and longer path prefixes beat shorter ones.
+    """
+
+    def __init__(self, groups: list[CrawlRuleGroup]):
+        self.groups: dict[str, CrawlRuleGroup] = {}
+        self._all = _HostIndex()
+        self._by_group: dict[str, _HostIndex] = {}
+        for rank, group in enumerate(groups):
+            if group.name not in self.groups:
+                self.groups[group.name] = group
+                self._by_group[group.name] = _HostIndex()
+            for rule in group.rules:
+                self._all.add(rank, rule)
+                if self.groups[group.name] is group:
+                    self._by_group[group.name].add(0, rule)
+        self.default_rule = self._all.match(DEFAULT_RULE_URL, "/")
+
+    def match(self, url: str) -> CrawlRule | None:
+        """Match ``url`` against every group, falling back to the default rule."""
+        rule = self._all.match(*split_url(url))
+        return rule if rule is not None else self.default_rule
+
+    def match_in_group(self, group_name: str, url: str) -> CrawlRule | None:
+        """Match ``url`` against a single group, without default fallback."""
+        host_index = self._by_group.get(group_name)
+        if host_index is None:
+            return None
+        return host_index.match(*split_url(url))
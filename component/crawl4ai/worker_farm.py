@@ -0,0 +1,299 @@
+"""Optional multi-process browser worker farm.
+
+When ``CRAWLER_WORKER_PROCESSES`` > 0 the API/MCP process keeps no browsers of its
+own: every non-streaming crawl request is forwarded over multiprocessing queues to
+the least-loaded worker process, which runs ``Crawl4AIService.handle_crawl_request``
+against its own crawler pool and event loop. The monitor pings every worker and
+replaces the ones that exit, or that answer nothing for
+``CRAWLER_WORKER_UNRESPONSIVE_SEC`` while they have requests in flight. A request
+that runs past its timeout fails on its own and is cancelled on its worker.
+"""
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from crawl4ai import CrawlerRunConfig
+from fastapi import HTTPException
+
+from configs import config
+
+logger = logging.getLogger(__name__)
+
+_MSG_CRAWL = "crawl"
+_MSG_RULES = "rules"
+_MSG_STOP = "stop"
+_MSG_PING = "ping"
+_MSG_CANCEL = "cancel"
+MONITOR_INTERVAL_SEC = 5
+
+
+@dataclass(eq=False)
+class _Worker:
+    worker_id: int
+    process: multiprocessing.Process
+    requests: Any  # multiprocessing.Queue
+    in_flight: set[int] = field(default_factory=set)
+    completed: int = 0
+    restarts: int = 0
+    last_seen: float = field(default_factory=time.monotonic)  # last message from the process
+
+
+WORKERS: list[_Worker] = []
+PENDING: dict[int, asyncio.Future] = {}
+_request_ids = itertools.count()
+_responses = None
+_reader: threading.Thread | None = None
+_monitor: asyncio.Task | None = None
+_loop: asyncio.AbstractEventLoop | None = None
+_rules: list[dict] = []
+_in_worker = False
+
+
+def is_enabled() -> bool:
+    """Whether crawls of this process should be dispatched to worker processes."""
+    return bool(WORKERS) and not _in_worker
+
+
+def _spawn(worker_id: int) -> _Worker:
+    ctx = multiprocessing.get_context("spawn")
+    requests = ctx.Queue()
+    process = ctx.Process(
+        target=_worker_main,
+        args=(worker_id, requests, _responses, _rules),
+        name=f"crawl-worker-{worker_id}",
+        daemon=True,
+    )
+    process.start()
+    logger.info(f"Started crawl worker {worker_id} (pid {process.pid})")
+    return _Worker(worker_id=worker_id, process=process, requests=requests)
+
+
+def start(processes: int, rules: list[dict]):
+    """Start ``processes`` worker processes sharing the given crawl rules."""
+    global _responses, _reader, _monitor, _loop, _rules
+    if WORKERS:
+        return
+    _loop = asyncio.get_running_loop()
+    _rules = rules
+    _responses = multiprocessing.get_context("spawn").Queue()
+    for worker_id in range(processes):
+        WORKERS.append(_spawn(worker_id))
+    _reader = threading.Thread(target=_read_responses, name="crawl-worker-reader", daemon=True)
+    _reader.start()
+    _monitor = asyncio.create_task(_monitor_workers())
+
+
+async def stop():
+    """Stop all worker processes and fail whatever is still in flight."""
+    global _monitor
+    if not WORKERS:
+        return
+    if _monitor:
+        _monitor.cancel()
+        _monitor = None
+    for worker in WORKERS:
+        worker.requests.put((_MSG_STOP, None))
+    for worker in WORKERS:
+        await asyncio.to_thread(worker.process.join, 30)
+        if worker.process.is_alive():
+            worker.process.kill()
+    WORKERS.clear()
+    _responses.put(None)  # wake up the reader so it exits
+    for future in PENDING.values():
+        if not future.done():
+            future.set_exception(RuntimeError("Crawl worker farm stopped"))
+    PENDING.clear()
+
+
+def broadcast_rules(rules: list[dict]):
+    """Forward reloaded crawl rules to every worker."""
+    global _rules
+    _rules = rules
+    for worker in WORKERS:
+        worker.requests.put((_MSG_RULES, rules))
+
+
+def request_timeout(kwargs: dict) -> float:
+    """Seconds a worker may take for a request: its deadline, or the page timeout of every page it may crawl.
+
+    A url matched by a deep or adaptive crawl rule may crawl up to the page limit of the rule.
+    """
+    if kwargs.get("deadline_sec"):
+        budget = max(kwargs["deadline_sec"], 0)
+    else:
+        from component.crawl4ai.crawler_pool import get_rule_by_url, get_rule_by_group_and_url
+        urls = kwargs.get("urls") or ()
+        rule = None
+        if urls:
+            rule_group = kwargs.get("rule_group")
+            rule = get_rule_by_group_and_url(rule_group, urls[0]) if rule_group else get_rule_by_url(urls[0])
+        page_timeout_sec = CrawlerRunConfig.load(kwargs.get("crawler_config") or {}).page_timeout / 1000
+        budget = page_timeout_sec * max(1, len(urls)) * (rule.max_pages() if rule else 1)
+    return budget + config.CRAWLER_WORKER_TIMEOUT_MARGIN_SEC
+
+
+async def submit(**kwargs) -> Any:
+    """Run ``handle_crawl_request(**kwargs)`` on the least-loaded worker."""
+    worker = min(WORKERS, key=lambda w: len(w.in_flight))
+    request_id = next(_request_ids)
+    future = asyncio.get_running_loop().create_future()
+    PENDING[request_id] = future
+    worker.in_flight.add(request_id)
+    worker.requests.put((_MSG_CRAWL, (request_id, kwargs)))
+    timeout = request_timeout(kwargs)
+    try:
+        return await asyncio.wait_for(future, timeout)
+    except asyncio.TimeoutError:
+        # only this request gave up, the others on the worker go on; a hung worker is the monitor's job
+        logger.warning(f"Crawl worker {worker.worker_id}: no answer to request {request_id} within {timeout:.0f}s")
+        worker.requests.put((_MSG_CANCEL, request_id))
+        raise HTTPException(status_code=504, detail="Crawl worker timed out")
+    finally:
+        PENDING.pop(request_id, None)
+        worker.in_flight.discard(request_id)
+
+
+def stats() -> dict:
+    return {
+        "workers": [
+            {
+                "worker_id": w.worker_id,
+                "pid": w.process.pid,
+                "alive": w.process.is_alive(),
+                "in_flight": len(w.in_flight),
+                "completed": w.completed,
+                "restarts": w.restarts,
+            }
+            for w in WORKERS
+        ],
+        "pending": len(PENDING),
+    }
+
+
+def _resolve(worker_id: int, request_id: int | None, ok: bool, payload: Any):
+    for worker in WORKERS:
+        if worker.worker_id == worker_id:
+            worker.last_seen = time.monotonic()
+            if request_id is not None:
+                worker.completed += 1
+    if request_id is None:
+        return  # an answer to a ping
+    future = PENDING.get(request_id)
+    if future is None or future.done():
+        return
+    if ok:
+        future.set_result(payload)
+    else:
+        status_code, detail = payload
+        future.set_exception(HTTPException(status_code=status_code, detail=detail))
+
+
+def _read_responses():
+    while True:
+        message = _responses.get()
+        if message is None:
+            return
+        _loop.call_soon_threadsafe(_resolve, *message)
+
+
+def _recycle(worker: _Worker, reason: str):
+    """Replace ``worker`` with a new process and fail the requests it was running."""
+    if worker not in WORKERS:
+        return  # replaced already
+    logger.error(f"Crawl worker {worker.worker_id} {reason}, restarting")
+    if worker.process.is_alive():
+        worker.process.kill()
+    for request_id in worker.in_flight:
+        future = PENDING.get(request_id)
+        if future and not future.done():
+            future.set_exception(HTTPException(status_code=503, detail="Crawl worker crashed"))
+    replacement = _spawn(worker.worker_id)
+    replacement.restarts = worker.restarts + 1
+    WORKERS[WORKERS.index(worker)] = replacement
+
+
+def _check_workers():
+    now = time.monotonic()
+    for worker in list(WORKERS):
+        if not worker.process.is_alive():
+            _recycle(worker, f"died (exit code {worker.process.exitcode})")
+        elif worker.in_flight and now - worker.last_seen > config.CRAWLER_WORKER_UNRESPONSIVE_SEC:
+            _recycle(worker, f"answered nothing for {now - worker.last_seen:.0f}s")
+    for worker in WORKERS:
+        worker.requests.put((_MSG_PING, None))
+
+
+async def _monitor_workers():
+    """Replace crashed or hung workers and fail the requests they were running."""
+    while True:
+        await asyncio.sleep(MONITOR_INTERVAL_SEC)
+        _check_workers()
+
+
+# ── worker process side ──────────────────────────────────────
+
+def _worker_main(worker_id: int, requests, responses, rules: list[dict]):
+    global _in_worker
+    _in_worker = True
+    asyncio.run(_worker_loop(worker_id, requests, responses, rules))
+
+
+async def _worker_loop(worker_id: int, requests, responses, rules: list[dict]):
+    from app_factory import create_app_with_configs, init_crawler_runtime, init_apps
+    from component.crawl4ai.crawler_pool import change_crawl_rule, prewarm_pool, janitor, close_all
+    from component.log.app_logging import init_logging
+    from configs import config
+    from service.crawl4ai_service import Crawl4AIService
+
+    app = create_app_with_configs()
+    init_logging(app)
+    init_apps(app)
+    init_crawler_runtime()
+    change_crawl_rule(rules)
+    await prewarm_pool(config.CRAWLER_PREWARM)
+    janitor_task = asyncio.create_task(janitor())
+    tasks: dict[int, asyncio.Task] = {}  # request id -> running request
+
+    async def run(request_id: int, kwargs: dict):
+        started = time.perf_counter()
+        try:
+            result = await Crawl4AIService.handle_crawl_request(**kwargs)
+            responses.put((worker_id, request_id, True, result))
+        except HTTPException as e:
+            responses.put((worker_id, request_id, False, (e.status_code, e.detail)))
+        except Exception as e:
+            logger.error(f"Crawl worker {worker_id} request failed: {e}", exc_info=True)
+            responses.put((worker_id, request_id, False, (500, str(e))))
+        logger.debug(f"Crawl worker {worker_id} finished request {request_id} in {time.perf_counter() - started:.2f}s")
+
+    while True:
+        try:
+            kind, body = await asyncio.to_thread(requests.get, True, 1.0)
+        except queue.Empty:
+            continue
+        if kind == _MSG_STOP:
+            break
+        if kind == _MSG_PING:
+            # answered by the event loop, so a loop blocked by a crawl goes quiet
+            responses.put((worker_id, None, True, None))
+        elif kind == _MSG_RULES:
+            change_crawl_rule(body)
+        elif kind == _MSG_CANCEL:
+            if body in tasks:
+                tasks[body].cancel()  # its caller timed out
+        elif kind == _MSG_CRAWL:
+            request_id = body[0]
+            task = asyncio.create_task(run(*body))
+            tasks[request_id] = task
+            task.add_done_callback(lambda _, request_id=request_id: tasks.pop(request_id, None))
+
+    if tasks:
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+    janitor_task.cancel()
+    await close_all()
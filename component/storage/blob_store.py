@@ -0,0 +1,119 @@
+"""Content-addressed storage for heavy crawl artifacts.
+
+Screenshots and PDFs are kept out of crawl responses: they are written once
+under the sha256 of their bytes and the response carries a reference with the
+size, hash and where to fetch them, over HTTP (``/v1/crawl/blobs/{sha256}``)
+or as an MCP resource (``blob://{kind}/{sha256}``).
+
+``FileBlobStore`` keeps blobs on the local filesystem, so a reference is only
+readable on the node that wrote it; a shared object store plugs in by
+implementing ``BlobStore``.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import tempfile
+from pathlib import Path
+
+from configs import config
+
+logger = logging.getLogger(__name__)
+
+BLOB_KINDS = {"screenshot": "image/png", "pdf": "application/pdf"}  # kind -> default content type
+
+_DIGEST = re.compile(r"^[0-9a-f]{64}$")
+_MAGIC = ((b"\x89PNG", "image/png"), (b"\xff\xd8\xff", "image/jpeg"), (b"%PDF", "application/pdf"))
+
+BLOB_STATS = {"writes": 0, "dedup_hits": 0, "bytes_written": 0, "reads": 0, "misses": 0}
+
+
+def sniff_content_type(data: bytes, default: str = "application/octet-stream") -> str:
+    for magic, content_type in _MAGIC:
+        if data.startswith(magic):
+            return content_type
+    return default
+
+
+def is_digest(digest: str) -> bool:
+    return bool(_DIGEST.match(digest or ""))
+
+
+class BlobStore:
+    """Write-once storage of bytes keyed by their sha256."""
+
+    async def exists(self, digest: str) -> bool:
+        raise NotImplementedError
+
+    async def write(self, digest: str, data: bytes):
+        raise NotImplementedError
+
+    async def read(self, digest: str) -> bytes | None:
+        raise NotImplementedError
+
+    async def put(self, data: bytes, kind: str) -> dict:
+        """Store ``data`` and return the reference a response carries instead of it."""
+        digest = hashlib.sha256(data).hexdigest()
+        if await self.exists(digest):
+            BLOB_STATS["dedup_hits"] += 1
+        else:
+            await self.write(digest, data)
+            BLOB_STATS["writes"] += 1
+            BLOB_STATS["bytes_written"] += len(data)
+        return {
+            "sha256": digest,
+            "size": len(data),
+            "content_type": sniff_content_type(data, BLOB_KINDS.get(kind, "application/octet-stream")),
+            "url": f"/v1/crawl/blobs/{digest}",
+            "uri": f"blob://{kind}/{digest}",
+        }
+
+    async def get(self, digest: str) -> bytes | None:
+        if not is_digest(digest):
+            return None
+        data = await self.read(digest)
+        BLOB_STATS["reads" if data is not None else "misses"] += 1
+        return data
+
+    def stats(self) -> dict:
+        return dict(BLOB_STATS)
+
+
+class FileBlobStore(BlobStore):
+    """Blobs as files under ``root``, fanned out by the first bytes of their hash."""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest[2:4] / digest
+
+    async def exists(self, digest: str) -> bool:
+        return self.path(digest).exists()
+
+    async def write(self, digest: str, data: bytes):
+        await asyncio.to_thread(self._write, self.path(digest), data)
+
+    async def read(self, digest: str) -> bytes | None:
+        path = self.path(digest)
+        try:
+            return await asyncio.to_thread(path.read_bytes)
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _write(path: Path, data: bytes):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # written aside and renamed, readers never see a partial blob
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+
+BLOB_STORE: BlobStore = FileBlobStore(config.CRAWL_BLOB_STORE_DIR)
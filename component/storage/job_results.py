@@ -0,0 +1,73 @@
+"""Crawl job results stored page by page.
+
+Every page of a finished job is compressed on its own and pushed to the Redis
+list ``aduib_task:{task_id}:results``, next to the ``aduib_task:{task_id}`` status
+hash. A status poll never touches the list, and a result read decompresses only
+the pages it returns, so both cost the same for a job of one page or of
+thousands. Bulk jobs append their pages batch by batch, readable while the job
+still runs.
+"""
+import gzip
+import json
+from collections.abc import AsyncIterator
+
+from component.cache.redis_cache import async_redis_client
+
+ENCODING = "gzip"
+PUSH_BATCH = 100  # pages sent to Redis per command
+READ_BATCH = 50  # pages fetched per command while streaming
+
+
+def results_key(task_id: str) -> str:
+    return f"aduib_task:{task_id}:results"
+
+
+def encode_page(page) -> bytes:
+    return gzip.compress(json.dumps(page, ensure_ascii=False).encode("utf-8"), compresslevel=6)
+
+
+def decode_page(chunk: bytes):
+    return json.loads(gzip.decompress(chunk))
+
+
+def push_results(pipe, task_id: str, pages: list, ttl, replace: bool = False) -> int:
+    """Queue the commands storing ``pages`` after the stored pages of ``task_id`` on the pipeline ``pipe``.
+
+    With ``replace`` the stored pages are dropped first, as a retried job starts over.
+    Returns how many pages are stored by the commands.
+    """
+    key = results_key(task_id)
+    if replace:
+        pipe.delete(key)
+    for start in range(0, len(pages), PUSH_BATCH):
+        pipe.rpush(key, *(encode_page(page) for page in pages[start:start + PUSH_BATCH]))
+    if pages:
+        pipe.expire(key, ttl)
+    return len(pages)
+
+
+async def store_results(task_id: str, pages: list, ttl) -> int:
+    """Replace the stored pages of ``task_id`` with ``pages``; returns how many were stored."""
+    async with async_redis_client.pipeline(transaction=False) as pipe:
+        push_results(pipe, task_id, pages, ttl, replace=True)
+        await pipe.execute()
+    return len(pages)
+
+
+async def read_results(task_id: str, offset: int = 0, limit: int | None = None) -> list:
+    """Pages ``offset`` to ``offset + limit`` of ``task_id``, all of them from ``offset`` when ``limit`` is None."""
+    if limit is not None and limit <= 0:
+        return []
+    end = -1 if limit is None else offset + limit - 1
+    return [decode_page(chunk) for chunk in await async_redis_client.lrange(results_key(task_id), offset, end)]
+
+
+async def iter_results(task_id: str, offset: int = 0) -> AsyncIterator:
+    """Every page of ``task_id`` from ``offset`` on, fetched ``READ_BATCH`` at a time."""
+    while True:
+        chunks = await async_redis_client.lrange(results_key(task_id), offset, offset + READ_BATCH - 1)
+        for chunk in chunks:
+            yield decode_page(chunk)
+        if len(chunks) < READ_BATCH:
+            return
+        offset += READ_BATCH
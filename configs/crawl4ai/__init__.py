@@ -2,11 +2,41 @@ from pydantic_settings import BaseSettings
 
 class Crawl4AIConfig(BaseSettings):
     MEMORY_THRESHOLD_PRECENT: float = 80.0  # 80% of memory usage
-    SEMAPHORE_COUNT: int = 10  # max concurrent crawlers
+    SEMAPHORE_COUNT: int = 10  # max concurrent pages per domain, across all requests
     IDLE_TTL_SEC: int = 30*60  # 30 minutes
+    CRAWLER_PROBE_INTERVAL_SEC: int = 15  # browser liveness probe period
+    CRAWLER_PROBE_TIMEOUT_SEC: float = 5.0  # a probe slower than this marks the browser as wedged
     RATE_LIMITER_ENABLED: bool = True
     RATE_LIMITER_BASE_DELAY: tuple= (1.0, 3.0)  # seconds
-    CRAWLER_MAX_PAGES: int = 30
+    CRAWLER_MAX_PAGES: int = 30  # max concurrent pages in this process
+    CRAWLER_PAGE_POOL_SIZE: int = 8  # max pooled pages per browser, more crawls get pages of their own; 0 disables the pool
+    CRAWLER_PAGE_POOL_PREWARM: int = 2  # pages created right after a browser starts
+    CRAWLER_PREWARM: list[dict] = [{"count": 1, "min_warm": 1}]  # PrewarmSpec list started in parallel at boot
+    CRAWL_STREAM_WINDOW: int = 4  # pages a streaming crawl runs ahead of its client
+    CRAWL_STREAM_HEARTBEAT_SEC: float = 15.0  # SSE keep-alive while no page has finished
+    CRAWLER_HTTP_MAX_CONNECTIONS: int = 64  # connection pool of the HTTP-only fetcher
+    CRAWL_RESULT_CACHE_ENABLED: bool = True
+    CRAWL_RESULT_CACHE_TTL_SEC: int = 60*60  # default lifetime of cached results, rules can override it
+    CRAWL_RESULT_CACHE_MAX_BYTES: int = 256*1024*1024  # in-process tier, the Redis tier is shared
+    CRAWL_RESULT_CACHE_STALE_SEC: int = 24*60*60  # expired results with validators are kept to be revalidated
+    CRAWL_RESULT_REVALIDATE_TIMEOUT_SEC: float = 5.0
+    CRAWL_COALESCE_LEASE_SEC: float = 90.0  # how long other nodes wait on a crawl led elsewhere
+    CRAWL_BLOB_STORE_ENABLED: bool = True  # screenshots and pdfs are returned as blob store references
+    CRAWL_BLOB_STORE_DIR: str = "data/blobs"
+    CRAWLER_WORKER_PROCESSES: int = 0  # >0 runs the browsers in that many worker processes
+    CRAWLER_WORKER_TIMEOUT_MARGIN_SEC: float = 30.0  # on top of the page timeouts of a request, then it fails with 504
+    CRAWLER_WORKER_UNRESPONSIVE_SEC: float = 60.0  # a worker with requests in flight answering no ping for this long is recycled
+    CRAWL_JOB_QUEUE_ENABLED: bool = False  # /v1/crawl/job queues to Redis Streams for `app.py --worker` processes
+    CRAWL_JOB_WORKER_CONCURRENCY: int = 4  # jobs one worker process runs at a time
+    CRAWL_JOB_VISIBILITY_SEC: int = 5*60  # a job its worker stopped re-claiming for this long is taken over
+    CRAWL_JOB_MAX_ATTEMPTS: int = 3  # then the job is dead-lettered
+    CRAWL_JOB_RETRY_BACKOFF_SEC: float = 10.0  # before the first retry, doubled for every further one
+    CRAWL_JOB_RESULT_PAGE_LIMIT: int = 50  # result pages a job status poll returns by default
+    CRAWL_ADAPTIVE_MIN_SCORE: float = 0.5  # share of the query terms a page needs to be returned by an adaptive crawl
+    CRAWL_BULK_MAX_URLS: int = 10_000  # urls one /v1/crawl/bulk request may submit
+    CRAWL_BULK_BATCH_SIZE: int = 20  # urls of one host and rule crawled per batch of a bulk job
+    CRAWL_BULK_CONCURRENT_BATCHES: int = 8  # batches of a bulk job in flight, hosts keep their own limits
+    CRAWL_SEARCH_MAX_FETCH_TOP: int = 10  # result pages a web search may fetch next to its results page
     CRAWLER_LLM_BASE_URL: str = "http://10.0.0.96:5001/v1/"
     CRAWLER_LLM_MODEL: str = "deepseek-chat"
     CRAWLER_EMBEDDING_MODEL: str = "Qwen3-Embedding-8B"
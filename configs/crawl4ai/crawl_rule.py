@@ -38,7 +38,6 @@ browser_config={
 crawler_config={
     "check_robots_txt":False,
     "screenshot":True,
-    "screenshot_wait_for":5.0,
     "locale":"zh-CN",
     "timezone_id":"Asia/Shanghai",
     "process_iframes":False,
@@ -95,6 +94,7 @@ class CrawlRules(BaseSettings):
                 "url": "www.cnblogs.com",
                 "css_selector": "div#topics",
                 "crawl_mode": "classic",
+                "fetch_mode": "auto",
                 "crawl_result_type": "markdown",
                 "filter_type":"fit"
             },
@@ -103,6 +103,7 @@ class CrawlRules(BaseSettings):
                 "url": "www.csdn.net",
                 "css_selector": "div.blog-content-box",
                 "crawl_mode": "classic",
+                "fetch_mode": "auto",
                 "crawl_result_type": "markdown",
                 "filter_type": "fit"
             },
@@ -111,6 +112,7 @@ class CrawlRules(BaseSettings):
                 "url": "blog.csdn.net",
                 "css_selector": "div.blog-content-box",
                 "crawl_mode": "classic",
+                "fetch_mode": "auto",
                 "crawl_result_type": "markdown",
                 "filter_type":"fit"
             },
@@ -203,6 +205,7 @@ class CrawlRules(BaseSettings):
                 "url": "www.baidu.com",
                 "css_selector": "#content_left .result h3, #content_left .result span",
                 "search_engine_url": "https://www.baidu.com/s?wd={query}",
+                "cache_ttl_sec": 600,
                 "crawl_mode": "classic",
                 "deep_crawl": "false",
                 "crawl_result_type": "html",
@@ -216,6 +219,7 @@ class CrawlRules(BaseSettings):
                 "url": "www.google.com",
                 "css_selector": "#search .MjjYud",
                 "search_engine_url": "https://www.google.com/search?q={query}&gl=us",
+                "cache_ttl_sec": 600,
                 "crawl_mode": "classic",
                 "crawl_result_type": "html",
                 "filter_type": "fit",
@@ -229,6 +233,7 @@ class CrawlRules(BaseSettings):
                 "url": "www.bing.com",
                 "css_selector": "#b_results h2, #b_results .b_caption",
                 "search_engine_url": "https://www.bing.com/search?q={query}",
+                "cache_ttl_sec": 600,
                 "crawl_mode": "classic",
                 "deep_crawl": "false",
                 "crawl_result_type": "html",
@@ -242,6 +247,7 @@ class CrawlRules(BaseSettings):
                 "url": "search.brave.com",
                 "css_selector": "#main a, #main .snippet-content",
                 "search_engine_url": "https://search.brave.com/search?q={query}&gl=us",
+                "cache_ttl_sec": 600,
                 "crawl_mode": "classic",
                 "crawl_result_type": "html",
                 "filter_type": "fit",
@@ -255,6 +261,7 @@ class CrawlRules(BaseSettings):
                 "url": "yandex.com",
                 "css_selector": "#search-result .OrganicHost, #search-result .Organic-ContentWrapper",
                 "search_engine_url": "https://yandex.com/search/?text={query}",
+                "cache_ttl_sec": 600,
                 "crawl_mode": "classic",
                 "crawl_result_type": "html",
                 "filter_type": "fit",
@@ -268,6 +275,7 @@ class CrawlRules(BaseSettings):
                 "url": "duckduckgo.com",
                 "css_selector": "#react-layout .wLL07_0Xnd1QZpzpfR4W",
                 "search_engine_url": "https://duckduckgo.com/?q={query}&gl=cn",
+                "cache_ttl_sec": 600,
                 "crawl_mode": "classic",
                 "crawl_result_type": "html",
                 "filter_type": "fit",
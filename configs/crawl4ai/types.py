@@ -9,6 +9,8 @@ from pydantic import BaseModel
 from component.crawl4ai.adaptive_crawler import AdaptiveCrawler
 from configs import config
 
+ADAPTIVE_MAX_PAGES = 10  # pages an adaptive crawl of one url may visit
+
 
 class TaskStatus(str, Enum):
     PROCESSING = "processing"
@@ -48,6 +50,12 @@ class CrawlMode(str,Enum):
                 raise ValueError(f"Unknown crawl mode: {value}")
 
 
+class CrawlPriority(str, Enum):
+    INTERACTIVE = "interactive"  # agent tool calls waiting on the answer
+    NORMAL = "normal"
+    BACKGROUND = "background"  # fire-and-forget jobs
+
+
 class CrawlResultType(str,Enum):
     HTML = "html"
     MARKDOWN = "markdown"
@@ -93,6 +101,16 @@ class CrawlRule(BaseModel):
     deep_crawl_max_pages: int = 2
     deep_crawl_threshold: float = 0.7
     extraction_strategy:str=None  # 'web_content' or 'web_search'
+    page_reset: list[str] = ["routes", "storage", "cookies"]  # cleared before a pooled page is reused
+    block_resource_types: list[str] = None  # None: image/media/font for text results without screenshot
+    block_url_patterns: list[str] = None  # glob patterns, None: common trackers and ad networks
+    allow_domains: list[str] = []  # requests to these domains (and subdomains) are never blocked
+    fetch_mode: str = "browser"  # 'browser', 'http', or 'auto' (http, browser when the page needs javascript)
+    cache_ttl_sec: int = None  # result cache lifetime, None: CRAWL_RESULT_CACHE_TTL_SEC, 0: never cached
+    ready_condition: str = None  # 'selector', 'network_idle', 'dom_settle' or 'none'; None: css_selector if set
+    ready_selector: str = None  # defaults to css_selector
+    ready_quiet_ms: int = 500  # network quiet window / DOM settle time
+    ready_timeout_ms: int = 3000  # upper bound, shortened per domain from observed waits
 
     def build_deep_crawl_strategy(self, query: list[str] | str = None) -> DeepCrawlStrategy|None:
         """Build the deep crawl strategy based on the rule settings."""
@@ -156,16 +174,24 @@ class CrawlRule(BaseModel):
             case _:
                 return None
 
+    def max_pages(self) -> int:
+        """Pages a crawl of one url may visit under this rule: its deep or adaptive crawl limit."""
+        if self.crawl_mode == CrawlMode.ADAPTIVE:
+            return ADAPTIVE_MAX_PAGES
+        if self.deep_crawl:
+            return max(1, self.deep_crawl_max_pages)
+        return 1
+
     def build_adaptive_crawler(self, crawler: AsyncWebCrawler) -> AdaptiveCrawler | None:
         """Build the adaptive crawler based on the rule settings."""
         match self.adaptive_crawl_method:
             case "statistical":
                 return AdaptiveCrawler(crawler=crawler,
-                                       config=AdaptiveConfig(strategy="statistical", confidence_threshold=0.8,top_k_links=5,max_depth=5,max_pages=10))
+                                       config=AdaptiveConfig(strategy="statistical", confidence_threshold=0.8,top_k_links=5,max_depth=5,max_pages=ADAPTIVE_MAX_PAGES))
             case "embedding":
                 return AdaptiveCrawler(crawler=crawler,
                                        config=AdaptiveConfig(strategy="embedding",
-                                                             confidence_threshold=0.8,top_k_links=5,max_depth=5,max_pages=10, embedding_llm_config={
+                                                             confidence_threshold=0.8,top_k_links=5,max_depth=5,max_pages=ADAPTIVE_MAX_PAGES, embedding_llm_config={
                                            "provider": config.CRAWLER_EMBEDDING_MODEL,
                                            "base_url": config.CRAWLER_LLM_BASE_URL,
                                            "api_token": config.CRAWLER_API_KEY,
@@ -197,6 +223,12 @@ class CrawlRuleGroup(BaseModel):
         return []
 
 
+class PrewarmSpec(BaseModel):
+    browser_config: dict = {}  # overrides applied on top of the default browser_config
+    count: int = 1  # browsers kept warm for the signature: the pooled one plus standbys
+    min_warm: int = 1  # the janitor never evicts below this many warm browsers
+
+
 class WebSearchContentExtractionResult(BaseModel):
     title: str
     url: str
@@ -1,11 +1,12 @@
 from typing import Any, AsyncGenerator
 
-from fastapi import APIRouter, BackgroundTasks
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query, status
 from starlette.requests import Request
-from starlette.responses import StreamingResponse
+from starlette.responses import StreamingResponse, Response
 
 from configs.crawl4ai.crawl_rule import browser_config, crawler_config
-from controllers.params import CrawlJobPayload, CrawlJobResponse
+from configs.crawl4ai.types import CrawlPriority
+from controllers.params import CrawlJobPayload, CrawlJobResponse, BulkCrawlJobPayload
 from libs.deps import CurrentApiKeyDep
 from service.crawl4ai_service import Crawl4AIService
 from utils.encoders import merge_dicts
@@ -35,12 +36,38 @@ async def crawl_job(
         payload.crawler_config,
         payload.query,
         payload.stream,
-        str(payload.notify_url)
+        str(payload.notify_url) if payload.notify_url else None,
+        priority=payload.priority or CrawlPriority.BACKGROUND,
+        deadline_sec=payload.deadline_sec,
+        bypass_cache=payload.bypass_cache,
+        include_fields=payload.include_fields
+    )
+
+
+@router.post("/crawl/bulk", status_code=202)
+async def crawl_bulk(
+        payload: BulkCrawlJobPayload,
+        background_tasks: BackgroundTasks,
+        current_key: CurrentApiKeyDep
+):
+    """Job crawling a large url list, grouped by host and rule; follow it like any /crawl/job."""
+    return await Crawl4AIService.handle_bulk_crawl_job(
+        background_tasks,
+        payload.urls,
+        merge_dicts(browser_config, payload.browser_config or {}),
+        merge_dicts(crawler_config, payload.crawler_config or {}),
+        payload.query,
+        str(payload.notify_url) if payload.notify_url else None,
+        priority=payload.priority or CrawlPriority.BACKGROUND,
+        deadline_sec=payload.deadline_sec,
+        bypass_cache=payload.bypass_cache,
+        include_fields=payload.include_fields
     )
 
 
 @router.post("/crawl/stream/job", response_model=None)
 async def crawl_stream_job(
+        request: Request,
         payload: CrawlJobPayload,
         current_key: CurrentApiKeyDep
 ) -> Any:
@@ -54,21 +81,104 @@ async def crawl_stream_job(
     else:
         payload.crawler_config = merge_dicts(crawler_config, payload.crawler_config)
     content = await Crawl4AIService.handle_crawl_request([str(u) for u in payload.urls], payload.browser_config,
-                                                         payload.crawler_config, payload.query, payload.stream)
-    # result=json.dumps(content).encode('utf-8')
+                                                         payload.crawler_config, payload.query, payload.stream,
+                                                         priority=payload.priority or CrawlPriority.NORMAL,
+                                                         deadline_sec=payload.deadline_sec,
+                                                         bypass_cache=payload.bypass_cache,
+                                                         include_fields=payload.include_fields)
     if not isinstance(content, AsyncGenerator):
         return CrawlJobResponse.model_validate(content)
-    else:
-        async def event_generator() -> AsyncGenerator[Any, None]:
-            yield f"{CrawlJobResponse.model_validate(content)}\n\n"
-
-        return StreamingResponse(content=event_generator(), media_type="text/event-stream")
+    # one NDJSON line per page, or one event per page for SSE clients
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    if "text/event-stream" in request.headers.get("accept", ""):
+        return StreamingResponse(content=Crawl4AIService.stream_events(content), media_type="text/event-stream",
+                                 headers=headers)
+    return StreamingResponse(content=content, media_type="application/x-ndjson", headers=headers)
 
 
 @router.get("/crawl/job/{task_id}")
 async def crawl_job_status(
         request: Request,
         task_id: str,
+        current_key: CurrentApiKeyDep,
+        offset: int = Query(0, ge=0),
+        limit: int = Query(None, ge=0, description="result pages to return, 0 for the status only")
+):
+    return await Crawl4AIService.handle_task_status(task_id, base_url=str(request.base_url), offset=offset,
+                                                    limit=limit)
+
+
+@router.get("/crawl/job/{task_id}/events")
+async def crawl_job_events(
+        request: Request,
+        task_id: str,
+        current_key: CurrentApiKeyDep
+):
+    """Status changes and finished pages of a job as server-sent events, until it completes or fails."""
+    events = await Crawl4AIService.task_event_stream(task_id, request.headers.get("last-event-id"))
+    return StreamingResponse(content=events, media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@router.get("/crawl/job/{task_id}/wait")
+async def crawl_job_wait(
+        task_id: str,
+        current_key: CurrentApiKeyDep,
+        after: str = Query("0", description="last event id seen, 0 for every event"),
+        timeout: float = Query(30.0, gt=0, le=120)
+):
+    """Long-poll variant of the job events: returns as soon as there is an event after ``after``."""
+    return await Crawl4AIService.wait_task_events(task_id, after, timeout)
+
+
+@router.get("/crawl/job/{task_id}/results")
+async def crawl_job_results(
+        task_id: str,
+        current_key: CurrentApiKeyDep,
+        offset: int = Query(0, ge=0)
+):
+    """Every result page of a completed job, one NDJSON line each."""
+    lines = await Crawl4AIService.task_result_lines(task_id, offset)
+    return StreamingResponse(content=lines, media_type="application/x-ndjson")
+
+
+@router.get("/crawl/blobs/{digest}")
+async def crawl_blob(
+        digest: str,
+        current_key: CurrentApiKeyDep
+):
+    """Bytes of a screenshot or pdf referenced by a crawl result."""
+    from component.storage.blob_store import BLOB_STORE, sniff_content_type
+    data = await BLOB_STORE.get(digest)
+    if data is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="blob not found")
+    # content addressed, the bytes behind a digest never change
+    return Response(content=data, media_type=sniff_content_type(data),
+                    headers={"Cache-Control": "private, max-age=31536000, immutable", "ETag": f'"{digest}"'})
+
+
+@router.get("/crawl/metrics")
+async def crawl_metrics(
         current_key: CurrentApiKeyDep
 ):
-    return await Crawl4AIService.handle_task_status(task_id, base_url=str(request.base_url))
+    from component.cache.crawl_coalescer import COALESCER
+    from component.cache.crawl_result_cache import RESULT_CACHE
+    from component.crawl4ai import worker_farm, job_queue
+    from component.crawl4ai.crawl_scheduler import get_scheduler
+    from component.crawl4ai.crawler_pool import get_pool_stats
+    from component.crawl4ai.fetch_mode import get_fetch_stats
+    from component.crawl4ai.page_readiness import get_readiness_stats
+    from component.crawl4ai.resource_policy import RESOURCE_STATS
+    from component.storage.blob_store import BLOB_STORE
+    return {
+        "crawler_pool": get_pool_stats(),
+        "scheduler": get_scheduler().stats(),
+        "resource_policy": RESOURCE_STATS,
+        "readiness": get_readiness_stats(),
+        "fetch": get_fetch_stats(),
+        "result_cache": RESULT_CACHE.stats(),
+        "coalescing": COALESCER.stats(),
+        "worker_farm": worker_farm.stats(),
+        "job_queue": await job_queue.stats(),
+        "blob_store": BLOB_STORE.stats(),
+    }
@@ -1,5 +1,6 @@
 from fastapi import APIRouter
 
+from configs.crawl4ai.types import CrawlPriority
 from controllers.params import WebEngineCrawlJobPayload
 from libs.deps import CurrentApiKeyDep
 from service.crawl4ai_service import Crawl4AIService
@@ -13,5 +14,6 @@ async def web_search_job(
         current_key: CurrentApiKeyDep
 ):
     return await Crawl4AIService.handle_web_search_job(
-        payload
+        payload,
+        priority=CrawlPriority.INTERACTIVE
     )
@@ -1,7 +1,9 @@
-from typing import Dict, Any
+from typing import Dict, Any, Literal
 
 from pydantic import HttpUrl, BaseModel
 
+from configs.crawl4ai.types import CrawlPriority
+
 
 class CrawlJobPayload(BaseModel):
     urls:           list[HttpUrl]
@@ -10,20 +12,45 @@ class CrawlJobPayload(BaseModel):
     query: list[str] | str = None
     stream: bool = False
     notify_url: HttpUrl = None
+    priority: CrawlPriority = None  # scheduling class, defaults depend on the endpoint
+    deadline_sec: float = None  # earliest-deadline-first within the class
+    bypass_cache: bool = False  # crawl again instead of serving a cached result
+    include_fields: list[Literal["media", "metadata", "screenshot"]] = None  # heavy result fields, all when omitted
+
+class BulkCrawlJobPayload(BaseModel):
+    urls:           list[str]  # normalized and deduplicated by the server, hosts without scheme allowed
+    browser_config: Dict = {}
+    crawler_config: Dict = {}
+    query: list[str] | str = None
+    notify_url: HttpUrl = None
+    priority: CrawlPriority = None  # background when omitted
+    deadline_sec: float = None
+    bypass_cache: bool = False
+    include_fields: list[Literal["media", "metadata", "screenshot"]] = None
+
+class SearchResultItem(BaseModel):
+    title:str
+    link:str
+    snippet:str=''
 
 class CrawlJobBody(BaseModel):
     url:str
     crawl_text:str
     crawl_type:str
     crawl_media:Dict[str,Any]=None
-    screenshot:str=None,
+    screenshot:str | Dict=None  # blob store reference, or base64 when the store is disabled
+    pdf:Dict=None  # blob store reference of a pdf result
     metadata:Dict = {}
+    search_results:list[SearchResultItem]=None  # parsed from a search engine results page
 
 class CrawlJobResponse(BaseModel):
     success:bool
     results: list[CrawlJobBody]
     server_processing_time_s:float=None
 
+class WebSearchResponse(CrawlJobResponse):
+    result_pages: list[CrawlJobBody] = []  # the top search results crawled, in rank order
+
 
 
 class ToolCrawlJobUrlPayload(BaseModel):
@@ -38,4 +65,8 @@ class ToolCrawlJobQueryPayload(BaseModel):
 class WebEngineCrawlJobPayload(BaseModel):
     web_content:str
     search_engine_type:str='duckduckgo'  # 'google' or 'bing' or 'baidu'
+    priority: CrawlPriority = None
+    bypass_cache: bool = False
+    include_fields: list[Literal["media", "metadata", "screenshot"]] = None
+    fetch_top: int = 0  # top search results crawled next to the results page, up to CRAWL_SEARCH_MAX_FETCH_TOP
 
@@ -4,7 +4,9 @@ from typing import Any
 from pydantic import HttpUrl
 
 from configs.crawl4ai.crawl_rule import browser_config, crawler_config
+from configs.crawl4ai.types import CrawlPriority
 from controllers.params import CrawlJobPayload, CrawlJobResponse, WebEngineCrawlJobPayload
+from component.storage.blob_store import BLOB_STORE, BLOB_KINDS
 from mcp_factory import get_mcp
 from service.crawl4ai_service import Crawl4AIService
 from utils.encoders import merge_dicts
@@ -14,8 +16,10 @@ mcp = get_mcp()
 @mcp.tool(name="Provide-URL-based-web-content-crawling", description="Directly crawl and return content from the specified webpage link")
 async def crawl_web(
         urls:list[HttpUrl],
+        priority:CrawlPriority=CrawlPriority.INTERACTIVE,
+        bypass_cache:bool=False,
 )-> Any:
-    payload=CrawlJobPayload(urls=urls)
+    payload=CrawlJobPayload(urls=urls, priority=priority, bypass_cache=bypass_cache)
     if payload.browser_config is None:
         payload.browser_config = browser_config
     else:
@@ -26,7 +30,9 @@ async def crawl_web(
         payload.crawler_config = merge_dicts(crawler_config, {'screenshot': False})
         payload.stream =False
     content = await Crawl4AIService.handle_crawl_request([str(u) for u in payload.urls], payload.browser_config,
-                                                        payload.crawler_config, payload.query, payload.stream)
+                                                        payload.crawler_config, payload.query, payload.stream,
+                                                        priority=payload.priority, bypass_cache=payload.bypass_cache,
+                                                        include_fields=[])  # only the text is returned
     crawl_job_response = CrawlJobResponse.model_validate(content)
     content_list = []
     for item in crawl_job_response.results:
@@ -34,17 +40,24 @@ async def crawl_web(
     return content_list
 
 
-@mcp.tool(name="search-the-content-from-the-web", description="Search the content from the web using various search engines such as DuckDuckGo, Brave, and Baidu.")
+@mcp.tool(name="search-the-content-from-the-web",
+          description="Search the content from the web using various search engines such as DuckDuckGo, Brave, and Baidu. "
+                      "Returns title, link and snippet of every result, and the text of the top fetch_top results "
+                      "of every engine.")
 async def web_search(
-        web_content:str
+        web_content:str,
+        priority:CrawlPriority=CrawlPriority.INTERACTIVE,
+        bypass_cache:bool=False,
+        fetch_top:int=0,
 )-> Any:
     search_engine_typse = ['duckduckgo', 'brave', 'baidu']
     content_list = []
     async def fetch_content(search_engine: str):
-        payload = WebEngineCrawlJobPayload(web_content=web_content, search_engine_type=search_engine)
+        payload = WebEngineCrawlJobPayload(web_content=web_content, search_engine_type=search_engine,
+                                           priority=priority, bypass_cache=bypass_cache, include_fields=[],
+                                           fetch_top=fetch_top)
         content = await Crawl4AIService.handle_web_search_job(payload)
-        crawl_job_response = CrawlJobResponse.model_validate(content)
-        return [item.crawl_text for item in crawl_job_response.results]
+        return Crawl4AIService.search_result_texts(content)
 
     tasks = [fetch_content(search_engine) for search_engine in search_engine_typse]
     results = await asyncio.gather(*tasks)
@@ -52,4 +65,23 @@ async def web_search(
     for result in results:
         content_list.extend(result)
 
-    return content_list
\ No newline at end of file
+    return content_list
+
+
+async def _read_blob(digest: str) -> bytes:
+    data = await BLOB_STORE.get(digest)
+    if data is None:
+        raise ValueError(f"Unknown blob: {digest}")
+    return data
+
+
+@mcp.resource("blob://screenshot/{digest}", name="crawl-screenshot", mime_type=BLOB_KINDS["screenshot"],
+              description="Screenshot of a crawled page, referenced by the screenshot field of a crawl result")
+async def crawl_screenshot(digest: str) -> bytes:
+    return await _read_blob(digest)
+
+
+@mcp.resource("blob://pdf/{digest}", name="crawl-pdf", mime_type=BLOB_KINDS["pdf"],
+              description="PDF of a crawled page, referenced by the pdf field of a crawl result")
+async def crawl_pdf(digest: str) -> bytes:
+    return await _read_blob(digest)
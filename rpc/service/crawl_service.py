@@ -4,7 +4,8 @@ from typing import Any
 from aduib_rpc.server.rpc_execution.service_call import service
 
 from configs.crawl4ai.crawl_rule import browser_config, crawler_config
-from controllers.params import CrawlJobResponse, WebEngineCrawlJobPayload
+from configs.crawl4ai.types import CrawlPriority
+from controllers.params import WebEngineCrawlJobPayload
 from service.crawl4ai_service import Crawl4AIService
 from utils import merge_dicts
 
@@ -12,26 +13,52 @@ from utils import merge_dicts
 @service("CrawlService")
 class CrawlService:
     """Crawl Service for handling crawl requests."""
-    async def crawl(self, urls:list[str], query:str=None) -> dict[str, Any]:
+    async def crawl(self, urls:list[str], query:str=None, priority:str=CrawlPriority.NORMAL,
+                    deadline_sec:float=None, bypass_cache:bool=False,
+                    include_fields:list[str]=None) -> dict[str, Any]:
         # Implement crawling logic here
         return await Crawl4AIService.handle_crawl_request(
             urls=urls,
             browser_config=browser_config,
             crawler_config=merge_dicts(crawler_config, {'screenshot': False}),
-            query=query
+            query=query,
+            priority=priority,
+            deadline_sec=deadline_sec,
+            bypass_cache=bypass_cache,
+            include_fields=include_fields
         )
 
+    async def bulk_crawl(self, urls:list[str], query:str=None, priority:str=CrawlPriority.BACKGROUND,
+                         bypass_cache:bool=False, include_fields:list[str]=None,
+                         notify_url:str=None) -> dict[str, Any]:
+        """Start a bulk crawl job; its progress and pages are read from /v1/crawl/job/{task_id}."""
+        return await Crawl4AIService.handle_bulk_crawl_job(
+            None,
+            urls,
+            browser_config,
+            merge_dicts(crawler_config, {'screenshot': False}),
+            query,
+            notify_url,
+            priority=priority,
+            bypass_cache=bypass_cache,
+            include_fields=include_fields
+        )
+
+
+    async def web_search(self, web_content:str, priority:str=CrawlPriority.INTERACTIVE, fetch_top:int=0) -> list[str]:
+        """Perform web search using multiple search engines concurrently.
 
-    async def web_search(self, web_content:str) -> list[str]:
-        """Perform web search using multiple search engines concurrently."""
+        Returns title, link and snippet of every search result, then the text of
+        the top ``fetch_top`` results of every engine.
+        """
         search_engine_typse = ['duckduckgo', 'brave', 'baidu']
         content_list = []
 
         async def fetch_content(search_engine: str):
-            payload = WebEngineCrawlJobPayload(web_content=web_content, search_engine_type=search_engine)
-            content = await Crawl4AIService.handle_web_search_job(payload)
-            crawl_job_response = CrawlJobResponse.model_validate(content)
-            return [item.crawl_text for item in crawl_job_response.results]
+            payload = WebEngineCrawlJobPayload(web_content=web_content, search_engine_type=search_engine,
+                                               include_fields=[], fetch_top=fetch_top)
+            content = await Crawl4AIService.handle_web_search_job(payload, priority=priority)
+            return Crawl4AIService.search_result_texts(content)
 
         tasks = [fetch_content(search_engine) for search_engine in search_engine_typse]
         results = await asyncio.gather(*tasks)
@@ -3,11 +3,11 @@ import json
 import logging
 import time
 import urllib
-from base64 import b64encode
+from base64 import b64encode, b64decode
 from datetime import datetime, timedelta
 from functools import partial
 from typing import List, Dict, Any
-from typing import Optional, AsyncGenerator
+from typing import Optional, AsyncGenerator, AsyncIterator
 from uuid import uuid4
 
 import psutil
@@ -15,23 +15,35 @@ from crawl4ai import (
     CrawlerRunConfig,
     CacheMode,
     BrowserConfig,
-    RateLimiter, SemaphoreDispatcher
 )
 from fastapi import HTTPException, status
 from fastapi.background import BackgroundTasks
 from fastapi.responses import JSONResponse
 
-from component.cache.redis_cache import redis_client as redis
-from component.crawl4ai.crawler_pool import get_rule_by_url, get_rules_by_group, get_rule_by_group_and_url
+from component.cache.redis_cache import async_redis_client as redis
+from component.crawl4ai.bulk_crawl import plan_bulk_crawl
+from component.crawl4ai.crawler_pool import get_rule_by_url, get_rules_by_group, get_rule_by_group_and_url, \
+    get_html_parser
+from component.crawl4ai.html_parser import search as _search_parsers  # noqa: F401, registers the parsers
+from component.crawl4ai.job_events import areport_page, areport_pages, areport_result_pages, page_event, \
+    report_job_pages, publish_status, wait_events, parse_events, events_key, is_final, FINAL_STATUSES
+from component.storage.blob_store import BLOB_STORE
+from component.storage.job_results import push_results, read_results, iter_results, results_key, \
+    ENCODING as RESULT_ENCODING
 from configs import config
 from configs.crawl4ai.crawl_rule import browser_config as default_browser_config, \
     crawler_config as default_crawler_config
-from configs.crawl4ai.types import TaskStatus, CrawlRule, CrawlMode, CrawlResultType
-from controllers.params import WebEngineCrawlJobPayload
+from configs.crawl4ai.types import TaskStatus, CrawlRule, CrawlMode, CrawlResultType, CrawlPriority
+from controllers.params import WebEngineCrawlJobPayload, WebSearchResponse
 from utils import jsonable_encoder, merge_dicts
 
 logger = logging.getLogger(__name__)
 
+# response option -> result field holding it; the fields callers can leave out
+HEAVY_RESULT_FIELDS = {"media": "crawl_media", "metadata": "metadata", "screenshot": "screenshot"}
+
+_BACKGROUND_JOBS: set[asyncio.Task] = set()  # jobs started without a request's BackgroundTasks
+
 
 class Crawl4AIService:
 
@@ -57,27 +69,47 @@ class Crawl4AIService:
             task_id: str,
             base_url: str,
             *,
-            keep: bool = False
+            keep: bool = False,
+            offset: int = 0,
+            limit: int = None
     ) -> JSONResponse:
-        """Handle aduib_task status check requests."""
-        aduib_task = redis.hgetall(f"aduib_task:{task_id}")
-        if not aduib_task:
+        """Handle aduib_task status check requests.
+
+        Results stored page by page are returned ``limit`` pages from ``offset`` on
+        (``CRAWL_JOB_RESULT_PAGE_LIMIT`` when omitted); ``limit=0`` only reads the status.
+        A task finished more than an hour ago is deleted once a read without ``keep``
+        has served its last page, or was a status read; until then the key TTL keeps it.
+        """
+        fields = ["status", "created_at", "completed_at", "url", "error", "result", "result_pages"]
+        values = await redis.hmget(f"aduib_task:{task_id}", fields)
+        if values[0] is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="aduib_task not found"
             )
 
-        aduib_task = {k.decode('utf-8'): v.decode('utf-8') for k, v in aduib_task.items()}
-        response = cls.create_task_response(aduib_task, task_id, base_url)
+        aduib_task = {k: v.decode('utf-8') for k, v in zip(fields, values) if v is not None}
+        response = await cls.create_task_response(aduib_task, task_id, base_url, offset=offset, limit=limit)
 
         if aduib_task["status"] in [TaskStatus.COMPLETED, TaskStatus.FAILED]:
-            if not keep and cls.should_cleanup_task(aduib_task["created_at"]):
-                redis.delete(f"aduib_task:{task_id}")
+            # tasks finished before completed_at was recorded count from their creation
+            finished_at = aduib_task.get("completed_at", aduib_task["created_at"])
+            if not keep and cls.should_cleanup_task(finished_at) and cls.read_to_the_end(aduib_task, offset, limit):
+                await redis.delete(f"aduib_task:{task_id}", results_key(task_id))
 
         return JSONResponse(response)
 
     @classmethod
-    def create_task_response(cls, aduib_task: dict, task_id: str, base_url: str) -> dict:
+    def read_to_the_end(cls, aduib_task: dict, offset: int = 0, limit: int = None) -> bool:
+        """Whether a read of ``aduib_task`` leaves no result page for a later read to fetch."""
+        if "result_pages" not in aduib_task or limit == 0:
+            return True  # the whole result is inline, or a status read
+        limit = config.CRAWL_JOB_RESULT_PAGE_LIMIT if limit is None else limit
+        return offset + limit >= int(aduib_task["result_pages"])
+
+    @classmethod
+    async def create_task_response(cls, aduib_task: dict, task_id: str, base_url: str, offset: int = 0,
+                                   limit: int = None) -> dict:
         """Create response for aduib_task status check."""
         response = {
             "task_id": task_id,
@@ -90,45 +122,168 @@ class Crawl4AIService:
             }
         }
 
-        if aduib_task["status"] == TaskStatus.COMPLETED:
-            response["result"] = json.loads(aduib_task["result"])
-        elif aduib_task["status"] == TaskStatus.FAILED:
+        if aduib_task["status"] == TaskStatus.COMPLETED or "result_pages" in aduib_task:
+            response["result"] = json.loads(aduib_task["result"]) if aduib_task.get("result") else {}
+            if aduib_task["status"] != TaskStatus.COMPLETED:
+                response["result"]["partial"] = True  # the pages a bulk job finished so far
+            if "result_pages" in aduib_task:
+                # stored page by page, only the requested pages are read
+                total = int(aduib_task["result_pages"])
+                limit = config.CRAWL_JOB_RESULT_PAGE_LIMIT if limit is None else limit
+                response["result"]["results"] = await read_results(task_id, offset, limit)
+                response["pagination"] = {"offset": offset, "limit": limit, "total": total}
+                job_href = f"{base_url.rstrip('/')}/v1/crawl/job/{task_id}"
+                if limit and offset + limit < total:
+                    response["_links"]["next"] = {"href": f"{job_href}?offset={offset + limit}&limit={limit}"}
+                response["_links"]["results"] = {"href": f"{job_href}/results"}
+        if aduib_task["status"] == TaskStatus.FAILED:
             response["error"] = aduib_task["error"]
 
         return response
 
     @classmethod
-    async def stream_results(cls,crawler_config, crawl_rule: CrawlRule | None, results_gen: AsyncGenerator) -> AsyncGenerator[
-        str, None]:
-        """Stream results with heartbeats and completion markers."""
-        import json
+    async def task_result_lines(cls, task_id: str, offset: int = 0) -> AsyncIterator[str]:
+        """The stored pages of a task as NDJSON lines; those stored so far while a bulk job still runs."""
+        status_value, pages = await redis.hmget(f"aduib_task:{task_id}", ["status", "result_pages"])
+        if status_value is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="aduib_task not found")
+        if pages is None:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="aduib_task has no stored pages")
+        return (json.dumps(page, ensure_ascii=False) + "\n" async for page in iter_results(task_id, offset))
+
+    @classmethod
+    async def task_status(cls, task_id: str) -> str:
+        """Status of a task, read without its result."""
+        status_value = await redis.hget(f"aduib_task:{task_id}", "status")
+        if status_value is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="aduib_task not found")
+        return status_value.decode('utf-8')
+
+    @classmethod
+    async def task_events(cls, task_id: str, after: str = "0") -> tuple[list[tuple[str, dict]], str]:
+        """The events of a task after the event id ``after`` and its status, read in one round trip."""
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.xread({events_key(task_id): after}, count=100)
+            pipe.hget(f"aduib_task:{task_id}", "status")
+            found, status_value = await pipe.execute()
+        if status_value is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="aduib_task not found")
+        return parse_events(found), status_value.decode('utf-8')
+
+    @classmethod
+    async def wait_task_events(cls, task_id: str, after: str = "0", timeout: float = 30.0) -> dict:
+        """Long-poll: the events of a task after the event id ``after``.
+
+        Returns as soon as there is one, or with none once ``timeout`` is over or
+        when the task already finished.
+        """
+        events, task_status = await cls.task_events(task_id, after)
+        if not events and task_status not in FINAL_STATUSES:
+            events = await wait_events(task_id, after, timeout)
+            task_status = await cls.task_status(task_id)
+        return {
+            "task_id": task_id,
+            "status": task_status,
+            "events": [{"id": event_id, **event} for event_id, event in events],
+            "last_event_id": events[-1][0] if events else after,
+        }
+
+    @classmethod
+    async def task_event_stream(cls, task_id: str, last_event_id: str = None) -> AsyncGenerator[str, None]:
+        """Server-sent events of a task from ``last_event_id`` on, ending with its final status."""
+        await cls.task_status(task_id)  # unknown tasks fail before the stream starts
+
+        async def _events():
+            after = last_event_id or "0"
+            while True:
+                events = await wait_events(task_id, after, config.CRAWL_STREAM_HEARTBEAT_SEC)
+                for event_id, event in events:
+                    after = event_id
+                    yield f"id: {event_id}\nevent: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+                    if is_final(event):
+                        return
+                if events:
+                    continue
+                task_status = await cls.task_status(task_id)
+                if task_status in FINAL_STATUSES:
+                    # finished without a final event, e.g. before its events were kept
+                    yield f"event: status\ndata: {json.dumps({'type': 'status', 'status': task_status})}\n\n"
+                    return
+                yield ": keep-alive\n\n"
+
+        return _events()
+
+    @classmethod
+    async def stream_results(cls, crawler_config, crawl_rule: CrawlRule | None, results_gen: AsyncGenerator,
+                             priority: tuple = None, include_fields: list[str] = None) -> AsyncGenerator[str, None]:
+        """Stream results as NDJSON lines, each one as soon as its page is crawled.
+
+        The crawl only advances when the consumer asks for the next line, so a
+        slow client holds it back. A completion line ends a finished stream.
+        ``priority`` is the scheduling class of the request that started the crawl.
+        """
+        from component.crawl4ai.crawl_scheduler import CRAWL_PRIORITY
+
         def datetime_handler(x):
             if isinstance(x, datetime):
                 return x.isoformat()
             raise TypeError("Unknown type")
 
+        start_time = time.time()
+        streamed = 0
         try:
-            async for result in results_gen:
+            while True:
+                if priority is not None:
+                    # pages are started from the consumer's context, not the request's
+                    CRAWL_PRIORITY.set(priority)
+                try:
+                    result = await results_gen.__anext__()
+                except StopAsyncIteration:
+                    break
                 try:
-                    server_memory_mb = cls._get_memory_mb()
-                    result_dict = result.model_dump()
-                    result_dict['server_memory_mb'] = server_memory_mb
-                    logger.info(f"Streaming result for {result_dict.get('url', 'unknown')}")
-                    data = json.dumps(cls.create_processed_result(crawl_rule, result), default=datetime_handler, ensure_ascii=False) + "\n"
-                    yield data
+                    processed = await cls.create_processed_result(crawl_rule, result, include_fields)
+                    data = json.dumps(processed, default=datetime_handler, ensure_ascii=False) + "\n"
                 except Exception as e:
                     logger.error(f"Serialization error: {e}")
-                    error_response = {"error": str(e), "url": getattr(result, 'url', 'unknown')}
-                    yield json.dumps(error_response) + "\n"
-
+                    data = json.dumps({"error": str(e), "url": getattr(result, 'url', 'unknown')}) + "\n"
+                streamed += 1
+                yield data
+            yield json.dumps({
+                "status": "completed",
+                "results": streamed,
+                "server_processing_time_s": time.time() - start_time,
+            }) + "\n"
         except asyncio.CancelledError:
             logger.warning("Client disconnected during streaming")
+            raise
         finally:
-            # try:
-            #     await crawler.close()
-            # except Exception as e:
-            #     logger.error(f"Crawler cleanup error: {e}")
-            pass
+            # stops the pages still being crawled when the client went away
+            await results_gen.aclose()
+
+    @classmethod
+    async def stream_events(cls, lines: AsyncGenerator[str, None], heartbeat_sec: float = None) -> AsyncGenerator[
+        str, None]:
+        """Frame NDJSON lines as server-sent events, with keep-alive comments while pages are crawled."""
+        heartbeat_sec = heartbeat_sec or config.CRAWL_STREAM_HEARTBEAT_SEC
+        next_line = None
+        try:
+            while True:
+                if next_line is None:
+                    next_line = asyncio.ensure_future(lines.__anext__())
+                done, _ = await asyncio.wait({next_line}, timeout=heartbeat_sec)
+                if not done:
+                    yield ": keep-alive\n\n"
+                    continue
+                try:
+                    line = next_line.result()
+                except StopAsyncIteration:
+                    return
+                next_line = None
+                yield f"data: {line.rstrip()}\n\n"
+        finally:
+            if next_line is not None:
+                next_line.cancel()
+            await lines.aclose()
 
     @classmethod
     async def handle_crawl_request(
@@ -138,9 +293,34 @@ class Crawl4AIService:
             crawler_config: dict,
             query: list[str] | str = None,
             stream: bool = False,
-            rule_group: str = None
+            rule_group: str = None,
+            priority: CrawlPriority = None,
+            deadline_sec: float = None,
+            bypass_cache: bool = False,
+            include_fields: list[str] = None
     ) -> None | AsyncGenerator[str, None] | dict[str, bool | list[Any] | float | None | int]:
-        """Handle non-streaming crawl requests."""
+        """Handle non-streaming crawl requests.
+
+        ``priority`` and ``deadline_sec`` place the request's pages in the shared
+        crawl scheduler; when omitted they are inherited from the caller.
+        ``bypass_cache`` crawls every page again and refreshes its cached result.
+        ``include_fields`` names the heavy result fields (media, metadata,
+        screenshot) to return; all of them when omitted.
+        """
+        from component.crawl4ai import worker_farm
+        from component.crawl4ai.crawl_scheduler import CRAWL_PRIORITY, set_crawl_priority
+        priority_token = set_crawl_priority(priority, deadline_sec)
+        if not stream and worker_farm.is_enabled():
+            priority, deadline = CRAWL_PRIORITY.get()
+            CRAWL_PRIORITY.reset(priority_token)
+            result = await worker_farm.submit(urls=urls, browser_config=browser_config,
+                                              crawler_config=crawler_config, query=query,
+                                              stream=stream, rule_group=rule_group, priority=priority,
+                                              deadline_sec=deadline - time.time() if deadline else None,
+                                              bypass_cache=bypass_cache, include_fields=include_fields)
+            # the worker process cannot report the pages of a job as they finish
+            await areport_result_pages(result, source="worker")
+            return result
         start_mem_mb = cls._get_memory_mb()  # <--- Get memory before
         start_time = time.time()
         mem_delta_mb = None
@@ -165,6 +345,8 @@ class Crawl4AIService:
 
             if crawl_rule.css_selector:
                 crawler_config.css_selector = crawl_rule.css_selector
+            # expose the matched rule to the crawler hooks and the page pool
+            crawler_config.shared_data = {**(crawler_config.shared_data or {}), "crawl_rule": crawl_rule}
 
             markdown_generator = CrawlRule.build_markdown_generator(crawl_rule)
             crawler_config.markdown_generator = markdown_generator
@@ -177,23 +359,108 @@ class Crawl4AIService:
                 crawler_config.extraction_strategy=crawl_rule.get_extraction_strategy()
                 crawler_config.extraction_strategy.instruction.format(web_content=query)
 
-            dispatcher = SemaphoreDispatcher(
-                semaphore_count=config.SEMAPHORE_COUNT,
-                rate_limiter=RateLimiter(
-                    base_delay=config.RATE_LIMITER_BASE_DELAY,
-                ) if config.RATE_LIMITER_ENABLED else None
-            )
-
-            from component.crawl4ai.crawler_pool import get_crawler
-            crawler = await get_crawler(browser_config)
+            # pages crawled under the same rule and config share a key; results cached under it are
+            # served (expired ones after revalidation with the origin), identical crawls in flight joined
+            from component.cache.crawl_coalescer import COALESCER
+            from component.cache.crawl_result_cache import RESULT_CACHE, result_cache_key, result_cache_ttl, \
+                result_shareable, crawl_validators
+            cache_ttl = result_cache_ttl(crawl_rule, crawler_config)
+            page_keys = {url: result_cache_key(url, crawl_rule, browser_config, crawler_config, query)
+                         for url in urls} if result_shareable(crawl_rule, crawler_config) else {}
+            cached, revalidated = await RESULT_CACHE.lookup(page_keys, cache_ttl) \
+                if cache_ttl and not bypass_cache else ({}, {})
+            pending = [url for url in urls if page_keys.get(url) not in cached]
+
+            # slots, per-domain limits and rate limiting are owned by the shared scheduler
+            from component.crawl4ai.crawl_scheduler import DISPATCHER as dispatcher
+            from component.crawl4ai.crawler_pool import get_crawler, get_http_crawler
+            from component.crawl4ai.fetch_mode import fetch_mode, crawl_many_auto, http_run_config, fetched_over_http, \
+                FETCH_HTTP, FETCH_AUTO
+            mode = fetch_mode(crawl_rule, crawler_config)
+            if mode == FETCH_HTTP:
+                crawler_config = http_run_config(crawler_config)
             if crawl_rule.crawl_mode == CrawlMode.CLASSIC:
-                results = []
-                func = getattr(crawler, "arun" if len(urls) == 1 else "arun_many")
-                partial_func = partial(func,
-                                       urls[0] if len(urls) == 1 else urls,
-                                       config=crawler_config,
-                                       dispatcher=dispatcher)
-                results = await partial_func()
+                async def _crawl(batch: list[str]):
+                    if mode == FETCH_AUTO:
+                        # the browser is only started for pages the HTTP fetch cannot serve
+                        return await crawl_many_auto(batch, config=crawler_config, browser_config=browser_config)
+                    crawler = await get_http_crawler() if mode == FETCH_HTTP else await get_crawler(browser_config)
+                    func = getattr(crawler, "arun" if len(batch) == 1 else "arun_many")
+                    partial_func = partial(func,
+                                           batch[0] if len(batch) == 1 else batch,
+                                           config=crawler_config,
+                                           dispatcher=dispatcher)
+                    return await partial_func()
+
+                failures: dict[str, str] = {}
+                if not page_keys:
+                    # deep and streaming crawls return every page they reached, not one per url
+                    results = await _crawl(urls)
+                    if isinstance(results, AsyncGenerator):
+                        stream_results = cls.stream_results(crawler_config=crawler_config, crawl_rule=crawl_rule,
+                                                            results_gen=results, priority=CRAWL_PRIORITY.get(),
+                                                            include_fields=include_fields)
+                        return stream_results
+                    if len(urls) == 1 and not results.success:
+                        failures[urls[0]] = results.error_message
+                    processed_results = [await cls.create_processed_result(crawl_rule, result, include_fields)
+                                         for result in results]
+                    await areport_pages([page_event(result.url, result.success, error=result.error_message)
+                                         for result in results])
+                else:
+                    crawled: dict[str, Any] = {}
+                    cache_writes = []  # sent to the shared tier together, before the leases are released
+
+                    async def _process(batch: list[str], batch_results, flight=None):
+                        for url, result in zip(batch, batch_results):
+                            processed = await cls.create_processed_result(crawl_rule, result)
+                            if result.success:
+                                if cache_ttl:
+                                    validators = {**revalidated.get(page_keys[url], {}),
+                                                  **crawl_validators(result, fetched_over_http(result, mode))}
+                                    cache_writes.append(RESULT_CACHE.store(page_keys[url], processed, cache_ttl,
+                                                                           validators))
+                            else:
+                                failures[url] = result.error_message
+                            if flight is not None:
+                                flight.publish(url, processed if result.success else None)
+                            crawled[url] = processed
+                            await areport_page(url, result.success, error=result.error_message)
+
+                    async def _crawl_and_process(url: str, flight=None):
+                        await _process([url], await _crawl([url]), flight)
+
+                    await areport_pages([page_event(url, True, source="cache")
+                                         for url in urls if page_keys[url] in cached])
+
+                    # identical pages already being crawled, here or on another node, are waited for
+                    flight = await COALESCER.join({url: page_keys[url] for url in pending}, cache_ttl)
+                    try:
+                        # every page is cached locally, handed to its followers and reported as soon as it is done
+                        await asyncio.gather(*(_crawl_and_process(url, flight) for url in flight.crawl_urls))
+                        # nodes following the led pages read them from the shared tier
+                        await RESULT_CACHE.write(cache_writes)
+                        cache_writes.clear()
+                        shared = await flight.wait()
+                        for url, processed in shared.items():
+                            if processed is not None:
+                                crawled[url] = processed
+                        await areport_pages([page_event(url, True, source="coalesced")
+                                             for url, processed in shared.items() if processed is not None])
+                        # pages whose leader failed are crawled by this request after all
+                        retry = [url for url, processed in shared.items() if processed is None]
+                        await asyncio.gather(*(_crawl_and_process(url) for url in retry))
+                    finally:
+                        try:
+                            await RESULT_CACHE.write(cache_writes)
+                        finally:
+                            await flight.close()
+                    # back in request order, cached pages in between the crawled ones; shared and
+                    # cached results keep every field, the caller's selection is made here
+                    processed_results = [
+                        cls.select_result_fields(crawled[url] if url in crawled else cached[page_keys[url]],
+                                                 include_fields)
+                        for url in urls if url in crawled or page_keys[url] in cached]
 
                 # 6. Show usage stats
                 # crawler_config.extraction_strategy.show_usage()
@@ -207,47 +474,30 @@ class Crawl4AIService:
                 logger.info(
                     f"Memory usage: Start: {start_mem_mb} MB, End: {end_mem_mb} MB, Delta: {mem_delta_mb} MB, Peak: {peak_mem_mb} MB")
 
-                # Process results to handle PDF bytes
-                processed_results = []
-                if len(urls)==1 and not results.success:
+                if len(urls)==1 and urls[0] in failures:
                     return {
                         "success": False,
-                        "results": results.error_message
+                        "results": failures[urls[0]]
                     }
-                else:
-                    if not isinstance(results, AsyncGenerator):
-                        for result in results:
-                            processed_results.append(await cls.create_processed_result(crawl_rule, result))
-                        return {
-                            "success": True,
-                            "results": processed_results,
-                            "server_processing_time_s": end_time - start_time,
-                        }
-                    else:
-                        stream_results = cls.stream_results(crawler_config=crawler_config,crawl_rule=crawl_rule, results_gen=results)
-
-                        return stream_results
+                return {
+                    "success": True,
+                    "results": processed_results,
+                    "server_processing_time_s": end_time - start_time,
+                }
             else:  # Adaptive crawl
-
+                crawler = await get_crawler(browser_config)
                 adaptive_crawler = crawl_rule.build_adaptive_crawler(crawler)
                 processed_results = []
                 for url in urls:
-                    # View statistics
-                    adaptive_crawler.print_stats()
-                    result = await adaptive_crawler.digest(url, query)
-                    # Get the most relevant content
-                    relevant_pages = adaptive_crawler.get_relevant_content(top_k=5)
-                    for page in relevant_pages:
-                        print(f"- {page['url']} (score: {page['score']:.2f})")
-                        if float(page['score'])>1.0:
-                            res = await cls.handle_crawl_request(
-                                urls=page['url'],
-                                browser_config=jsonable_encoder(obj=browser_config),
-                                crawler_config=jsonable_encoder(obj=crawler_config),
-                                query=query
-                            )
-                            if res.get('success',False):
-                                processed_results.append(res.get('results',[]))  # Assuming single URL per call
+                    state = await adaptive_crawler.digest(url, query)
+                    # the relevant pages were crawled by the digest already, their results are kept in its state
+                    relevant_pages = [page for page in adaptive_crawler.get_relevant_content(top_k=5)
+                                      if float(page['score']) >= config.CRAWL_ADAPTIVE_MIN_SCORE]
+                    logger.debug(f"Adaptive crawl of {url}: confidence {adaptive_crawler.confidence:.2f}, "
+                                 f"{len(relevant_pages)} relevant of {len(state.knowledge_base)} pages")
+                    processed_results.extend(await cls.adaptive_results(
+                        crawl_rule, [state.knowledge_base[page['index']] for page in relevant_pages],
+                        crawler, crawler_config, dispatcher, include_fields))
                 if processed_results:
                     return {
                         "success": True,
@@ -281,94 +531,366 @@ class Crawl4AIService:
                     "server_peak_memory_mb": max(peak_mem_mb if peak_mem_mb else 0, end_mem_mb_error or 0)
                 })
             )
+        finally:
+            CRAWL_PRIORITY.reset(priority_token)
 
     @classmethod
-    async def create_processed_result(cls, crawl_rule: CrawlRule | None, result) -> Any:
-        data = None
-        result_dict = result.model_dump()
-        if result_dict.get('extracted_content'):
-            data = result_dict['extracted_content']
-        else:
+    async def adaptive_results(cls, crawl_rule: CrawlRule, pages: list, crawler, crawler_config: CrawlerRunConfig,
+                               dispatcher=None, include_fields: list[str] = None) -> list[dict]:
+        """Processed results of pages from the knowledge base of an adaptive crawl.
+
+        Their markdown is generated again in-process by the rule's generator, the
+        adaptive crawler having crawled them with its own config. Only pages whose
+        content the knowledge base cannot give (no html, a pdf, an LLM extraction)
+        are crawled again, together.
+        """
+        generator = crawler_config.markdown_generator
+        processed: dict[str, dict] = {}
+        missing = []
+        for result in pages:
+            html = result.cleaned_html or result.html
+            if not html or crawl_rule.crawl_result_type == CrawlResultType.PDF or crawl_rule.extraction_strategy:
+                missing.append(result.url)
+                continue
+            if crawl_rule.crawl_result_type == CrawlResultType.MARKDOWN and generator is not None:
+                # filters can take a while on large pages, the event loop keeps serving meanwhile
+                result.markdown = await asyncio.to_thread(generator.generate_markdown, input_html=html,
+                                                          base_url=result.url)
+            page = await cls.create_processed_result(crawl_rule, result, include_fields)
+            if page.get("crawl_text"):
+                processed[result.url] = page
+                await areport_page(result.url, True, source="adaptive")
+            else:
+                missing.append(result.url)
+        if missing:
+            results = await crawler.arun_many(missing, config=crawler_config.clone(stream=False),
+                                              dispatcher=dispatcher)
+            for result in results:
+                if result.success:
+                    processed[result.url] = await cls.create_processed_result(crawl_rule, result, include_fields)
+            await areport_pages([page_event(result.url, result.success, error=result.error_message)
+                                 for result in results])
+        return [processed[result.url] for result in pages if result.url in processed]
+
+    @classmethod
+    async def create_processed_result(cls, crawl_rule: CrawlRule | None, result,
+                                      include_fields: list[str] = None) -> Any:
+        """Project ``result`` onto the response fields.
+
+        Only the text field selected by the rule's ``crawl_result_type`` is read and
+        the heavy fields are passed by reference, so nothing of the crawl result
+        (raw html, links, pdf bytes, ...) is copied. Screenshots and pdfs go to the
+        blob store and are returned as references to it. Pages of a rule with a
+        registered html parser, the search engines, also get the parsed
+        ``search_results``.
+        """
+        data = result.extracted_content
+        pdf = None
+        if not data:
             if crawl_rule.crawl_result_type == CrawlResultType.MARKDOWN:
-                if result_dict.get('markdown') is not None and result_dict.get('markdown').get('fit_markdown') is not None and result_dict.get('markdown').get('fit_markdown') != '':
-                    data = result_dict['markdown']['fit_markdown']
-                else:
-                    data = result_dict['markdown']['raw_markdown']
+                markdown = result.markdown
+                if markdown is not None:
+                    data = markdown.fit_markdown or markdown.raw_markdown
             elif crawl_rule.crawl_result_type == CrawlResultType.PDF:
-                if result_dict.get('pdf') is not None and result_dict.get('pdf') != '':
-                    data = b64encode(result_dict['pdf']).decode('utf-8')
+                if result.pdf:
+                    pdf = await cls.store_blob(result.pdf, "pdf")
+                    data = pdf["uri"] if pdf else b64encode(result.pdf).decode('utf-8')
             else:  # HTML
-                if result_dict.get('cleaned_html') is not None and result_dict.get('cleaned_html')!='':
-                    data = result_dict['cleaned_html']
-                else:
-                    data = result_dict.get('fit_html')
+                data = result.cleaned_html or result.fit_html
 
-        return {
-            "url": result_dict.get('url', ''),
+        screenshot = result.screenshot or ""
+        if screenshot and (include_fields is None or "screenshot" in include_fields):
+            screenshot = await cls.store_blob(b64decode(screenshot), "screenshot") or screenshot
+
+        processed = {
+            "url": result.url or '',
             "crawl_text": data,
             "crawl_type": CrawlResultType.value_of(crawl_rule.crawl_result_type) if crawl_rule else 'html',
-            "crawl_media": result_dict.get('media', {}),
-            "screenshot": result_dict.get('screenshot') if result_dict.get('screenshot') else "",
-            "metadata": result_dict.get('metadata', {}),
+            "crawl_media": result.media or {},
+            "screenshot": screenshot,
+            "metadata": result.metadata or {},
             "hit_rule": crawl_rule.name if crawl_rule else "default",
         }
+        if pdf:
+            processed["pdf"] = pdf
+        parser = get_html_parser(crawl_rule.name) if crawl_rule else None
+        if parser is not None and result.html:
+            # read from the raw html, the css selection of the rule drops the markup the parser needs
+            try:
+                processed["search_results"] = await asyncio.to_thread(parser.parse, result.html)
+            except Exception as e:
+                logger.warning(f"Parsing {result.url} with the {crawl_rule.name} parser failed: {e}")
+        return cls.select_result_fields(processed, include_fields)
+
+    @classmethod
+    async def store_blob(cls, data: bytes, kind: str) -> dict | None:
+        """Reference to ``data`` in the blob store; None when it is returned inline."""
+        if not config.CRAWL_BLOB_STORE_ENABLED:
+            return None
+        try:
+            return await BLOB_STORE.put(data, kind)
+        except OSError as e:
+            logger.warning(f"Blob store write failed, returning the {kind} inline: {e}")
+            return None
+
+    @classmethod
+    def select_result_fields(cls, processed: dict, include_fields: list[str] = None) -> dict:
+        """``processed`` without the heavy fields left out of ``include_fields``; all of them when it is None."""
+        if include_fields is None:
+            return processed
+        dropped = {field for option, field in HEAVY_RESULT_FIELDS.items() if option not in include_fields}
+        return {name: value for name, value in processed.items() if name not in dropped}
 
     @classmethod
     async def handle_crawl_job(
             cls,
-            background_tasks: BackgroundTasks,
+            background_tasks: BackgroundTasks | None,
             urls: List[str],
             browser_config: Dict,
             crawler_config: Dict,
             query: list[str] | str = None,
             stream: bool = False,
-            notify_url: str = None
+            notify_url: str = None,
+            priority: CrawlPriority = CrawlPriority.BACKGROUND,
+            deadline_sec: float = None,
+            bypass_cache: bool = False,
+            include_fields: list[str] = None,
+            bulk: bool = False
     ) -> Any:
         """
         Fire-and-forget version of handle_crawl_request.
         Creates a aduib_task in Redis, runs the heavy work in a background aduib_task,
         lets /crawl/job/{task_id} polling fetch the result.
+        Without ``background_tasks`` (RPC callers) the job runs as a task of the event loop.
         """
         task_id = f"crawl_{uuid4().hex[:8]}"
-        redis.hset(f"aduib_task:{task_id}", mapping={
-            "status": TaskStatus.PROCESSING,  # <-- keep enum values consistent
-            "created_at": datetime.now().isoformat(),
-            "url": json.dumps(urls),  # store list as JSON string
-            "result": "",
-            "error": "",
-        })
+        job = dict(task_id=task_id, urls=urls, browser_config=browser_config, crawler_config=crawler_config,
+                   query=query, stream=stream, notify_url=notify_url, priority=priority,
+                   deadline_at=time.time() + deadline_sec if deadline_sec else None,
+                   bypass_cache=bypass_cache, include_fields=include_fields, bulk=bulk)
+
+        from component.crawl4ai import job_queue
+        # the task, its first event and its queue entry go out in one round trip
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.hset(f"aduib_task:{task_id}", mapping={
+                "status": TaskStatus.PROCESSING,  # <-- keep enum values consistent
+                "created_at": datetime.now().isoformat(),
+                "url": json.dumps(urls),  # store list as JSON string
+                "result": "",
+                "error": "",
+            })
+            publish_status(task_id, TaskStatus.PROCESSING, pipe, urls=len(urls), queued=job_queue.is_enabled())
+            if job_queue.is_enabled():
+                # run by the worker processes, survives restarts of this one
+                job_queue.enqueue(jsonable_encoder(job), pipe)
+            await pipe.execute()
+        if job_queue.is_enabled():
+            return {"task_id": task_id}
 
         async def _runner():
             try:
-                from service.notify import CrawlResultNotifyHandler
-                notify_handler = CrawlResultNotifyHandler(urls) if notify_url else None
-                result = await cls.handle_crawl_request(
-                    urls=urls,
-                    browser_config=browser_config,
-                    crawler_config=crawler_config,
-                    query=query,
-                    stream=stream
-                )
-                redis.hset(f"aduib_task:{task_id}", mapping={
+                await cls.run_crawl_job(**job)
+            except Exception as exc:
+                async with redis.pipeline(transaction=False) as pipe:
+                    pipe.hset(f"aduib_task:{task_id}", mapping={
+                        "status": TaskStatus.FAILED,
+                        "completed_at": datetime.now().isoformat(),
+                        "error": str(exc),
+                    })
+                    publish_status(task_id, TaskStatus.FAILED, pipe, error=str(exc))
+                    await pipe.execute()
+
+        if background_tasks is None:
+            task = asyncio.create_task(_runner())
+            _BACKGROUND_JOBS.add(task)
+            task.add_done_callback(_BACKGROUND_JOBS.discard)
+        else:
+            background_tasks.add_task(_runner)
+        return {"task_id": task_id}
+
+    @classmethod
+    async def run_crawl_job(
+            cls,
+            task_id: str,
+            urls: List[str],
+            browser_config: Dict,
+            crawler_config: Dict,
+            query: list[str] | str = None,
+            stream: bool = False,
+            notify_url: str = None,
+            priority: CrawlPriority = CrawlPriority.BACKGROUND,
+            deadline_at: float = None,
+            bypass_cache: bool = False,
+            include_fields: list[str] = None,
+            bulk: bool = False
+    ):
+        """Run a crawl job and record its result under ``aduib_task:{task_id}``; raises when it fails.
+
+        Its pages are reported to the job's events as they finish.
+        """
+        if bulk:
+            with report_job_pages(task_id):
+                return await cls.run_bulk_crawl_job(task_id, urls, browser_config, crawler_config, query=query,
+                                                    notify_url=notify_url, priority=priority,
+                                                    deadline_at=deadline_at, bypass_cache=bypass_cache,
+                                                    include_fields=include_fields)
+        with report_job_pages(task_id):
+            result = await cls.handle_crawl_request(
+                urls=urls,
+                browser_config=browser_config,
+                crawler_config=crawler_config,
+                query=query,
+                stream=stream,
+                priority=priority,
+                deadline_sec=max(deadline_at - time.time(), 0.001) if deadline_at else None,
+                bypass_cache=bypass_cache,
+                include_fields=include_fields
+            )
+        ttl = timedelta(days=7)
+        pages = result.get("results") if isinstance(result, dict) else None
+        async with redis.pipeline(transaction=False) as pipe:
+            if isinstance(pages, list):
+                # pages go to their own compressed chunks, the hash keeps what a status poll reads
+                pipe.hset(f"aduib_task:{task_id}", mapping={
                     "status": TaskStatus.COMPLETED,
-                    "result": json.dumps(result),
+                    "completed_at": datetime.now().isoformat(),
+                    "result": json.dumps({k: v for k, v in result.items() if k != "results"}),
+                    "result_pages": push_results(pipe, task_id, pages, ttl, replace=True),
+                    "result_encoding": RESULT_ENCODING,
+                    "error": "",
                 })
-                redis.expire(f"aduib_task:{task_id}", timedelta(days=7))
-                await notify_handler.notify(result)
-                await asyncio.sleep(5)  # Give Redis time to process the update
-            except Exception as exc:
-                redis.hset(f"aduib_task:{task_id}", mapping={
-                    "status": TaskStatus.FAILED,
-                    "error": str(exc),
+            else:
+                pipe.hset(f"aduib_task:{task_id}", mapping={
+                    "status": TaskStatus.COMPLETED,
+                    "completed_at": datetime.now().isoformat(),
+                    "result": json.dumps(result),
+                    "error": "",
                 })
+            pipe.expire(f"aduib_task:{task_id}", ttl)
+            publish_status(task_id, TaskStatus.COMPLETED, pipe,
+                           success=bool(isinstance(result, dict) and result.get("success")),
+                           pages=len(pages) if isinstance(pages, list) else None)
+            await pipe.execute()
+        if notify_url:
+            from service.notify import CrawlResultNotifyHandler
+            await CrawlResultNotifyHandler(urls, notify_url).notify(result)
 
-        background_tasks.add_task(_runner)
-        return {"task_id": task_id}
+    @classmethod
+    async def handle_bulk_crawl_job(
+            cls,
+            background_tasks: BackgroundTasks | None,
+            urls: List[str],
+            browser_config: Dict,
+            crawler_config: Dict,
+            query: list[str] | str = None,
+            notify_url: str = None,
+            priority: CrawlPriority = CrawlPriority.BACKGROUND,
+            deadline_sec: float = None,
+            bypass_cache: bool = False,
+            include_fields: list[str] = None
+    ) -> dict:
+        """Job for a large url list: deduplicated, then crawled in batches of one host and rule each.
+
+        Returns the task id with what was made of the urls; pages are readable from
+        /crawl/job/{task_id} batch by batch while the job runs.
+        """
+        if len(urls) > config.CRAWL_BULK_MAX_URLS:
+            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                                detail=f"at most {config.CRAWL_BULK_MAX_URLS} urls per bulk crawl")
+        plan = plan_bulk_crawl(urls)
+        if not plan.groups:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="no crawlable urls")
+        response = await cls.handle_crawl_job(background_tasks, plan.urls, browser_config, crawler_config, query,
+                                              notify_url=notify_url, priority=priority, deadline_sec=deadline_sec,
+                                              bypass_cache=bypass_cache, include_fields=include_fields, bulk=True)
+        return {**response, **plan.summary(), "invalid_urls": plan.invalid}
 
     @classmethod
-    async def handle_web_search_job(cls, payload:WebEngineCrawlJobPayload):
+    async def run_bulk_crawl_job(
+            cls,
+            task_id: str,
+            urls: List[str],
+            browser_config: Dict,
+            crawler_config: Dict,
+            query: list[str] | str = None,
+            notify_url: str = None,
+            priority: CrawlPriority = CrawlPriority.BACKGROUND,
+            deadline_at: float = None,
+            bypass_cache: bool = False,
+            include_fields: list[str] = None
+    ) -> dict:
+        """Crawl the urls of a bulk job batch by batch, storing the pages of every batch as soon as it is done.
+
+        A failing batch fails its own pages only; they are stored with the error instead
+        of a result and the job goes on.
+        """
+        start_time = time.time()
+        plan = plan_bulk_crawl(urls)
+        task_key = f"aduib_task:{task_id}"
+        ttl = timedelta(days=7)
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.delete(results_key(task_id))  # a retried job starts over
+            pipe.hset(task_key, mapping={"result_pages": 0, "result_encoding": RESULT_ENCODING})
+            await pipe.execute()
+        slots = asyncio.Semaphore(max(1, config.CRAWL_BULK_CONCURRENT_BATCHES))
+        failed = stored = 0
+
+        async def _run_batch(batch: list[str]):
+            nonlocal failed, stored
+            async with slots:
+                try:
+                    result = await cls.handle_crawl_request(
+                        urls=batch,
+                        browser_config=browser_config,
+                        crawler_config=crawler_config,
+                        query=query,
+                        priority=priority,
+                        deadline_sec=max(deadline_at - time.time(), 0.001) if deadline_at else None,
+                        bypass_cache=bypass_cache,
+                        include_fields=include_fields
+                    )
+                except Exception as exc:
+                    error = getattr(exc, "detail", None) or str(exc)
+                    logger.warning(f"Bulk crawl {task_id}: batch of {batch[0]} failed: {error}")
+                    await areport_pages([page_event(url, False, error=error) for url in batch])
+                    result = {"success": False, "results": error}
+                pages = result.get("results") if isinstance(result, dict) else None
+                if not isinstance(pages, list):
+                    failed += len(batch)
+                    pages = [{"url": url, "error": str(pages)} for url in batch]
+                async with redis.pipeline(transaction=False) as pipe:
+                    stored += push_results(pipe, task_id, pages, ttl)
+                    pipe.hincrby(task_key, "result_pages", len(pages))
+                    await pipe.execute()
+
+        await asyncio.gather(*(_run_batch(batch) for batch in plan.batches(config.CRAWL_BULK_BATCH_SIZE)))
+        result = {"success": True, **plan.summary(), "failed": failed,
+                  "server_processing_time_s": time.time() - start_time}
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.hset(task_key, mapping={
+                "status": TaskStatus.COMPLETED,
+                "completed_at": datetime.now().isoformat(),
+                "result": json.dumps(result),
+                "error": "",
+            })
+            pipe.expire(task_key, ttl)
+            publish_status(task_id, TaskStatus.COMPLETED, pipe, success=True, pages=stored, failed=failed)
+            await pipe.execute()
+        if notify_url:
+            from service.notify import CrawlResultNotifyHandler
+            # the pages stay in the job, the summary tells where to page them from
+            await CrawlResultNotifyHandler(urls, notify_url).notify({**result, "task_id": task_id, "pages": stored})
+        return result
+
+    @classmethod
+    async def handle_web_search_job(cls, payload:WebEngineCrawlJobPayload, priority: CrawlPriority = None):
         """
         Handle web search job requests.
+
+        The results page of the engine is crawled and, where the engine has a
+        registered parser, returned with its ``search_results``. With
+        ``payload.fetch_top`` the top results are crawled in parallel as well and
+        returned as ``result_pages``.
         """
         web_search_group = get_rules_by_group("common_search_engine")
         if web_search_group is None or len(web_search_group.rules)==0:
@@ -378,6 +900,7 @@ class Crawl4AIService:
             )
         results=[]
         urls=[]
+        priority = payload.priority or priority
         crawler_config=merge_dicts(default_crawler_config, {'screenshot': False})
         content = urllib.parse.quote(payload.web_content)
         for rule in web_search_group.rules:
@@ -389,5 +912,44 @@ class Crawl4AIService:
                     default_browser_config,
                     crawler_config,
                     content,
-                    False)
-        return results
\ No newline at end of file
+                    False,
+                    priority=priority,
+                    bypass_cache=payload.bypass_cache,
+                    include_fields=payload.include_fields)
+        fetch_top = min(payload.fetch_top, config.CRAWL_SEARCH_MAX_FETCH_TOP)
+        if fetch_top > 0 and isinstance(results, dict) and results.get("success"):
+            links = [item["link"] for page in results["results"] for item in page.get("search_results") or []]
+            results["result_pages"] = await cls.fetch_search_results(
+                list(dict.fromkeys(links))[:fetch_top], crawler_config, priority=priority,
+                bypass_cache=payload.bypass_cache, include_fields=payload.include_fields)
+        return results
+
+    @classmethod
+    async def fetch_search_results(cls, links: list[str], crawler_config: dict, priority: CrawlPriority = None,
+                                   bypass_cache: bool = False, include_fields: list[str] = None) -> list[dict]:
+        """Crawl the pages of ``links`` in parallel, each under its own rule; pages that failed are left out."""
+        async def _fetch(link: str) -> list[dict]:
+            try:
+                result = await cls.handle_crawl_request([link], default_browser_config, crawler_config,
+                                                        priority=priority, bypass_cache=bypass_cache,
+                                                        include_fields=include_fields)
+            except HTTPException as e:
+                logger.warning(f"Crawling search result {link} failed: {e.detail}")
+                return []
+            return result["results"] if result.get("success") else []
+
+        pages = await asyncio.gather(*(_fetch(link) for link in links))
+        return [page for found in pages for page in found]
+
+    @classmethod
+    def search_result_texts(cls, content: dict) -> list[str]:
+        """Texts of a web search response: one per search result, the page text where no parser found any."""
+        response = WebSearchResponse.model_validate(content)
+        texts = []
+        for page in response.results:
+            if page.search_results:
+                texts.extend(f"{item.title}\n{item.link}\n{item.snippet}" for item in page.search_results)
+            else:
+                texts.append(page.crawl_text)
+        texts.extend(page.crawl_text for page in response.result_pages)
+        return texts
@@ -7,20 +7,22 @@ from utils.http import BaseClient
 class CrawlResultNotifyHandler:
     """Crawl result notification handler."""
 
-    def __init__(self, urls: list[str]):
+    def __init__(self, urls: list[str], notify_url: str = None):
         self.urls = urls
+        self.notify_url = notify_url
         self.client=BaseClient()
 
     async def notify(self,result):
         """Notify the crawl result."""
-        if not result.notify_url:
+        if not self.notify_url:
             return
 
         async def async_callback():
             try:
-                self.client.request(
+                await asyncio.to_thread(
+                    self.client.request,
                     method="POST",
-                    path=result.notify_url,
+                    path=self.notify_url,
                     headers={"Content-Type": "application/json"},
                     data=json.dumps(result),
                 )
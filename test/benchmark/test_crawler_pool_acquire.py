@@ -0,0 +1,56 @@
+import asyncio
+import statistics
+import time
+
+from crawl4ai import BrowserConfig
+
+from component.crawl4ai import crawler_pool
+from test.crawler.pool_fakes import isolate_pool
+
+COLD_START_SEC = 1.0
+CONCURRENT_CALLS = 200
+
+
+def _p99(samples: list[float]) -> float:
+    return statistics.quantiles(samples, n=100)[98]
+
+
+def test_get_crawler_p99_during_cold_start(monkeypatch):
+    """Benchmark: warm lookups must not wait on another signature's cold start.
+
+    A slow browser launch is simulated for one signature while 200 concurrent
+    ``get_crawler`` calls hit an already-warm signature and 50 more pile onto the
+    cold one. Prints the p99 acquire latency of the warm callers.
+    """
+    starts = isolate_pool(monkeypatch, COLD_START_SEC)
+
+    cold_cfg = BrowserConfig(browser_mode="dedicated")
+    warm_cfg = BrowserConfig(browser_mode="builtin")
+    warm_crawler = object()
+    crawler_pool.POOL[crawler_pool._sig(warm_cfg)] = warm_crawler
+
+    async def timed(cfg):
+        started = time.perf_counter()
+        crawler = await crawler_pool.get_crawler(cfg)
+        return crawler, time.perf_counter() - started
+
+    async def _run():
+        cold = [asyncio.create_task(timed(cold_cfg)) for _ in range(50)]
+        await asyncio.sleep(0.05)  # let the leader enter its browser start
+        warm = await asyncio.gather(*(timed(warm_cfg) for _ in range(CONCURRENT_CALLS)))
+        cold_done = await asyncio.gather(*cold)
+        return warm, cold_done
+
+    warm, cold = asyncio.run(_run())
+
+    warm_latencies = [elapsed for _, elapsed in warm]
+    p99 = _p99(warm_latencies)
+    print(f"\nget_crawler warm p99 during cold start: {p99 * 1000:.2f} ms "
+          f"(cold start {COLD_START_SEC * 1000:.0f} ms, {CONCURRENT_CALLS} callers)")
+
+    assert all(crawler is warm_crawler for crawler, _ in warm)
+    assert p99 < COLD_START_SEC / 10
+    # every cold caller shares the single in-flight startup
+    assert len(starts) == 1
+    assert len({id(crawler) for crawler, _ in cold}) == 1
+    assert not crawler_pool.STARTING
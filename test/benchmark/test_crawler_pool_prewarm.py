@@ -0,0 +1,56 @@
+import asyncio
+import time
+
+from component.crawl4ai import crawler_pool
+from test.crawler.pool_fakes import isolate_pool
+
+COLD_START_SEC = 0.5
+
+
+def test_min_warm_floor_blocks_idle_eviction(monkeypatch):
+    isolate_pool(monkeypatch, COLD_START_SEC)
+
+    async def _run():
+        await crawler_pool.prewarm_pool([{"count": 1, "min_warm": 1}])
+        (sig,) = crawler_pool.POOL
+        await crawler_pool._evict_expired(time.time() + crawler_pool.config.IDLE_TTL_SEC + 1)
+        return sig
+
+    sig = asyncio.run(_run())
+    assert sig in crawler_pool.POOL
+    assert crawler_pool.EXPIRY_HEAP
+
+
+def test_standby_promotion_after_idle_eviction(monkeypatch):
+    """Benchmark: the first request after an idle eviction is served by a warm standby.
+
+    Boots a 3-browser spec (started in parallel), evicts the pooled browser as idle
+    and prints the latency of the next ``get_crawler`` against a cold start.
+    """
+    isolate_pool(monkeypatch, COLD_START_SEC)
+
+    async def _run():
+        started = time.perf_counter()
+        await crawler_pool.prewarm_pool([{"count": 3, "min_warm": 1}])
+        boot = time.perf_counter() - started
+        (sig,) = crawler_pool.POOL
+        assert len(crawler_pool.STANDBY[sig]) == 2
+
+        await crawler_pool._evict_expired(time.time() + crawler_pool.config.IDLE_TTL_SEC + 1)
+        assert sig not in crawler_pool.POOL
+        assert len(crawler_pool.STANDBY[sig]) == 1  # trimmed down to the floor
+
+        started = time.perf_counter()
+        await crawler_pool.get_crawler(crawler_pool.CONFIGS[sig])
+        after_idle = time.perf_counter() - started
+        await asyncio.gather(*crawler_pool.BACKGROUND)
+        return sig, boot, after_idle
+
+    sig, boot, after_idle = asyncio.run(_run())
+    print(f"\nprewarm: 3 browsers booted in {boot * 1000:.0f} ms, first request after idle "
+          f"{after_idle * 1000:.2f} ms (cold start {COLD_START_SEC * 1000:.0f} ms)")
+
+    assert boot < COLD_START_SEC * 2  # started in parallel, not one after another
+    assert after_idle < COLD_START_SEC / 10
+    # the promoted standby is replaced in the background
+    assert crawler_pool._warm_count(sig) == 3
@@ -0,0 +1,111 @@
+import asyncio
+import threading
+import time
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from types import SimpleNamespace
+
+from crawl4ai import BrowserConfig, CrawlerRunConfig
+
+from component.crawl4ai import crawler_pool, fetch_mode
+from component.crawl4ai.fetch_mode import crawl_auto, MAX_FALLBACKS
+
+PAGES = 200
+
+ARTICLE = """<html><head><title>post</title></head><body>
+<div id="nav">home | archive</div>
+<div id="topics"><h1>Static post</h1>{}</div>
+</body></html>""".format("<p>" + "Server rendered paragraph with enough text to extract. " * 8 + "</p>" * 5)
+SHELL = """<html><head><title>app</title><script src="/app.js"></script></head><body>
+<noscript>You need to enable JavaScript to run this app.</noscript><div id="root"></div>
+</body></html>"""
+
+
+class _Handler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def _serve(directory):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(_Handler, directory=str(directory)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+class _FakeBrowserCrawler:
+    def __init__(self):
+        self.urls = []
+
+    async def arun(self, url, config=None, **kw):
+        self.urls.append(url)
+        return SimpleNamespace(success=True, status_code=200, url=url, metadata={})
+
+
+def _isolate(monkeypatch, browser_crawler):
+    async def fake_get_crawler(cfg):
+        return browser_crawler
+
+    monkeypatch.setattr(crawler_pool, "get_crawler", fake_get_crawler)
+    monkeypatch.setattr(crawler_pool, "HTTP_CRAWLER", None)
+    monkeypatch.setattr(crawler_pool, "HTTP_CRAWLER_LOCK", asyncio.Lock())
+    monkeypatch.setattr(fetch_mode, "DOMAINS", fetch_mode.OrderedDict())
+    monkeypatch.setattr(fetch_mode, "FETCH_STATS", {"http": 0, "browser": 0, "fallbacks": 0})
+
+
+def test_http_fast_path_throughput(tmp_path, monkeypatch):
+    """Benchmark: static pages are served by the HTTP crawler without starting a browser.
+
+    Crawls 200 server-rendered pages in ``auto`` mode from a local server and
+    prints the pages/sec of the HTTP path.
+    """
+    (tmp_path / "post.html").write_text(ARTICLE)
+    browser = _FakeBrowserCrawler()
+    _isolate(monkeypatch, browser)
+    server, base = _serve(tmp_path)
+    config, browser_config = CrawlerRunConfig(css_selector="div#topics"), BrowserConfig()
+
+    async def _run():
+        try:
+            started = time.perf_counter()
+            results = await asyncio.gather(
+                *(crawl_auto(f"{base}/post.html?p={i}", config, browser_config) for i in range(PAGES)))
+            return results, time.perf_counter() - started
+        finally:
+            await crawler_pool.close_all()
+
+    try:
+        results, elapsed = asyncio.run(_run())
+    finally:
+        server.shutdown()
+    print(f"\nHTTP fetch: {PAGES} pages in {elapsed:.2f}s ({PAGES / elapsed:.0f} pages/sec)")
+    assert all(r.success for r in results)
+    assert "Static post" in results[0].markdown.raw_markdown
+    assert "home | archive" not in results[0].markdown.raw_markdown  # css_selector applied
+    assert results[0].metadata["crawl_report"]["fetch"]["mode"] == "http"
+    assert not browser.urls
+
+
+def test_javascript_shell_falls_back_to_browser(tmp_path, monkeypatch):
+    (tmp_path / "spa.html").write_text(SHELL)
+    browser = _FakeBrowserCrawler()
+    _isolate(monkeypatch, browser)
+    server, base = _serve(tmp_path)
+
+    async def _run():
+        try:
+            return [await crawl_auto(f"{base}/spa.html?p={i}", CrawlerRunConfig(), BrowserConfig())
+                    for i in range(MAX_FALLBACKS + 2)]
+        finally:
+            await crawler_pool.close_all()
+
+    try:
+        results = asyncio.run(_run())
+    finally:
+        server.shutdown()
+    fetches = [r.metadata["crawl_report"]["fetch"] for r in results]
+    assert all(f["mode"] == "browser" for f in fetches)
+    assert fetches[0]["fallback_reason"] == "javascript shell"
+    # a domain that never works over HTTP stops paying for the HTTP attempt
+    assert fetches[-1]["fallback_reason"] == "domain needs browser"
+    assert fetch_mode.FETCH_STATS["fallbacks"] == MAX_FALLBACKS
+    assert len(browser.urls) == MAX_FALLBACKS + 2
@@ -0,0 +1,104 @@
+import asyncio
+import base64
+import json
+import tracemalloc
+
+import psutil
+from crawl4ai import CrawlResult
+from crawl4ai.models import MarkdownGenerationResult
+
+from component.storage.blob_store import FileBlobStore
+from configs.crawl4ai.types import CrawlRule
+from service import crawl4ai_service
+from service.crawl4ai_service import Crawl4AIService
+
+PAGES = 20
+PAGE_BYTES = 1_000_000
+
+
+def _large_page(i: int) -> CrawlResult:
+    html = "<html><body>" + "<p>paragraph of a large page</p>" * (PAGE_BYTES // 32) + "</body></html>"
+    return CrawlResult(
+        url=f"https://a.com/{i}",
+        html=html,
+        cleaned_html=html,
+        success=True,
+        links={"internal": [{"href": f"https://a.com/{i}/{n}", "text": "link"} for n in range(2000)]},
+        media={"images": [{"src": f"https://a.com/{i}/{n}.png", "alt": "image"} for n in range(200)]},
+        screenshot=base64.b64encode(b"\0" * PAGE_BYTES).decode(),
+        pdf=b"\0" * PAGE_BYTES,
+        metadata={"title": f"page {i}"},
+        markdown=MarkdownGenerationResult(raw_markdown="text of a large page " * 1000, markdown_with_citations="",
+                                          references_markdown="", fit_markdown="fit text " * 100),
+    )
+
+
+def _peak(func) -> tuple[int, float]:
+    """Peak traced allocation of ``func`` in bytes, and the RSS growth in MB."""
+    rss = psutil.Process().memory_info().rss
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1], (psutil.Process().memory_info().rss - rss) / 2 ** 20
+    finally:
+        tracemalloc.stop()
+
+
+def _dumped_result(result: CrawlResult) -> dict:
+    """The response as it was built before the projection: from a full ``model_dump``."""
+    result_dict = result.model_dump()
+    return {
+        "url": result_dict.get("url", ""),
+        "crawl_text": result_dict["markdown"]["fit_markdown"] or result_dict["markdown"]["raw_markdown"],
+        "crawl_type": "markdown",
+        "crawl_media": result_dict.get("media", {}),
+        "screenshot": result_dict.get("screenshot") or "",
+        "metadata": result_dict.get("metadata", {}),
+        "hit_rule": "a",
+    }
+
+
+def test_projection_allocates_a_fraction_of_a_dump(tmp_path, monkeypatch):
+    """Benchmark: serializing large crawl results through the projection.
+
+    Serializes 20 pages of ~1MB html, screenshot and pdf each the way results
+    used to be built (a full ``model_dump`` per result), with the projection,
+    and with the projection limited to the text, and prints the peak traced
+    allocation and RSS growth of each.
+    """
+    monkeypatch.setattr(crawl4ai_service, "BLOB_STORE", FileBlobStore(str(tmp_path)))
+    rule = CrawlRule(name="a", url="a.com")
+    pages = [_large_page(i) for i in range(PAGES)]
+
+    def _project(include_fields):
+        return lambda page: asyncio.run(Crawl4AIService.create_processed_result(rule, page, include_fields))
+
+    def _serialize(build):
+        def _run():
+            for page in pages:
+                json.dumps(build(page))
+        return _run
+
+    peaks = {name: _peak(_serialize(build))
+             for name, build in (("model_dump", _dumped_result), ("projection", _project(None)),
+                                 ("projection, text only", _project([])))}
+    print()
+    for name, (peak, rss) in peaks.items():
+        print(f"{name}: peak {peak / 2 ** 20:.1f} MB traced, RSS +{rss:.1f} MB")
+    assert peaks["projection"][0] <= peaks["model_dump"][0]
+    assert peaks["projection, text only"][0] * 10 < peaks["model_dump"][0]
+
+
+def test_projection_reads_the_rule_field_and_selected_heavy_fields(monkeypatch):
+    monkeypatch.setattr(crawl4ai_service.config, "CRAWL_BLOB_STORE_ENABLED", False)
+    page = _large_page(0)
+    processed = asyncio.run(Crawl4AIService.create_processed_result(CrawlRule(name="a", url="a.com"), page))
+    assert processed["crawl_text"] == page.markdown.fit_markdown
+    assert processed["screenshot"] is page.screenshot  # referenced, not copied
+    assert processed["crawl_media"] is page.media
+
+    html_rule = CrawlRule(name="a", url="a.com", crawl_result_type="html")
+    processed = asyncio.run(Crawl4AIService.create_processed_result(html_rule, page, include_fields=["metadata"]))
+    assert processed["crawl_text"] is page.cleaned_html
+    assert processed["metadata"] == {"title": "page 0"}
+    assert "screenshot" not in processed and "crawl_media" not in processed
@@ -0,0 +1,92 @@
+import random
+import time
+
+from component.crawl4ai.rule_index import RuleIndex
+from configs.crawl4ai.crawl_rule import CrawlRules
+from configs.crawl4ai.types import CrawlRuleGroup
+from utils import get_domain_url
+
+RULE_COUNT = 10_000
+LOOKUPS = 20_000
+
+
+def _linear_get_rule_by_url(groups, url):
+    """The pre-index lookup from crawler_pool, kept as the baseline."""
+    res = None
+    for group in groups:
+        for rule in group.rules:
+            if rule.url == get_domain_url(url):
+                res = rule
+                break
+    return res if res is not None else _linear_get_rule_by_url(groups, "default")
+
+
+def _build_groups() -> list[CrawlRuleGroup]:
+    groups = CrawlRules.get_rules()
+    rules = []
+    for i in range(RULE_COUNT):
+        match i % 3:
+            case 0:
+                url = f"site{i}.example.com"
+            case 1:
+                url = f"*.tenant{i}.example.org"
+            case _:
+                url = f"docs{i}.example.net/guide"
+        rules.append({"name": f"rule{i}", "url": url})
+    groups.append(CrawlRuleGroup.model_validate({"name": "bulk", "rules": rules}))
+    return groups
+
+
+def test_rule_index_matches_linear_scan_for_builtin_rules():
+    groups = CrawlRules.get_rules()
+    index = RuleIndex(groups)
+    urls = [
+        "https://www.cnblogs.com/fengzi7314/p/16992031.html",
+        "https://github.com/chaorenex1/aduib-mcp-server",
+        "https://blog.csdn.net/a/article/details/1",
+        "https://unknown.example.com/page",
+        "https://www.baidu.com/s?wd=python",
+    ]
+    for url in urls:
+        assert index.match(url) is _linear_get_rule_by_url(groups, url)
+    assert index.match_in_group("common_search_engine", "https://www.bing.com/search?q=x").name == "bing"
+    assert index.match_in_group("it_blog", "https://github.com/x") is None
+
+
+def test_rule_index_lookup_10k_rules():
+    """Benchmark: lookup cost stays flat with 10k rules loaded."""
+    groups = _build_groups()
+    started = time.perf_counter()
+    index = RuleIndex(groups)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    assert index.match("https://site0.example.com/a").name == "rule0"
+    assert index.match("https://a.b.tenant1.example.org/x").name == "rule1"
+    assert index.match("https://tenant1.example.org/x").name == "default"
+    assert index.match("https://docs2.example.net/guide/intro").name == "rule2"
+    assert index.match("https://docs2.example.net/blog").name == "default"
+
+    rng = random.Random(7)
+    urls = []
+    for _ in range(LOOKUPS):
+        i = rng.randrange(RULE_COUNT)
+        urls.append(rng.choice([
+            f"https://site{i}.example.com/page",
+            f"https://www.tenant{i}.example.org/page",
+            f"https://docs{i}.example.net/guide/page",
+            f"https://miss{i}.example.io/page",
+        ]))
+
+    started = time.perf_counter()
+    for url in urls:
+        index.match(url)
+    per_lookup_us = (time.perf_counter() - started) * 1_000_000 / LOOKUPS
+
+    started = time.perf_counter()
+    for url in urls[:200]:
+        _linear_get_rule_by_url(groups, url)
+    linear_us = (time.perf_counter() - started) * 1_000_000 / 200
+
+    print(f"\nrule index: build {build_ms:.1f} ms for {RULE_COUNT} rules, "
+          f"{per_lookup_us:.2f} us/lookup (linear scan {linear_us:.0f} us/lookup)")
+    assert per_lookup_us * 20 < linear_us
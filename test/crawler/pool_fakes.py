@@ -0,0 +1,49 @@
+"""A crawler pool without browsers behind it, for the pool tests and benchmarks."""
+import asyncio
+
+from component.crawl4ai import crawler_pool
+from component.crawl4ai.browser_memory import FootprintHistory
+
+
+class FakeCrawler:
+
+    def __init__(self):
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+def isolate_pool(monkeypatch, cold_start_sec: float = 0.0) -> list[FakeCrawler]:
+    """Give ``crawler_pool`` empty state and fake browsers taking ``cold_start_sec`` to start.
+
+    Memory admission always succeeds and the page pool is off. Returns the
+    browsers started, in the order they finished starting.
+    """
+    started = []
+
+    async def fake_start_crawler(cfg):
+        await asyncio.sleep(cold_start_sec)
+        crawler = FakeCrawler()
+        started.append(crawler)
+        return crawler
+
+    async def allow_browser(sig=None):
+        return True
+
+    async def no_sampling():
+        pass
+
+    monkeypatch.setattr(crawler_pool, "_start_crawler", fake_start_crawler)
+    monkeypatch.setattr(crawler_pool, "check_memory_and_cleanup", allow_browser)
+    monkeypatch.setattr(crawler_pool, "_admission_shortfall", lambda sig, memory: 0)
+    monkeypatch.setattr(crawler_pool, "sample_browser_memory", no_sampling)
+    monkeypatch.setattr(crawler_pool.config, "CRAWLER_PAGE_POOL_SIZE", 0)
+    for name in ("POOL", "LAST_USED", "STARTING", "CONFIGS", "WARM_SPECS", "STANDBY", "REFILLING", "PAGE_POOLS",
+                 "BROWSER_RSS", "PROBE_LATENCY_MS", "RESTARTS", "EXPIRY_DEADLINES"):
+        monkeypatch.setattr(crawler_pool, name, {})
+    monkeypatch.setattr(crawler_pool, "FOOTPRINTS", FootprintHistory())
+    monkeypatch.setattr(crawler_pool, "EXPIRY_HEAP", [])
+    monkeypatch.setattr(crawler_pool, "BACKGROUND", set())
+    monkeypatch.setattr(crawler_pool, "LOCK", asyncio.Lock())
+    return started
@@ -0,0 +1,66 @@
+"""Pipelines and an asyncio face for the recording Redis fakes of the tests."""
+
+
+class Pipeline:
+    """Queues the commands of ``redis`` until ``execute`` runs them in order."""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.commands.clear()
+
+    def __getattr__(self, name):
+        command = getattr(self.redis, name)
+
+        def _queue(*args, **kwargs):
+            self.commands.append((command, args, kwargs))
+            return self
+
+        return _queue
+
+    def execute(self):
+        results = [command(*args, **kwargs) for command, args, kwargs in self.commands]
+        self.commands.clear()
+        return results
+
+
+class PipelinedRedis:
+    """Base of the recording fakes, whose commands can be pipelined."""
+
+    def pipeline(self, transaction=True):
+        return Pipeline(self)
+
+
+class _AsyncPipeline(Pipeline):
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.commands.clear()
+
+    async def execute(self):
+        return Pipeline.execute(self)
+
+
+class AsyncRedis:
+    """The commands of the fake ``redis`` as coroutines, like ``redis.asyncio`` has them."""
+
+    def __init__(self, redis):
+        self.redis = redis
+
+    def __getattr__(self, name):
+        command = getattr(self.redis, name)
+
+        async def _call(*args, **kwargs):
+            return command(*args, **kwargs)
+
+        return _call
+
+    def pipeline(self, transaction=True):
+        return _AsyncPipeline(self.redis)
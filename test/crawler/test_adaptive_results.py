@@ -0,0 +1,50 @@
+import asyncio
+
+from crawl4ai import CrawlerRunConfig, DefaultMarkdownGenerator
+from crawl4ai.models import CrawlResult
+
+from configs.crawl4ai.types import CrawlRule, CrawlMode, CrawlResultType, FilterType
+from service.crawl4ai_service import Crawl4AIService
+
+
+class _RecordingCrawler:
+    """Crawls nothing, records what it was asked to crawl again."""
+
+    def __init__(self):
+        self.calls: list[list[str]] = []
+
+    async def arun_many(self, urls, config=None, dispatcher=None):
+        assert config.stream is False
+        self.calls.append(list(urls))
+        return [CrawlResult(url=url, html="", success=True, extracted_content=f"crawled {url}") for url in urls]
+
+
+def _page(url: str, cleaned_html: str | None) -> CrawlResult:
+    return CrawlResult(url=url, html=cleaned_html or "", success=True, cleaned_html=cleaned_html)
+
+
+def _results(crawl_result_type=CrawlResultType.MARKDOWN, **kwargs):
+    rule = CrawlRule(name="docs", url="a.com", crawl_mode=CrawlMode.ADAPTIVE, filter_type=FilterType.RAW,
+                     crawl_result_type=crawl_result_type, **kwargs)
+    crawler = _RecordingCrawler()
+    pages = [_page("https://a.com/1", "<h1>Routing</h1><p>Requests are routed by path.</p>"),
+             _page("https://a.com/2", None),  # the knowledge base holds no html of this one
+             _page("https://a.com/3", "<p>Middleware runs for every request.</p>")]
+    results = asyncio.run(Crawl4AIService.adaptive_results(
+        rule, pages, crawler, CrawlerRunConfig(markdown_generator=DefaultMarkdownGenerator(), stream=True)))
+    return results, crawler
+
+
+def test_pages_are_taken_from_the_knowledge_base():
+    results, crawler = _results()
+    assert crawler.calls == [["https://a.com/2"]]  # only the page without content is crawled again
+    assert [r["url"] for r in results] == ["https://a.com/1", "https://a.com/2", "https://a.com/3"]
+    assert results[0]["crawl_text"].startswith("# Routing") and "routed by path" in results[0]["crawl_text"]
+    assert results[1]["crawl_text"] == "crawled https://a.com/2"
+    assert all(r["hit_rule"] == "docs" for r in results)
+
+
+def test_content_the_knowledge_base_lacks_is_crawled_again_at_once():
+    results, crawler = _results(CrawlResultType.PDF)
+    assert crawler.calls == [["https://a.com/1", "https://a.com/2", "https://a.com/3"]]
+    assert len(results) == 3
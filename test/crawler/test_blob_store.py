@@ -0,0 +1,57 @@
+import asyncio
+import base64
+import hashlib
+
+from crawl4ai import CrawlResult
+
+from component.storage import blob_store
+from component.storage.blob_store import FileBlobStore
+from configs.crawl4ai.types import CrawlRule
+from service import crawl4ai_service
+from service.crawl4ai_service import Crawl4AIService
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\0" * 1000
+PDF = b"%PDF-1.7\n" + b"\0" * 1000
+
+
+def test_blobs_are_stored_once_by_content(tmp_path, monkeypatch):
+    monkeypatch.setattr(blob_store, "BLOB_STATS", dict.fromkeys(blob_store.BLOB_STATS, 0))
+    store = FileBlobStore(str(tmp_path))
+
+    async def _run():
+        first = await store.put(PNG, "screenshot")
+        again = await store.put(PNG, "screenshot")
+        return first, again, await store.get(first["sha256"]), await store.get("../../etc/passwd")
+
+    ref, again, data, escaped = asyncio.run(_run())
+    digest = hashlib.sha256(PNG).hexdigest()
+    assert ref == again == {
+        "sha256": digest,
+        "size": len(PNG),
+        "content_type": "image/png",
+        "url": f"/v1/crawl/blobs/{digest}",
+        "uri": f"blob://screenshot/{digest}",
+    }
+    assert data == PNG
+    assert escaped is None  # only digests are looked up
+    assert [p.name for p in tmp_path.rglob("*") if p.is_file()] == [digest]
+    assert blob_store.BLOB_STATS["writes"] == 1 and blob_store.BLOB_STATS["dedup_hits"] == 1
+
+
+def test_results_reference_their_screenshot_and_pdf(tmp_path, monkeypatch):
+    store = FileBlobStore(str(tmp_path))
+    monkeypatch.setattr(crawl4ai_service, "BLOB_STORE", store)
+    result = CrawlResult(url="https://a.com/doc", html="", success=True,
+                         screenshot=base64.b64encode(PNG).decode(), pdf=PDF)
+    rule = CrawlRule(name="a", url="a.com", crawl_result_type="pdf")
+
+    processed = asyncio.run(Crawl4AIService.create_processed_result(rule, result))
+    assert processed["screenshot"]["content_type"] == "image/png"
+    assert processed["pdf"]["size"] == len(PDF)
+    assert processed["crawl_text"] == processed["pdf"]["uri"]
+    assert asyncio.run(store.get(processed["pdf"]["sha256"])) == PDF
+
+    # a screenshot the caller did not ask for is not stored either
+    processed = asyncio.run(Crawl4AIService.create_processed_result(rule, result, include_fields=[]))
+    assert "screenshot" not in processed
+    assert len([p for p in tmp_path.rglob("*") if p.is_file()]) == 2
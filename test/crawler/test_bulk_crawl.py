@@ -0,0 +1,118 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from component.crawl4ai import bulk_crawl, job_events
+from component.crawl4ai.bulk_crawl import plan_bulk_crawl
+from component.storage import job_results
+from configs.crawl4ai.types import TaskStatus
+from service import crawl4ai_service
+from service.crawl4ai_service import Crawl4AIService
+from test.crawler.redis_fakes import AsyncRedis, PipelinedRedis
+
+
+def _rules(monkeypatch):
+    # pages under /news of any host are crawled under their own rule
+    monkeypatch.setattr(bulk_crawl, "get_rule_by_url",
+                        lambda url: SimpleNamespace(name="news" if "/news" in url else "default"))
+
+
+class _RecordingRedis(PipelinedRedis):
+    """Task hashes, result lists and event streams kept in dicts."""
+
+    def __init__(self):
+        self.hashes: dict[str, dict] = {}
+        self.lists: dict[str, list[bytes]] = {}
+        self.events: list[dict] = []
+
+    def hset(self, key, mapping):
+        self.hashes.setdefault(key, {}).update({k: str(getattr(v, "value", v)) for k, v in mapping.items()})
+
+    def hincrby(self, key, field, amount):
+        values = self.hashes.setdefault(key, {})
+        values[field] = str(int(values.get(field, 0)) + amount)
+
+    def hget(self, key, field):
+        value = self.hashes.get(key, {}).get(field)
+        return value.encode() if value is not None else None
+
+    def delete(self, key):
+        self.lists.pop(key, None)
+
+    def rpush(self, key, *values):
+        self.lists.setdefault(key, []).extend(values)
+
+    def lrange(self, key, start, end):
+        values = self.lists.get(key, [])
+        return values[start:] if end == -1 else values[start:end + 1]
+
+    def expire(self, key, ttl):
+        pass
+
+    def xadd(self, key, fields, maxlen=None, approximate=True):
+        self.events.append(json.loads(fields["event"]))
+
+
+def test_urls_are_deduplicated_and_grouped_by_host_and_rule(monkeypatch):
+    _rules(monkeypatch)
+    plan = plan_bulk_crawl([
+        "https://a.com/1", "a.com/1", "https://A.com:443/1#top",  # the same page three times
+        "https://a.com/news/1", "https://b.com/1?y=2&x=1", "https://b.com/1?x=1&y=2",
+        "https://a.com/2", "https://a.com:99999/", "http://",
+    ])
+    assert plan.groups == {
+        ("a.com", "default"): ["https://a.com/1", "https://a.com/2"],
+        ("a.com", "news"): ["https://a.com/news/1"],
+        ("b.com", "default"): ["https://b.com/1?y=2&x=1"],
+    }
+    assert plan.summary() == {"urls": 4, "groups": 3, "duplicates": 3, "invalid": 2}
+
+
+def test_batches_take_turns_between_groups(monkeypatch):
+    _rules(monkeypatch)
+    plan = plan_bulk_crawl([f"https://a.com/{i}" for i in range(5)] + ["https://b.com/1", "https://c.com/1"])
+    assert plan.batches(2) == [["https://a.com/0", "https://a.com/1"], ["https://b.com/1"], ["https://c.com/1"],
+                               ["https://a.com/2", "https://a.com/3"], ["https://a.com/4"]]
+
+
+def test_pages_are_readable_while_the_bulk_job_runs(monkeypatch):
+    _rules(monkeypatch)
+    redis = _RecordingRedis()
+    monkeypatch.setattr(crawl4ai_service, "redis", AsyncRedis(redis))
+    monkeypatch.setattr(job_results, "async_redis_client", AsyncRedis(redis))
+    monkeypatch.setattr(job_events, "async_redis_client", AsyncRedis(redis))
+    monkeypatch.setattr(crawl4ai_service.config, "CRAWL_BULK_BATCH_SIZE", 2)
+    monkeypatch.setattr(crawl4ai_service.config, "CRAWL_BULK_CONCURRENT_BATCHES", 1)
+    task = {"status": TaskStatus.PROCESSING, "created_at": "2026-01-01T00:00:00", "url": "[]", "result": ""}
+    batches, polls = [], []
+
+    async def _crawl(urls, **kwargs):
+        batches.append(urls)
+        polls.append(await Crawl4AIService.create_task_response({**task, **redis.hashes["aduib_task:t1"]}, "t1",
+                                                                "http://api/"))
+        if "https://b.com/1" in urls:
+            raise RuntimeError("browser crashed")
+        return {"success": True, "results": [{"url": url, "crawl_text": url} for url in urls]}
+
+    monkeypatch.setattr(Crawl4AIService, "handle_crawl_request", _crawl)
+    urls = ["https://a.com/1", "https://a.com/2", "https://a.com/3", "https://b.com/1", "https://a.com/1"]
+    result = asyncio.run(Crawl4AIService.run_crawl_job("t1", urls, {}, {}, bulk=True))
+
+    # one host and rule per batch, the hosts taking turns
+    assert batches == [["https://a.com/1", "https://a.com/2"], ["https://b.com/1"], ["https://a.com/3"]]
+    assert polls[0]["result"] == {"partial": True, "results": []}
+    assert polls[1]["result"]["partial"] is True
+    assert [p["url"] for p in polls[1]["result"]["results"]] == ["https://a.com/1", "https://a.com/2"]
+    assert result["duplicates"] == 1 and result["failed"] == 1
+
+    done = asyncio.run(Crawl4AIService.create_task_response({**task, **redis.hashes["aduib_task:t1"]}, "t1",
+                                                            "http://api/"))
+    assert done["status"] == TaskStatus.COMPLETED and "partial" not in done["result"]
+    assert [p["url"] for p in done["result"]["results"]] == ["https://a.com/1", "https://a.com/2", "https://b.com/1",
+                                                              "https://a.com/3"]
+    assert done["result"]["results"][2]["error"] == "browser crashed"
+    assert done["pagination"]["total"] == 4
+    pages = [e for e in redis.events if e["type"] == "page"]  # the fake crawl reports none of its own
+    assert pages == [{"type": "page", "url": "https://b.com/1", "success": False, "source": "crawl",
+                      "error": "browser crashed", "at": pages[0]["at"]}]
+    assert job_events.is_final(redis.events[-1]) and redis.events[-1]["pages"] == 4
@@ -0,0 +1,156 @@
+import asyncio
+
+from component.cache import crawl_coalescer
+from component.cache.crawl_coalescer import CrawlCoalescer
+from component.cache.crawl_result_cache import CrawlResultCache
+from test.crawler.redis_fakes import AsyncRedis
+
+URL = "https://docs.example.com/guide"
+
+
+def _result(text: str) -> dict:
+    return {"url": URL, "crawl_text": text, "metadata": {}}
+
+
+async def _lease_taken(key):
+    return False
+
+
+def test_concurrent_requests_share_one_crawl():
+    coalescer = CrawlCoalescer()
+    crawls = []
+
+    async def request():
+        flight = await coalescer.join({URL: "k"}, cache_ttl=0)
+        try:
+            for url in flight.crawl_urls:
+                crawls.append(url)
+                await asyncio.sleep(0.05)  # the navigation
+                flight.publish(url, _result("page"))
+            return await flight.wait()
+        finally:
+            await flight.close()
+
+    async def _run():
+        return await asyncio.gather(*(request() for _ in range(5)))
+
+    shared = asyncio.run(_run())
+    assert crawls == [URL]
+    followers = [s[URL] for s in shared if s]
+    assert len(followers) == 4
+    assert all(f["crawl_text"] == "page" for f in followers)
+    assert followers[0]["metadata"]["crawl_report"]["coalesced"] == {"leader": "local"}
+    assert not coalescer.inflight
+
+
+def test_followers_crawl_themselves_when_the_leader_fails():
+    coalescer = CrawlCoalescer()
+
+    async def _run():
+        leader = await coalescer.join({URL: "k"}, cache_ttl=0)
+        follower = await coalescer.join({URL: "k"}, cache_ttl=0)
+        assert leader.crawl_urls == [URL] and not follower.crawl_urls
+        await leader.close()  # failed before publishing
+        shared = await follower.wait()
+        await follower.close()
+        # a newer leader of the key is not unblocked by the old one's close
+        newer = await coalescer.join({URL: "k"}, cache_ttl=0)
+        await leader.close()
+        assert newer.crawl_urls == [URL] and coalescer.inflight
+        await newer.close()
+        return shared
+
+    assert asyncio.run(_run()) == {URL: None}
+
+
+def test_remote_leader_result_is_read_from_the_shared_cache(monkeypatch):
+    cache = CrawlResultCache(max_bytes=10_000)
+    monkeypatch.setattr(crawl_coalescer, "RESULT_CACHE", cache)
+    monkeypatch.setattr(crawl_coalescer.config, "REDIS_ENABLED", False)
+    monkeypatch.setattr(crawl_coalescer, "_acquire_lease", _lease_taken)  # another node holds it
+
+    async def _lease_held(key):
+        return True
+
+    monkeypatch.setattr(crawl_coalescer, "_lease_held", _lease_held)
+
+    async def other_node():
+        await asyncio.sleep(0.3)
+        await cache.put("k", _result("from the other node"), ttl=60)
+
+    async def _run():
+        flight = await CrawlCoalescer().join({URL: "k"}, cache_ttl=60)
+        assert not flight.crawl_urls
+        writer = asyncio.create_task(other_node())
+        try:
+            return await flight.wait()
+        finally:
+            await flight.close()
+            await writer
+
+    shared = asyncio.run(_run())
+    assert shared[URL]["crawl_text"] == "from the other node"
+    assert shared[URL]["metadata"]["crawl_report"]["coalesced"] == {"leader": "remote"}
+
+
+def test_remote_wait_ends_when_the_lease_is_released(monkeypatch):
+    monkeypatch.setattr(crawl_coalescer, "RESULT_CACHE", CrawlResultCache(max_bytes=10_000))
+    monkeypatch.setattr(crawl_coalescer.config, "REDIS_ENABLED", False)
+    monkeypatch.setattr(crawl_coalescer, "_acquire_lease", _lease_taken)
+
+    async def _lease_held(key):
+        return False  # the leader gave up
+
+    monkeypatch.setattr(crawl_coalescer, "_lease_held", _lease_held)
+
+    async def _run():
+        flight = await CrawlCoalescer().join({URL: "k"}, cache_ttl=60)
+        try:
+            return await asyncio.wait_for(flight.wait(), timeout=2)
+        finally:
+            await flight.close()
+
+    assert asyncio.run(_run()) == {URL: None}
+
+
+class _LeaseRedis:
+    """SET NX and the release script of the coalescer on a dict."""
+
+    def __init__(self):
+        self.values: dict[str, str] = {}
+
+    def set(self, key, value, nx=False, px=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+    def exists(self, key):
+        return int(key in self.values)
+
+    def eval(self, script, numkeys, key, owner):
+        if self.values.get(key) == owner:
+            del self.values[key]
+            return 1
+        return 0
+
+
+def test_leases_are_taken_and_released_without_blocking(monkeypatch):
+    redis = _LeaseRedis()
+    monkeypatch.setattr(crawl_coalescer, "async_redis_client", AsyncRedis(redis))
+    monkeypatch.setattr(crawl_coalescer.config, "REDIS_ENABLED", True)
+    redis.values[crawl_coalescer.LEASE_PREFIX + "b"] = "another-node"
+
+    async def _run():
+        flight = await CrawlCoalescer().join({URL: "a", URL + "/b": "b"}, cache_ttl=60)
+        held = dict(redis.values)
+        flight.publish(URL, _result("page"))
+        flight.remote.clear()  # not waited for here
+        await flight.close()
+        return flight, held
+
+    flight, held = asyncio.run(_run())
+    assert flight.crawl_urls == [URL]
+    assert held[crawl_coalescer.LEASE_PREFIX + "a"] == crawl_coalescer.NODE_ID
+    # only the lease of this node is released
+    assert redis.values == {crawl_coalescer.LEASE_PREFIX + "b": "another-node"}
@@ -0,0 +1,216 @@
+import asyncio
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from crawl4ai import BrowserConfig, CrawlerRunConfig, CacheMode, DefaultMarkdownGenerator
+from crawl4ai.content_filter_strategy import PruningContentFilter
+
+from component.cache import crawl_result_cache
+from component.cache.crawl_result_cache import (
+    CrawlResultCache, normalize_url, result_cache_key, result_cache_ttl, MAX_ITEM_SHARE
+)
+from configs.crawl4ai.types import CrawlRule
+from test.crawler.redis_fakes import AsyncRedis, PipelinedRedis
+
+
+def _result(url: str, size: int = 100) -> dict:
+    return {"url": url, "crawl_text": "x" * size, "metadata": {}}
+
+
+def test_equivalent_urls_share_a_key():
+    rule = CrawlRule(name="docs", url="docs.example.com")
+    config = CrawlerRunConfig()
+    browser = BrowserConfig()
+    key = result_cache_key("https://Docs.Example.com:443/guide?b=2&a=1#intro", rule, browser, config)
+    assert key == result_cache_key("https://docs.example.com/guide?a=1&b=2", rule, browser, config)
+    assert normalize_url("http://example.com") == "http://example.com/"
+    # another rule or another selection is another result
+    assert key != result_cache_key("https://docs.example.com/guide?a=1&b=2",
+                                   CrawlRule(name="docs", url="docs.example.com", css_selector="main"), browser,
+                                   config)
+    assert key != result_cache_key("https://docs.example.com/guide?a=1&b=2", rule, browser,
+                                   CrawlerRunConfig(css_selector="main"))
+
+
+def test_every_option_changing_the_output_is_part_of_the_key():
+    rule = CrawlRule(name="docs", url="docs.example.com")
+    url = "https://docs.example.com/guide"
+    browser = BrowserConfig()
+    key = result_cache_key(url, rule, browser, CrawlerRunConfig(js_code="document.querySelector('#more').click()"))
+    assert key != result_cache_key(url, rule, browser, CrawlerRunConfig(js_code="window.scrollTo(0, 0)"))
+    assert key != result_cache_key(url, rule, browser, CrawlerRunConfig())
+    assert result_cache_key(url, rule, browser, CrawlerRunConfig()) != result_cache_key(
+        url, rule, browser, CrawlerRunConfig(markdown_generator=DefaultMarkdownGenerator(
+            content_filter=PruningContentFilter(threshold=0.6))))
+    # how the page is scheduled and cached is not
+    assert key == result_cache_key(url, rule, browser, CrawlerRunConfig(
+        js_code="document.querySelector('#more').click()", cache_mode=CacheMode.BYPASS, stream=True,
+        semaphore_count=2, shared_data={"crawl_rule": rule}))
+
+
+def test_browser_options_changing_the_pages_are_part_of_the_key():
+    rule = CrawlRule(name="docs", url="docs.example.com")
+    url, config = "https://docs.example.com/guide", CrawlerRunConfig()
+    key = result_cache_key(url, rule, BrowserConfig(), config)
+    for browser in (BrowserConfig(user_agent="bot/1.0"), BrowserConfig(text_mode=True),
+                    BrowserConfig(proxy_config={"server": "http://proxy:8080"}),
+                    BrowserConfig(headers={"Accept-Language": "de"}), BrowserConfig(use_persistent_context=True)):
+        assert result_cache_key(url, rule, browser, config) != key
+    # a random user agent is drawn for every request, and where the browser runs changes nothing
+    random_agent = result_cache_key(url, rule, BrowserConfig(user_agent_mode="random"), config)
+    assert all(result_cache_key(url, rule, BrowserConfig(user_agent_mode="random"), config)
+               == random_agent for _ in range(5))
+    assert result_cache_key(url, rule, BrowserConfig(verbose=False, debugging_port=9333), config) == key
+
+
+def test_rule_ttl_overrides_the_default():
+    config = CrawlerRunConfig()
+    assert result_cache_ttl(CrawlRule(name="a", url="a.com"), config) == crawl_result_cache.config.CRAWL_RESULT_CACHE_TTL_SEC
+    assert result_cache_ttl(CrawlRule(name="a", url="a.com", cache_ttl_sec=60), config) == 60
+    assert result_cache_ttl(CrawlRule(name="a", url="a.com", cache_ttl_sec=0), config) == 0
+    assert result_cache_ttl(CrawlRule(name="a", url="a.com", deep_crawl=True), config) == 0
+
+
+def test_local_tier_is_bounded_in_bytes(monkeypatch):
+    monkeypatch.setattr(crawl_result_cache.config, "REDIS_ENABLED", False)
+    cache = CrawlResultCache(max_bytes=1000)
+    for i in range(10):
+        asyncio.run(cache.put(f"k{i}", _result(f"https://a.com/{i}"), ttl=60))
+    assert cache.size <= 1000
+    assert cache.counters["evictions"] > 0
+    found = asyncio.run(cache.get_many(["k0", "k9"]))
+    assert list(found) == ["k9"]  # least recently used went first
+    assert found["k9"].fresh and found["k9"].tier == "local"
+    # too large for the local tier
+    asyncio.run(cache.put("big", _result("https://a.com/big", size=1000 // MAX_ITEM_SHARE), ttl=60))
+    assert "big" not in cache.entries
+
+
+def test_expired_results_are_misses(monkeypatch):
+    monkeypatch.setattr(crawl_result_cache.config, "REDIS_ENABLED", False)
+    cache = CrawlResultCache(max_bytes=10_000)
+    asyncio.run(cache.put("fresh", _result("https://a.com/1"), ttl=60))
+    asyncio.run(cache.put("expired", _result("https://a.com/2"), ttl=0))  # and nothing to revalidate it with
+    served, changed = asyncio.run(cache.lookup({"https://a.com/1": "fresh", "https://a.com/2": "expired"}, ttl=60))
+    assert list(served) == ["fresh"] and not changed
+    assert served["fresh"]["metadata"]["crawl_report"]["cache"] == {"hit": "local"}
+    stats = cache.stats()
+    assert stats["local_hits"] == 1 and stats["misses"] == 1
+    assert stats["hit_ratio"] == 0.5
+    assert stats["bytes_served"] > 0
+    assert stats["local_entries"] == 1
+
+
+class _RecordingRedis(PipelinedRedis):
+    """String keys kept in a dict."""
+
+    def __init__(self):
+        self.values: dict[str, bytes] = {}
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+
+
+class _CountingRedis(AsyncRedis):
+    """Records the commands sent per round trip."""
+
+    def __init__(self, redis):
+        super().__init__(redis)
+        self.executed: list[int] = []
+
+    def pipeline(self, transaction=True):
+        pipe = super().pipeline(transaction)
+        execute = pipe.execute
+
+        async def _execute():
+            self.executed.append(len(pipe.commands))
+            return await execute()
+
+        pipe.execute = _execute
+        return pipe
+
+
+def test_shared_tier_writes_of_a_request_take_one_round_trip(monkeypatch):
+    redis = _RecordingRedis()
+    monkeypatch.setattr(crawl_result_cache.config, "REDIS_ENABLED", True)
+    client = _CountingRedis(redis)
+    monkeypatch.setattr(crawl_result_cache, "async_redis_client", client)
+    cache = CrawlResultCache(max_bytes=10_000)
+    writes = [cache.store(f"k{i}", _result(f"https://a.com/{i}"), ttl=60) for i in range(3)]
+    assert len(cache.entries) == 3 and not redis.values  # served locally before the shared tier has them
+    asyncio.run(cache.write(writes))
+    assert client.executed == [3]
+    assert sorted(redis.values) == ["crawl_result:k0", "crawl_result:k1", "crawl_result:k2"]
+
+
+class _ConditionalHandler(BaseHTTPRequestHandler):
+    etag = '"v1"'
+    honours_conditionals = True
+    requests = []
+
+    def do_GET(self):
+        type(self).requests.append(dict(self.headers))
+        if self.honours_conditionals and self.headers.get("If-None-Match") == self.etag:
+            self.send_response(304)
+            self.send_header("ETag", self.etag)
+            self.end_headers()
+            return
+        body = f"<html><body>{self.etag}</body></html>".encode("utf-8")
+        self.send_response(200)
+        self.send_header("ETag", self.etag)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _lookup_after_expiry(monkeypatch, validators: dict):
+    """Cache a result with ``validators``, let it expire and look it up again."""
+    monkeypatch.setattr(crawl_result_cache.config, "REDIS_ENABLED", False)
+    _ConditionalHandler.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ConditionalHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/doc"
+    cache = CrawlResultCache(max_bytes=10_000)
+    asyncio.run(cache.put("k", _result(url), ttl=0, validators=validators))
+
+    async def _run():
+        try:
+            return await cache.lookup({url: "k"}, ttl=60)
+        finally:
+            await crawl_result_cache.close_revalidation_session()
+
+    try:
+        return cache, asyncio.run(_run())
+    finally:
+        server.shutdown()
+
+
+def test_not_modified_result_is_served_again(monkeypatch):
+    monkeypatch.setattr(_ConditionalHandler, "honours_conditionals", True)
+    cache, (served, changed) = _lookup_after_expiry(monkeypatch, {"etag": '"v1"'})
+    assert _ConditionalHandler.requests[0]["If-None-Match"] == '"v1"'
+    assert served["k"]["metadata"]["crawl_report"]["cache"] == {"hit": "local", "revalidated": "not_modified"}
+    assert not changed
+    assert asyncio.run(cache.get_many(["k"]))["k"].fresh  # refreshed for another TTL
+
+
+def test_unchanged_body_is_served_again(monkeypatch):
+    monkeypatch.setattr(_ConditionalHandler, "honours_conditionals", False)
+    body_sha256 = hashlib.sha256(b'<html><body>"v1"</body></html>').hexdigest()
+    cache, (served, changed) = _lookup_after_expiry(monkeypatch, {"body_sha256": body_sha256})
+    assert served["k"]["metadata"]["crawl_report"]["cache"]["revalidated"] == "unchanged"
+    assert cache.stats()["revalidations"]["unchanged"] == 1
+
+
+def test_changed_page_is_crawled_again(monkeypatch):
+    monkeypatch.setattr(_ConditionalHandler, "etag", '"v2"')
+    cache, (served, changed) = _lookup_after_expiry(monkeypatch, {"etag": '"v1"'})
+    assert not served
+    # the new validators are kept for the result of the new crawl
+    assert changed["k"]["etag"] == '"v2"' and changed["k"]["body_sha256"]
+    assert cache.stats()["revalidations"]["changed"] == 1
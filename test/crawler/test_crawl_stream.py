@@ -0,0 +1,101 @@
+import asyncio
+import json
+
+from crawl4ai import CrawlerRunConfig, CrawlResult
+
+from component.crawl4ai import crawl_scheduler
+from component.crawl4ai.crawl_scheduler import SharedCrawlDispatcher
+from configs.crawl4ai.types import CrawlRule
+from service.crawl4ai_service import Crawl4AIService
+
+PAGES = 12
+WINDOW = 3
+
+
+class _SlowCrawler:
+    def __init__(self):
+        self.started = []
+        self.running = 0
+        self.peak = 0
+
+    async def arun(self, url, config=None, **kw):
+        self.started.append(url)
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            self.running -= 1
+        return CrawlResult(url=url, html="<p>page</p>", success=True, metadata={})
+
+
+def test_slow_consumer_holds_the_crawl_back(monkeypatch):
+    monkeypatch.setattr(crawl_scheduler.config, "CRAWL_STREAM_WINDOW", WINDOW)
+    crawler = _SlowCrawler()
+    urls = [f"https://a.com/{i}" for i in range(PAGES)]
+
+    async def _run():
+        received = []
+        stream = SharedCrawlDispatcher().run_urls_stream(crawler, urls, CrawlerRunConfig())
+        async for task_result in stream:
+            # the first page arrives while most of the batch is not even started
+            received.append((task_result.url, len(crawler.started)))
+            await asyncio.sleep(0.03)  # a client slower than the crawl
+        return received
+
+    received = asyncio.run(_run())
+    assert sorted(url for url, _ in received) == sorted(urls)
+    assert received[0][1] == WINDOW
+    # never more than the window crawled ahead of what the client has taken
+    assert all(started <= taken + WINDOW for taken, (_, started) in enumerate(received))
+    assert crawler.peak <= WINDOW
+
+
+def test_abandoned_stream_stops_crawling(monkeypatch):
+    monkeypatch.setattr(crawl_scheduler.config, "CRAWL_STREAM_WINDOW", WINDOW)
+    crawler = _SlowCrawler()
+    urls = [f"https://a.com/{i}" for i in range(PAGES)]
+
+    async def _run():
+        stream = SharedCrawlDispatcher().run_urls_stream(crawler, urls, CrawlerRunConfig())
+        await stream.__anext__()
+        await stream.aclose()
+        await asyncio.sleep(0.05)
+
+    asyncio.run(_run())
+    assert len(crawler.started) <= WINDOW + 1
+    assert crawler.running == 0
+
+
+async def _pages(urls, delay=0.0):
+    for url in urls:
+        await asyncio.sleep(delay)
+        yield CrawlResult(url=url, html="<p>page</p>", success=True, metadata={})
+
+
+def test_results_stream_as_ndjson_lines():
+    rule = CrawlRule(name="a", url="a.com")
+
+    async def _run():
+        return [line async for line in Crawl4AIService.stream_results(
+            CrawlerRunConfig(), rule, _pages(["https://a.com/1", "https://a.com/2"]))]
+
+    lines = asyncio.run(_run())
+    assert all(line.endswith("\n") and line.count("\n") == 1 for line in lines)
+    pages, done = [json.loads(line) for line in lines[:-1]], json.loads(lines[-1])
+    assert [p["url"] for p in pages] == ["https://a.com/1", "https://a.com/2"]
+    assert done["status"] == "completed" and done["results"] == 2
+
+
+def test_server_sent_events_keep_the_connection_alive():
+    rule = CrawlRule(name="a", url="a.com")
+
+    async def _run():
+        lines = Crawl4AIService.stream_results(CrawlerRunConfig(), rule, _pages(["https://a.com/1"], delay=0.1))
+        return [event async for event in Crawl4AIService.stream_events(lines, heartbeat_sec=0.02)]
+
+    events = asyncio.run(_run())
+    assert events[0] == ": keep-alive\n\n"  # sent while the page was being crawled
+    data = [json.loads(e[len("data: "):]) for e in events if e.startswith("data: ")]
+    assert all(e.endswith("\n\n") for e in events)
+    assert data[0]["url"] == "https://a.com/1" and data[-1]["status"] == "completed"
@@ -0,0 +1,242 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+from crawl4ai import BrowserConfig
+
+from component.crawl4ai import crawler_pool
+from configs.crawl4ai.types import PrewarmSpec
+from test.crawler.pool_fakes import FakeCrawler, isolate_pool
+
+
+MB = 1024 * 1024
+CHECK_MEMORY_AND_CLEANUP = crawler_pool.check_memory_and_cleanup
+ADMISSION_SHORTFALL = crawler_pool._admission_shortfall
+SAMPLE_BROWSER_MEMORY = crawler_pool.sample_browser_memory
+
+
+def _pooled(*sigs: str, last_used: float = 0.0):
+    """Pool a fake browser for every signature, last used at ``last_used``."""
+    for sig in sigs:
+        crawler_pool.POOL[sig] = FakeCrawler()
+        crawler_pool.LAST_USED[sig] = last_used
+        crawler_pool._schedule_expiry(sig, last_used + crawler_pool.config.IDLE_TTL_SEC)
+
+
+def test_close_all_stops_background_starts_first(monkeypatch):
+    started = isolate_pool(monkeypatch, cold_start_sec=0.2)
+
+    async def _run():
+        await crawler_pool.prewarm_pool([{"count": 1, "min_warm": 1}])
+        (sig,) = crawler_pool.POOL
+        crawler_pool.WARM_SPECS[sig].count = 3
+        crawler_pool._refill_standby(sig)  # two standby starts in flight
+        await asyncio.sleep(0.05)
+        await crawler_pool.close_all()
+        await asyncio.sleep(0.3)  # a standby start that survived would have finished by now
+
+    asyncio.run(_run())
+    assert len(started) == 1 and started[0].closed
+    assert not crawler_pool.BACKGROUND
+    for state in (crawler_pool.POOL, crawler_pool.STANDBY, crawler_pool.STARTING, crawler_pool.CONFIGS,
+                  crawler_pool.REFILLING, crawler_pool.WARM_SPECS, crawler_pool.EXPIRY_HEAP):
+        assert not state
+
+
+def test_close_all_stops_the_starts_of_a_running_prewarm(monkeypatch):
+    started = isolate_pool(monkeypatch, cold_start_sec=0.2)
+
+    async def _run():
+        prewarm = asyncio.create_task(crawler_pool.prewarm_pool([{"count": 3, "min_warm": 1}]))
+        await asyncio.sleep(0.05)  # the pooled browser and two standbys are starting
+        await crawler_pool.close_all()
+        await prewarm
+        await asyncio.sleep(0.3)
+
+    asyncio.run(_run())
+    assert not started and not crawler_pool.BACKGROUND
+    assert not crawler_pool.POOL and not crawler_pool.STANDBY and not crawler_pool.REFILLING
+
+
+def test_prewarm_specs_the_pool_cannot_tell_apart_are_skipped(monkeypatch):
+    isolate_pool(monkeypatch)
+
+    async def _run():
+        await crawler_pool.prewarm_pool([
+            {"count": 1, "min_warm": 1},
+            {"browser_config": {"viewport_width": 800}, "count": 2, "min_warm": 2},  # same signature
+            {"count": 2, "min_warm": 2},  # the first one again
+            {"browser_config": {"use_persistent_context": True}, "count": 1, "min_warm": 1},
+        ])
+        await asyncio.gather(*crawler_pool.BACKGROUND)
+
+    asyncio.run(_run())
+    assert len(crawler_pool.WARM_SPECS) == 2
+    assert sorted(spec.min_warm for spec in crawler_pool.WARM_SPECS.values()) == [1, 1]
+    assert len(crawler_pool.POOL) == 2 and not any(crawler_pool.STANDBY.values())
+
+
+def test_idle_browsers_expire_in_deadline_order(monkeypatch):
+    isolate_pool(monkeypatch)
+    monkeypatch.setattr(crawler_pool.config, "IDLE_TTL_SEC", 100)
+
+    async def _run():
+        _pooled("a", last_used=0)
+        _pooled("b", last_used=50)
+        _pooled("c", last_used=20)
+        crawler_pool.LAST_USED["c"] = 90  # used since, its entry is re-armed when it surfaces
+        idle = crawler_pool.POOL["a"]
+        await crawler_pool._evict_expired(now=110)
+        assert list(crawler_pool.POOL) == ["b", "c"] and idle.closed
+        await crawler_pool._evict_expired(now=160)
+        assert list(crawler_pool.POOL) == ["c"]
+        await crawler_pool._evict_expired(now=190)
+        assert not crawler_pool.POOL
+
+    asyncio.run(_run())
+    assert not crawler_pool.EXPIRY_HEAP and not crawler_pool.EXPIRY_DEADLINES
+
+
+def test_superseded_expiry_entries_are_dropped(monkeypatch):
+    isolate_pool(monkeypatch)
+    monkeypatch.setattr(crawler_pool.config, "IDLE_TTL_SEC", 100)
+
+    async def _run():
+        _pooled("a", last_used=0)
+        crawler_pool._schedule_expiry("a", 300)  # e.g. the browser was replaced and pooled again
+        await crawler_pool._evict_expired(now=200)
+        assert "a" in crawler_pool.POOL and crawler_pool.EXPIRY_HEAP == [(300, "a")]
+        await crawler_pool._evict_expired(now=300)
+        assert not crawler_pool.POOL
+
+    asyncio.run(_run())
+
+
+def test_busy_browsers_and_the_warm_floor_are_not_expired(monkeypatch):
+    isolate_pool(monkeypatch)
+    monkeypatch.setattr(crawler_pool.config, "IDLE_TTL_SEC", 100)
+    monkeypatch.setattr(crawler_pool.config, "CRAWLER_PROBE_INTERVAL_SEC", 10)
+
+    async def _run():
+        _pooled("busy", "warm", "spare")
+        crawler_pool.PAGE_POOLS["busy"] = SimpleNamespace(in_use=1, close=lambda: None)
+        crawler_pool.WARM_SPECS["warm"] = PrewarmSpec(count=1, min_warm=1)
+        crawler_pool.WARM_SPECS["spare"] = PrewarmSpec(count=2, min_warm=1)
+        crawler_pool.STANDBY["spare"] = [FakeCrawler()]  # the standby keeps the floor on its own
+        await crawler_pool._evict_expired(now=100)
+
+    asyncio.run(_run())
+    assert sorted(crawler_pool.POOL) == ["busy", "warm"] and len(crawler_pool.STANDBY["spare"]) == 1
+    assert sorted(crawler_pool.EXPIRY_HEAP) == [(110, "busy"), (200, "warm")]
+
+
+def test_browsers_failing_the_probe_are_replaced(monkeypatch):
+    started = isolate_pool(monkeypatch)
+    probed = []
+
+    async def fake_probe(sig, crawler):
+        probed.append(sig)
+        return crawler is not started[0]
+
+    monkeypatch.setattr(crawler_pool, "_probe", fake_probe)
+
+    async def _run():
+        wedged = await crawler_pool.get_crawler(BrowserConfig())
+        busy = await crawler_pool.get_crawler(BrowserConfig(use_persistent_context=True))
+        busy_sig = crawler_pool._sig(BrowserConfig(use_persistent_context=True))
+        crawler_pool.PAGE_POOLS[busy_sig] = SimpleNamespace(in_use=1, close=lambda: None)
+        await crawler_pool._probe_all()
+        await asyncio.gather(*crawler_pool.BACKGROUND)
+        return wedged, busy, busy_sig
+
+    wedged, busy, busy_sig = asyncio.run(_run())
+    sig = crawler_pool._sig(BrowserConfig())
+    assert probed == [sig]  # the browser with leased pages is left alone
+    assert wedged.closed and crawler_pool.POOL[sig] is started[2] and crawler_pool.RESTARTS == {sig: 1}
+    assert crawler_pool.POOL[busy_sig] is busy and not busy.closed
+
+
+def _memory_pressure(monkeypatch, available_mb: int, footprint_mb: int):
+    """A 1000 MB host with ``available_mb`` free, where a new browser takes ``footprint_mb``.
+
+    Admission keeps 15% of the host (150 MB) in reserve. Pools five browsers
+    with fake RSS values: ``busy`` has leased pages and ``warm`` is at its
+    min-warm floor, the other three are ranked by RSS times idle seconds.
+    """
+    memory = SimpleNamespace(total=1000 * MB, available=available_mb * MB, percent=100 - available_mb / 10)
+    monkeypatch.setattr(crawler_pool.psutil, "virtual_memory", lambda: memory)
+    crawler_pool.FOOTPRINTS.observe("new", footprint_mb * MB)
+    now = time.time()
+    for sig, rss_mb, idle_sec in (("a", 300, 10), ("b", 100, 100), ("c", 50, 20), ("busy", 1000, 500),
+                                  ("warm", 1000, 500)):
+        crawler_pool.POOL[sig] = FakeCrawler()
+        crawler_pool.LAST_USED[sig] = now - idle_sec
+        crawler_pool.BROWSER_RSS[sig] = rss_mb * MB
+    crawler_pool.PAGE_POOLS["busy"] = SimpleNamespace(in_use=1, close=lambda: None)
+    crawler_pool.WARM_SPECS["warm"] = PrewarmSpec(count=1, min_warm=1)
+    return now
+
+
+def test_eviction_ranks_idle_browsers_by_rss_times_idle_seconds(monkeypatch):
+    isolate_pool(monkeypatch)
+    now = _memory_pressure(monkeypatch, available_mb=500, footprint_mb=200)
+    # b: 100 MB x 100 s, a: 300 MB x 10 s, c: 50 MB x 20 s; busy and warm are never candidates
+    assert crawler_pool._eviction_candidates(now) == ["b", "a", "c"]
+
+
+def test_admission_without_pressure_evicts_nothing(monkeypatch):
+    isolate_pool(monkeypatch)
+    monkeypatch.setattr(crawler_pool, "_admission_shortfall", ADMISSION_SHORTFALL)
+    _memory_pressure(monkeypatch, available_mb=500, footprint_mb=200)
+
+    assert asyncio.run(CHECK_MEMORY_AND_CLEANUP("new"))
+    assert len(crawler_pool.POOL) == 5
+
+
+def test_admission_evicts_the_best_ranked_browsers_until_the_new_one_fits(monkeypatch):
+    isolate_pool(monkeypatch)
+    monkeypatch.setattr(crawler_pool, "_admission_shortfall", ADMISSION_SHORTFALL)
+    _memory_pressure(monkeypatch, available_mb=250, footprint_mb=300)  # 200 MB short
+    evicted = [crawler_pool.POOL[sig] for sig in ("b", "a")]
+
+    assert asyncio.run(CHECK_MEMORY_AND_CLEANUP("new"))
+    assert sorted(crawler_pool.POOL) == ["busy", "c", "warm"] and all(crawler.closed for crawler in evicted)
+    assert "a" not in crawler_pool.BROWSER_RSS and "b" not in crawler_pool.LAST_USED
+
+
+def test_admission_is_denied_when_evicting_every_candidate_is_not_enough(monkeypatch):
+    isolate_pool(monkeypatch)
+    monkeypatch.setattr(crawler_pool, "_admission_shortfall", ADMISSION_SHORTFALL)
+    _memory_pressure(monkeypatch, available_mb=250, footprint_mb=600)  # 500 MB short, a, b and c hold 450 MB
+
+    assert not asyncio.run(CHECK_MEMORY_AND_CLEANUP("new"))
+    assert len(crawler_pool.POOL) == 5 and not any(crawler.closed for crawler in crawler_pool.POOL.values())
+
+
+def test_memory_samples_apply_only_to_browsers_still_pooled(monkeypatch):
+    isolate_pool(monkeypatch)
+    measuring, measured = threading.Event(), threading.Event()
+
+    def fake_measure(crawlers):
+        measuring.set()
+        measured.wait(5)
+        return {sig: 100 * MB for sig in crawlers}
+
+    monkeypatch.setattr(crawler_pool, "measure_browsers", fake_measure)
+
+    async def _run():
+        _pooled("a", "b")
+        crawler_pool.BROWSER_RSS["gone"] = 100 * MB
+        sampling = asyncio.create_task(SAMPLE_BROWSER_MEMORY())
+        await asyncio.to_thread(measuring.wait, 5)
+        # the pool keeps changing on the loop while the thread measures
+        crawler_pool._forget("a")
+        crawler_pool.POOL["c"] = FakeCrawler()
+        crawler_pool.BROWSER_RSS["c"] = 50 * MB
+        measured.set()
+        await sampling
+
+    asyncio.run(_run())
+    assert crawler_pool.BROWSER_RSS == {"b": 100 * MB, "c": 50 * MB}
+    assert set(crawler_pool.FOOTPRINTS.footprints) == {"b"}
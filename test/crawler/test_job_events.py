@@ -0,0 +1,101 @@
+import asyncio
+import json
+
+from component.crawl4ai import job_events
+from component.crawl4ai.job_events import publish_status, report_job_pages, areport_page
+from configs.crawl4ai.types import TaskStatus
+from service import crawl4ai_service
+from service.crawl4ai_service import Crawl4AIService
+from test.crawler.redis_fakes import AsyncRedis, PipelinedRedis
+
+
+class _RecordingRedis(PipelinedRedis):
+    """Event streams and task statuses kept in dicts; reads never block."""
+
+    def __init__(self):
+        self.streams: dict[str, list[tuple[str, dict]]] = {}
+        self.statuses: dict[str, bytes] = {}
+
+    def xadd(self, key, fields, maxlen=None, approximate=True):
+        entries = self.streams.setdefault(key, [])
+        entries.append((f"{len(entries) + 1}-0", {k.encode(): v.encode() for k, v in fields.items()}))
+
+    def expire(self, key, ttl):
+        pass
+
+    def xread(self, streams, count=None, block=None):
+        (key, after), = streams.items()
+        newer = [(i, f) for i, f in self.streams.get(key, []) if int(i.split("-")[0]) > int(after.split("-")[0])]
+        return [(key.encode(), newer[:count])] if newer else []
+
+    def hget(self, key, field):
+        return self.statuses.get(key.split(":")[1])
+
+
+def _isolate(monkeypatch) -> _RecordingRedis:
+    redis = _RecordingRedis()
+    monkeypatch.setattr(job_events, "redis_client", redis)
+    monkeypatch.setattr(job_events, "async_redis_client", AsyncRedis(redis))
+    monkeypatch.setattr(crawl4ai_service, "redis", AsyncRedis(redis))
+    monkeypatch.setattr(crawl4ai_service.config, "CRAWL_STREAM_HEARTBEAT_SEC", 0.01)
+    return redis
+
+
+def test_pages_are_reported_from_the_crawls_of_the_job(monkeypatch):
+    redis = _isolate(monkeypatch)
+    monkeypatch.setattr(job_events, "redis_client", None)  # pages are reported without blocking the loop
+
+    async def _crawl(url):
+        await asyncio.sleep(0)
+        await areport_page(url, True)
+
+    async def _run():
+        await areport_page("https://a.com/outside", True)  # not part of a job
+        with report_job_pages("t1"):
+            await asyncio.gather(_crawl("https://a.com/1"), _crawl("https://a.com/2"))
+            await areport_page("https://a.com/3", False, error="timeout")
+
+    asyncio.run(_run())
+    events = [json.loads(f[b"event"]) for _, f in redis.streams[job_events.events_key("t1")]]
+    assert [e["url"] for e in events] == ["https://a.com/1", "https://a.com/2", "https://a.com/3"]
+    assert events[2]["success"] is False and events[2]["error"] == "timeout"
+    assert list(redis.streams) == [job_events.events_key("t1")]
+
+
+def test_event_stream_ends_with_the_final_status(monkeypatch):
+    redis = _isolate(monkeypatch)
+    redis.statuses["t1"] = TaskStatus.PROCESSING.value.encode()
+    publish_status("t1", TaskStatus.PROCESSING, urls=2)
+    with report_job_pages("t1"):
+        asyncio.run(areport_page("https://a.com/1", True, source="cache"))
+
+    async def _follow(last_event_id=None):
+        frames = []
+        async for frame in await Crawl4AIService.task_event_stream("t1", last_event_id):
+            frames.append(frame)
+            if frame.startswith(": keep-alive") and len(frames) == 3:
+                # the job finishes while the client is connected
+                with report_job_pages("t1"):
+                    await areport_page("https://a.com/2", True)
+                publish_status("t1", TaskStatus.COMPLETED, success=True, pages=2)
+        return frames
+
+    frames = asyncio.run(_follow())
+    assert frames[0].startswith("id: 1-0\nevent: status\n")
+    assert frames[2] == ": keep-alive\n\n"
+    assert frames[3].startswith("id: 3-0\nevent: page\n")
+    assert frames[-1].startswith("id: 4-0\nevent: status\n") and '"completed"' in frames[-1]
+    # a reconnecting client resumes after the last event it saw
+    resumed = asyncio.run(_follow(last_event_id="2-0"))
+    assert [f.split("\n")[0] for f in resumed] == ["id: 3-0", "id: 4-0"]
+
+
+def test_long_poll_returns_at_once_for_finished_jobs(monkeypatch):
+    redis = _isolate(monkeypatch)
+    redis.statuses["t1"] = TaskStatus.COMPLETED.value.encode()
+    publish_status("t1", TaskStatus.COMPLETED, success=True)
+
+    first = asyncio.run(Crawl4AIService.wait_task_events("t1", timeout=60))
+    assert [e["status"] for e in first["events"]] == ["completed"] and first["last_event_id"] == "1-0"
+    done = asyncio.run(Crawl4AIService.wait_task_events("t1", after=first["last_event_id"], timeout=60))
+    assert done == {"task_id": "t1", "status": "completed", "events": [], "last_event_id": "1-0"}
@@ -0,0 +1,114 @@
+import asyncio
+import json
+import time
+
+from component.crawl4ai import job_queue, job_events
+from component.crawl4ai.job_queue import CrawlJobWorker, DEAD_LETTER_STREAM, DELAYED_KEY, job_stream
+from configs.crawl4ai.types import CrawlPriority, TaskStatus
+from test.crawler.redis_fakes import PipelinedRedis
+
+
+class _RecordingRedis(PipelinedRedis):
+    """The stream, zset and hash commands of the job queue, kept in dicts."""
+
+    def __init__(self, times_delivered: int = 1):
+        self.times_delivered = times_delivered
+        self.streams: dict[str, list[dict]] = {}
+        self.zsets: dict[str, dict] = {}
+        self.hashes: dict[str, dict] = {}
+        self.acked: list[str] = []
+
+    def xadd(self, stream, fields, maxlen=None, approximate=True):
+        self.streams.setdefault(stream, []).append(fields)
+        return f"{len(self.streams[stream])}-0"
+
+    def expire(self, key, ttl):
+        pass
+
+    def events(self, task_id: str) -> list[dict]:
+        return [json.loads(e["event"]) for e in self.streams.get(job_events.events_key(task_id), [])]
+
+    def xack(self, stream, group, message_id):
+        self.acked.append(message_id)
+
+    def xdel(self, stream, message_id):
+        pass
+
+    def xpending_range(self, stream, group, min, max, count):
+        return [{"message_id": min, "times_delivered": self.times_delivered}]
+
+    def xclaim(self, *args, **kwargs):
+        pass
+
+    def zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update(mapping)
+
+    def zrangebyscore(self, key, low, high, start=0, num=None):
+        return [m for m, score in sorted(self.zsets.get(key, {}).items(), key=lambda i: i[1]) if low <= score <= high]
+
+    def zrem(self, key, member):
+        return 1 if self.zsets.get(key, {}).pop(member, None) is not None else 0
+
+    def hset(self, key, mapping):
+        self.hashes.setdefault(key, {}).update(mapping)
+
+
+class _FailingService:
+    calls = 0
+
+    @classmethod
+    async def run_crawl_job(cls, **job):
+        cls.calls += 1
+        raise RuntimeError("browser crashed")
+
+
+def _run(monkeypatch, job: dict, times_delivered: int = 1) -> _RecordingRedis:
+    redis = _RecordingRedis(times_delivered)
+    monkeypatch.setattr(job_queue, "redis_client", redis)
+    monkeypatch.setattr(job_events, "redis_client", redis)
+    monkeypatch.setattr(job_queue.config, "CRAWL_JOB_MAX_ATTEMPTS", 3)
+    monkeypatch.setattr(job_queue.config, "CRAWL_JOB_RETRY_BACKOFF_SEC", 10.0)
+    _FailingService.calls = 0
+    stream = job_stream(job["priority"])
+    asyncio.run(CrawlJobWorker(consumer="test")._run_job(_FailingService, stream, "1-0", {b"job": json.dumps(job)}))
+    return redis
+
+
+def test_failed_job_is_retried_with_backoff(monkeypatch):
+    redis = _run(monkeypatch, {"task_id": "t1", "priority": "normal", "attempt": 2})
+    assert _FailingService.calls == 1 and redis.acked == ["1-0"]
+    [(retry, due)] = redis.zsets[DELAYED_KEY].items()
+    assert json.loads(retry)["attempt"] == 3
+    assert due - time.time() > 19  # 10s doubled for the second retry
+    assert "retrying in 20s" in redis.hashes["aduib_task:t1"]["error"]
+    assert "status" not in redis.hashes["aduib_task:t1"]  # still processing
+    [event] = redis.events("t1")
+    assert event["status"] == TaskStatus.PROCESSING and event["retry_in_sec"] == 20
+
+
+def test_last_attempt_is_dead_lettered(monkeypatch):
+    redis = _run(monkeypatch, {"task_id": "t1", "priority": "normal", "attempt": 3})
+    assert not redis.zsets.get(DELAYED_KEY)
+    assert json.loads(redis.streams[DEAD_LETTER_STREAM][0]["job"])["task_id"] == "t1"
+    assert redis.hashes["aduib_task:t1"]["status"] == TaskStatus.FAILED
+    assert job_events.is_final(redis.events("t1")[-1])
+
+
+def test_jobs_of_lost_workers_count_their_deliveries(monkeypatch):
+    # delivered to three workers that all died while running it
+    redis = _run(monkeypatch, {"task_id": "t1", "priority": "normal", "attempt": 1}, times_delivered=4)
+    assert _FailingService.calls == 0
+    assert redis.streams[DEAD_LETTER_STREAM][0]["error"] == "worker lost while running the job"
+    assert redis.acked == ["1-0"]
+
+
+def test_due_retries_return_to_their_priority_stream(monkeypatch):
+    redis = _RecordingRedis()
+    monkeypatch.setattr(job_queue, "redis_client", redis)
+    now = time.time()
+    due = json.dumps({"task_id": "t1", "priority": "interactive", "attempt": 2})
+    later = json.dumps({"task_id": "t2", "priority": "background", "attempt": 2})
+    redis.zadd(DELAYED_KEY, {due: now - 1, later: now + 60})
+    assert job_queue.promote_due_retries(now) == 1
+    assert redis.streams == {job_stream(CrawlPriority.INTERACTIVE): [{"job": due}]}
+    assert list(redis.zsets[DELAYED_KEY]) == [later]
@@ -0,0 +1,119 @@
+import asyncio
+import gzip
+import json
+from datetime import datetime
+
+from component.storage import job_results
+from component.storage.job_results import read_results, iter_results, store_results, results_key
+from configs.crawl4ai.types import TaskStatus
+from service import crawl4ai_service
+from service.crawl4ai_service import Crawl4AIService
+from test.crawler.redis_fakes import AsyncRedis, PipelinedRedis
+
+
+class _RecordingRedis(PipelinedRedis):
+    """The list commands of the result store, kept in a dict."""
+
+    def __init__(self):
+        self.lists: dict[str, list[bytes]] = {}
+        self.lranges = 0
+
+    def delete(self, key):
+        self.lists.pop(key, None)
+
+    def rpush(self, key, *values):
+        self.lists.setdefault(key, []).extend(values)
+
+    def expire(self, key, ttl):
+        pass
+
+    def lrange(self, key, start, end):
+        self.lranges += 1
+        values = self.lists.get(key, [])
+        return values[start:] if end == -1 else values[start:end + 1]
+
+
+def _pages(n: int) -> list[dict]:
+    return [{"url": f"https://a.com/{i}", "crawl_text": "text " * 500} for i in range(n)]
+
+
+async def _collect(pages) -> list:
+    return [page async for page in pages]
+
+
+def test_pages_are_compressed_one_by_one(monkeypatch):
+    redis = _RecordingRedis()
+    monkeypatch.setattr(job_results, "async_redis_client", AsyncRedis(redis))
+    assert asyncio.run(store_results("t1", _pages(250), ttl=60)) == 250
+    chunks = redis.lists[results_key("t1")]
+    assert len(chunks) == 250
+    assert json.loads(gzip.decompress(chunks[7]))["url"] == "https://a.com/7"
+    assert len(chunks[7]) < len(json.dumps(_pages(1)[0])) // 10
+
+    pages = asyncio.run(read_results("t1", offset=240, limit=5))
+    assert [p["url"] for p in pages] == [f"https://a.com/{i}" for i in range(240, 245)]
+    assert len(asyncio.run(read_results("t1", offset=200))) == 50
+    assert asyncio.run(read_results("t1", limit=0)) == []
+    redis.lranges = 0
+    assert len(asyncio.run(_collect(iter_results("t1")))) == 250
+    assert redis.lranges == 6  # five batches and the empty read that ends them
+
+    asyncio.run(store_results("t1", _pages(3), ttl=60))  # a retried job replaces its pages
+    assert len(redis.lists[results_key("t1")]) == 3
+
+
+def test_status_poll_reads_only_the_requested_page(monkeypatch):
+    redis = _RecordingRedis()
+    monkeypatch.setattr(job_results, "async_redis_client", AsyncRedis(redis))
+    asyncio.run(store_results("t1", _pages(120), ttl=60))
+    task = {"status": TaskStatus.COMPLETED, "created_at": "2026-01-01T00:00:00", "url": "[]",
+            "result": json.dumps({"success": True}), "result_pages": "120"}
+
+    response = asyncio.run(Crawl4AIService.create_task_response(task, "t1", "http://api/", offset=50, limit=50))
+    assert [p["url"] for p in response["result"]["results"]][0] == "https://a.com/50"
+    assert response["pagination"] == {"offset": 50, "limit": 50, "total": 120}
+    assert response["_links"]["next"]["href"] == "http://api/v1/crawl/job/t1?offset=100&limit=50"
+
+    redis.lranges = 0
+    status_only = asyncio.run(Crawl4AIService.create_task_response(task, "t1", "http://api/", limit=0))
+    assert status_only["result"] == {"success": True, "results": []} and redis.lranges == 0
+
+
+class _TaskRedis(_RecordingRedis):
+    """The result store plus the task hashes."""
+
+    def __init__(self):
+        super().__init__()
+        self.hashes: dict[str, dict] = {}
+
+    def hmget(self, key, fields):
+        task = self.hashes.get(key, {})
+        return [task[field].encode() if field in task else None for field in fields]
+
+    def delete(self, *keys):
+        for key in keys:
+            self.lists.pop(key, None)
+            self.hashes.pop(key, None)
+
+
+def test_finished_tasks_are_deleted_only_after_their_last_page_is_read(monkeypatch):
+    redis = _TaskRedis()
+    monkeypatch.setattr(job_results, "async_redis_client", AsyncRedis(redis))
+    monkeypatch.setattr(crawl4ai_service, "redis", AsyncRedis(redis))
+    asyncio.run(store_results("t1", _pages(120), ttl=60))
+    # created long ago, finished just now: a long bulk job
+    redis.hashes["aduib_task:t1"] = {"status": TaskStatus.COMPLETED, "created_at": "2026-01-01T00:00:00",
+                                     "completed_at": datetime.now().isoformat(), "url": "[]",
+                                     "result": json.dumps({"success": True}), "result_pages": "120"}
+
+    def _poll(**kwargs):
+        return asyncio.run(Crawl4AIService.handle_task_status("t1", "http://api/", **kwargs))
+
+    _poll(offset=100, limit=50)
+    assert "aduib_task:t1" in redis.hashes  # finished less than an hour ago
+    redis.hashes["aduib_task:t1"]["completed_at"] = "2026-01-01T01:00:00"
+    _poll(offset=0, limit=50)
+    _poll(offset=50, limit=50, keep=True)
+    assert len(redis.lists[results_key("t1")]) == 120  # pages are left to read
+    _poll(offset=100, limit=50)
+    assert not redis.hashes and not redis.lists
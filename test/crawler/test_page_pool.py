@@ -0,0 +1,164 @@
+import asyncio
+from types import SimpleNamespace
+
+from crawl4ai import CrawlerRunConfig
+
+from component.crawl4ai.page_pool import PagePool, lease_page, PAGE_RESET_COOKIES
+
+
+class _Page:
+
+    def __init__(self, log: list):
+        self.log = log
+        self.url = "about:blank"
+        self.closed = False
+
+    def is_closed(self):
+        return self.closed
+
+    async def unroute_all(self, behavior=None):
+        self.log.append("routes")
+
+    async def evaluate(self, script):
+        self.log.append("storage")
+
+    async def goto(self, url):
+        self.url = url
+
+
+class _Context:
+
+    def __init__(self, log: list):
+        self.log = log
+
+    async def new_page(self):
+        return _Page(self.log)
+
+    async def clear_cookies(self, domain=None):
+        self.log.append(("cookies", domain))
+
+
+class _BrowserManager:
+    """Creates contexts and pages that record their resets into ``log``."""
+
+    def __init__(self, managed: bool = False):
+        self.config = SimpleNamespace(use_managed_browser=managed)
+        self.log = []
+        self.sessions = {}
+        self.contexts = 0
+        self.default_context = _Context(self.log)
+
+    async def create_browser_context(self):
+        self.contexts += 1
+        return _Context(self.log)
+
+    async def setup_context(self, context):
+        pass
+
+    async def kill_session(self, session_id):
+        self.sessions.pop(session_id, None)
+
+
+def _pool(size: int, managed: bool = False) -> tuple[PagePool, _BrowserManager]:
+    manager = _BrowserManager(managed)
+    crawler = SimpleNamespace(crawler_strategy=SimpleNamespace(browser_manager=manager))
+    return PagePool(crawler, size=size), manager
+
+
+def _visit(pool: PagePool, session_id: str, url: str):
+    pool._browser_manager.sessions[session_id][1].url = url
+
+
+def test_pages_are_reset_between_leases():
+    pool, manager = _pool(size=1)
+
+    async def _run():
+        async with pool.lease() as first:
+            _visit(pool, first, "https://a.com/1")
+        async with pool.lease() as second:
+            _visit(pool, second, "https://a.com/2")
+        async with pool.lease([PAGE_RESET_COOKIES]) as third:
+            pass
+        return first, second, third
+
+    first, second, third = asyncio.run(_run())
+    assert first == second == third and manager.contexts == 1  # one page, leased three times
+    assert manager.log == ["routes", "storage", ("cookies", None)] * 2 + [("cookies", None)]
+    assert manager.sessions[first][1].url == "about:blank"
+
+
+def test_shared_context_only_drops_the_cookies_of_the_visited_site():
+    pool, manager = _pool(size=1, managed=True)
+
+    async def _run():
+        async with pool.lease([PAGE_RESET_COOKIES]) as session_id:
+            _visit(pool, session_id, "https://a.com/1")
+
+    asyncio.run(_run())
+    assert manager.log == [("cookies", "a.com")] and manager.contexts == 0
+
+
+def test_dead_pages_are_replaced():
+    pool, manager = _pool(size=1)
+
+    async def _run():
+        async with pool.lease() as first:
+            pass
+        manager.sessions[first][1].closed = True  # crashed while idle
+        async with pool.lease() as second:
+            return first, second
+
+    first, second = asyncio.run(_run())
+    assert first != second and first not in manager.sessions
+    assert pool.stats()["created"] == 1
+
+
+def test_hit_rate_and_lease_wait():
+    pool, _ = _pool(size=1)
+
+    async def _crawl(hold: float):
+        async with pool.lease():
+            await asyncio.sleep(hold)
+
+    async def _run():
+        await asyncio.gather(_crawl(0.05), _crawl(0))  # the second waits for the only page
+
+    asyncio.run(_run())
+    stats = pool.stats()
+    assert stats["leases"] == 2 and stats["misses"] == 1 and stats["hits"] == 1
+    assert stats["hit_rate"] == 0.5
+    assert stats["lease_wait_max_ms"] >= 40 and stats["lease_wait_avg_ms"] >= 20
+    assert stats["in_use"] == 0 and stats["idle"] == 1
+
+
+def test_runs_with_context_options_get_a_page_of_their_own():
+    pool, manager = _pool(size=2)
+
+    async def _run(config):
+        async with lease_page(pool, "https://a.com/", config) as leased:
+            return leased
+
+    pooled = asyncio.run(_run(CrawlerRunConfig()))
+    assert pooled.session_id.startswith("page_pool_")
+    for config in (CrawlerRunConfig(locale="de-DE"), CrawlerRunConfig(timezone_id="Europe/Berlin"),
+                   CrawlerRunConfig(user_agent="bot/1.0"),
+                   CrawlerRunConfig(proxy_config={"server": "http://proxy:8080"})):
+        leased = asyncio.run(_run(config))
+        assert leased is config and leased.session_id is None
+    assert pool.stats()["bypassed"] == 4 and pool.stats()["leases"] == 1
+    # the managed browser has one context for every page, the pool serves them all
+    managed, _ = _pool(size=1, managed=True)
+    assert managed.serves(CrawlerRunConfig(locale="de-DE"))
+
+
+def test_crawls_finding_every_page_leased_get_a_page_of_their_own():
+    pool, _ = _pool(size=1)
+
+    async def _run():
+        async with lease_page(pool, "https://a.com/1", CrawlerRunConfig()) as first:
+            async with lease_page(pool, "https://a.com/2", CrawlerRunConfig()) as second:
+                return first, second
+
+    first, second = asyncio.run(_run())
+    assert first.session_id.startswith("page_pool_") and second.session_id is None
+    assert pool.stats()["overflows"] == 1 and pool.stats()["leases"] == 1
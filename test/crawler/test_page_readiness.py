@@ -0,0 +1,91 @@
+import asyncio
+
+from component.crawl4ai import page_readiness
+from component.crawl4ai.page_readiness import (
+    DomainReadiness, prepare_readiness, wait_until_ready, ready_condition, MAX_MISSES, RETRY_EVERY
+)
+from component.crawl4ai.page_report import collect_page_report
+from configs.crawl4ai.types import CrawlRule
+
+
+class _FakePage:
+    def __init__(self, selector_delay: float | None):
+        self.selector_delay = selector_delay
+        self.listeners = {}
+
+    async def wait_for_selector(self, selector, state=None, timeout=None):
+        if self.selector_delay is None or self.selector_delay * 1000 > timeout:
+            await asyncio.sleep(timeout / 1000)
+            raise TimeoutError(selector)
+        await asyncio.sleep(self.selector_delay)
+
+    def on(self, event, listener):
+        self.listeners.setdefault(event, []).append(listener)
+
+    def remove_listener(self, event, listener):
+        self.listeners[event].remove(listener)
+
+    def emit(self, event, request):
+        for listener in list(self.listeners.get(event, [])):
+            listener(request)
+
+
+def test_default_condition_follows_css_selector():
+    assert ready_condition(CrawlRule(name="a", url="a.com")) == "none"
+    assert ready_condition(CrawlRule(name="a", url="a.com", css_selector="div#topics")) == "selector"
+    assert ready_condition(CrawlRule(name="a", url="a.com", css_selector="div", ready_condition="none")) == "none"
+
+
+def test_missing_selector_stops_costing_time(monkeypatch):
+    monkeypatch.setattr(page_readiness, "READINESS", page_readiness.OrderedDict())
+    rule = CrawlRule(name="a", url="a.com", css_selector="div.gone", ready_timeout_ms=50)
+
+    async def _run():
+        waits = []
+        for _ in range(MAX_MISSES + 2):
+            with collect_page_report() as report:
+                await wait_until_ready(_FakePage(selector_delay=None), "https://a.com/x", rule)
+            waits.append(report["readiness"])
+        return waits
+
+    waits = asyncio.run(_run())
+    assert all(w["timed_out"] for w in waits[:MAX_MISSES])
+    assert all(w.get("skipped") for w in waits[MAX_MISSES:])
+
+
+def test_timeout_adapts_to_observed_waits():
+    readiness = DomainReadiness()
+    for _ in range(5):
+        readiness.observe(100, timed_out=False)
+    assert readiness.budget_ms(3000) == 300
+    # a domain whose condition keeps failing is re-checked now and then
+    for _ in range(MAX_MISSES):
+        readiness.observe(300, timed_out=True)
+    assert readiness.budget_ms(3000) == 0
+    readiness.skipped = RETRY_EVERY
+    assert readiness.budget_ms(3000) > 0
+
+
+def test_network_idle_waits_for_quiet_window(monkeypatch):
+    monkeypatch.setattr(page_readiness, "READINESS", page_readiness.OrderedDict())
+    rule = CrawlRule(name="a", url="a.com", ready_condition="network_idle", ready_quiet_ms=100)
+    page = _FakePage(selector_delay=None)
+
+    async def _run():
+        prepare_readiness(page, rule)
+        page.emit("request", "r1")
+
+        async def finish_later():
+            await asyncio.sleep(0.1)
+            page.emit("requestfinished", "r1")
+
+        finisher = asyncio.create_task(finish_later())
+        with collect_page_report() as report:
+            await wait_until_ready(page, "https://a.com/", rule)
+        await finisher
+        return report["readiness"]
+
+    readiness = asyncio.run(_run())
+    assert not readiness["timed_out"]
+    assert readiness["waited_ms"] >= 190  # 100 ms in flight plus the 100 ms quiet window
+    assert not any(page.listeners.values())
@@ -0,0 +1,60 @@
+import asyncio
+from types import SimpleNamespace
+
+from component.crawl4ai.page_report import collect_page_report, report_section
+from component.crawl4ai.resource_policy import ResourceGuard
+from configs.crawl4ai.types import CrawlRule, CrawlResultType
+
+
+class _FakeRoute:
+    def __init__(self, url, resource_type):
+        self.request = SimpleNamespace(url=url, resource_type=resource_type)
+        self.outcome = None
+
+    async def abort(self, error_code=None):
+        self.outcome = "aborted"
+
+    async def fallback(self):
+        self.outcome = "continued"
+
+
+def test_text_rule_blocks_heavy_resources_and_trackers():
+    rule = CrawlRule(name="blog", url="blog.example.com", allow_domains=["cdn.example.com"])
+    guard = ResourceGuard.for_rule(rule, screenshot=False)
+
+    assert guard.should_block("https://blog.example.com/a.png", "image")
+    assert guard.should_block("https://www.google-analytics.com/analytics.js", "script")
+    assert not guard.should_block("https://blog.example.com/app.js", "script")
+    assert not guard.should_block("https://img.cdn.example.com/a.png", "image")
+    assert not guard.should_block("https://blog.example.com/post", "document")
+
+
+def test_screenshot_and_pdf_rules_keep_images():
+    rule = CrawlRule(name="blog", url="blog.example.com")
+    assert "image" not in ResourceGuard.for_rule(rule, screenshot=True).block_types
+    pdf_rule = CrawlRule(name="pdf", url="blog.example.com", crawl_result_type=CrawlResultType.PDF)
+    assert not ResourceGuard.for_rule(pdf_rule, screenshot=False).block_types
+    explicit = CrawlRule(name="raw", url="blog.example.com", block_resource_types=[], block_url_patterns=[])
+    assert not ResourceGuard.for_rule(explicit, screenshot=False).active
+
+
+def test_guard_counts_blocked_requests_in_the_page_report():
+    guard = ResourceGuard.for_rule(CrawlRule(name="blog", url="blog.example.com"), screenshot=False)
+    routes = [_FakeRoute("https://blog.example.com/a.png", "image"),
+              _FakeRoute("https://blog.example.com/b.woff2", "font"),
+              _FakeRoute("https://blog.example.com/app.js", "script")]
+
+    async def _run():
+        with collect_page_report() as report:
+            for route in routes:
+                await guard.handle(route)
+            report_section("resource_policy").update(
+                guard.report({"transferred": 100_000, "load_ms": 1000.0}))
+        return report
+
+    report = asyncio.run(_run())["resource_policy"]
+    assert [route.outcome for route in routes] == ["aborted", "aborted", "continued"]
+    assert report["blocked_by_type"] == {"image": 1, "font": 1}
+    assert report["allowed_requests"] == 1
+    assert report["estimated_saved_bytes"] > 0
+    assert report["estimated_saved_ms"] > 0
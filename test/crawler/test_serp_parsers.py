@@ -0,0 +1,117 @@
+import asyncio
+from types import SimpleNamespace
+
+from crawl4ai.models import CrawlResult
+
+from component.crawl4ai.crawler_pool import get_html_parser
+from configs.crawl4ai.types import CrawlRule, CrawlResultType
+from controllers.params import WebEngineCrawlJobPayload
+from service import crawl4ai_service
+from service.crawl4ai_service import Crawl4AIService
+
+DUCKDUCKGO = """<html><body><div id="react-layout"><ol>
+<li><article data-testid="result">
+  <h2><a data-testid="result-title-a" href="https://docs.python.org/3/"><span>Python docs</span></a></h2>
+  <div data-result="snippet"><span>The official <b>Python</b> documentation.</span></div>
+</article></li>
+<li><article data-testid="result">
+  <h2><a data-testid="result-title-a" href="https://pypi.org/"><span>PyPI</span></a></h2>
+</article></li>
+</ol></div></body></html>"""
+
+DUCKDUCKGO_HTML = """<html><body><div id="links">
+<div class="result result--ad"><a class="result__a" href="https://ads.example/">Ad</a></div>
+<div class="result"><h2><a class="result__a"
+  href="//duckduckgo.com/l/?uddg=https%3A%2F%2Fwww.python.org%2F&amp;rut=abc">Welcome to Python.org</a></h2>
+  <a class="result__snippet">The official home of the Python Programming Language</a></div>
+</div></body></html>"""
+
+BRAVE = """<html><body><main><div id="results">
+<div class="snippet" data-type="web"><a href="https://www.python.org/" class="heading-serpresult">
+  <div class="title">Welcome to Python.org</div></a>
+  <div class="snippet-description">The official home of Python.</div></div>
+<div class="snippet" data-type="videos"><a href="https://video.example/">A video</a></div>
+<div class="snippet" data-type="web"><a href="https://realpython.com/"><div class="title">Real Python</div></a></div>
+</div></main></body></html>"""
+
+BAIDU = """<html><body><div id="content_left">
+<div class="result c-container" mu="https://www.python.org/">
+  <h3 class="t"><a href="http://www.baidu.com/link?url=abc">Welcome to Python.org</a></h3>
+  <div class="c-abstract">The official home of Python.</div></div>
+<div class="result-op c-container">
+  <h3><a href="http://www.baidu.com/link?url=def">Python 教程</a></h3>
+  <span class="content-right_8Zs40">Python 是一种解释型语言。</span></div>
+<div class="ec_wise_ad"><h3><a href="https://ads.example/">Ad</a></h3></div>
+</div></body></html>"""
+
+
+def test_duckduckgo_results():
+    assert get_html_parser("duckduckgo").parse(DUCKDUCKGO) == [
+        {"title": "Python docs", "link": "https://docs.python.org/3/",
+         "snippet": "The official Python documentation."},
+        {"title": "PyPI", "link": "https://pypi.org/", "snippet": ""},
+    ]
+    # the html-only site, whose links go through a redirect
+    assert get_html_parser("duckduckgo").parse(DUCKDUCKGO_HTML) == [
+        {"title": "Welcome to Python.org", "link": "https://www.python.org/",
+         "snippet": "The official home of the Python Programming Language"},
+    ]
+
+
+def test_brave_web_results():
+    assert get_html_parser("brave").parse(BRAVE) == [
+        {"title": "Welcome to Python.org", "link": "https://www.python.org/",
+         "snippet": "The official home of Python."},
+        {"title": "Real Python", "link": "https://realpython.com/", "snippet": ""},
+    ]
+
+
+def test_baidu_results_link_the_page_not_the_redirect():
+    assert get_html_parser("baidu").parse(BAIDU) == [
+        {"title": "Welcome to Python.org", "link": "https://www.python.org/",
+         "snippet": "The official home of Python."},
+        {"title": "Python 教程", "link": "http://www.baidu.com/link?url=def", "snippet": "Python 是一种解释型语言。"},
+    ]
+
+
+def test_search_results_are_parsed_from_the_raw_html():
+    rule = CrawlRule(name="brave", url="search.brave.com", crawl_result_type=CrawlResultType.HTML)
+    result = CrawlResult(url="https://search.brave.com/search?q=python", html=BRAVE, success=True,
+                         cleaned_html="<div>Welcome to Python.org</div>")
+    processed = asyncio.run(Crawl4AIService.create_processed_result(rule, result, []))
+    assert processed["crawl_text"] == "<div>Welcome to Python.org</div>"
+    assert [item["link"] for item in processed["search_results"]] == ["https://www.python.org/",
+                                                                      "https://realpython.com/"]
+
+
+def test_top_results_are_crawled_in_parallel(monkeypatch):
+    rule = SimpleNamespace(name="brave", search_engine_url="https://search.brave.com/search?q={query}")
+    monkeypatch.setattr(crawl4ai_service, "get_rules_by_group", lambda group: SimpleNamespace(rules=[rule]))
+    monkeypatch.setattr(crawl4ai_service.config, "CRAWL_SEARCH_MAX_FETCH_TOP", 2)
+    items = [{"title": "A", "link": "https://a.com/", "snippet": "a"},
+             {"title": "A again", "link": "https://a.com/", "snippet": ""},
+             {"title": "B", "link": "https://b.com/", "snippet": "b"},
+             {"title": "C", "link": "https://c.com/", "snippet": "c"}]
+    running, peak = [], []
+
+    async def _crawl(urls, browser_config, crawler_config, *args, **kwargs):
+        if urls[0].startswith("https://search.brave.com/"):
+            return {"success": True, "results": [{"url": urls[0], "crawl_text": "serp", "crawl_type": "html",
+                                                  "search_results": items}]}
+        running.append(urls[0])
+        peak.append(len(running))
+        await asyncio.sleep(0)
+        running.remove(urls[0])
+        if urls[0] == "https://b.com/":
+            return {"success": False, "results": "timeout"}
+        return {"success": True, "results": [{"url": urls[0], "crawl_text": f"page {urls[0]}", "crawl_type": "html"}]}
+
+    monkeypatch.setattr(Crawl4AIService, "handle_crawl_request", _crawl)
+    payload = WebEngineCrawlJobPayload(web_content="python", search_engine_type="brave", fetch_top=5)
+    content = asyncio.run(Crawl4AIService.handle_web_search_job(payload))
+
+    assert max(peak) == 2  # a.com and b.com, the duplicate link and c.com beyond the limit are not crawled
+    assert [page["url"] for page in content["result_pages"]] == ["https://a.com/"]  # b.com failed
+    assert Crawl4AIService.search_result_texts(content) == [
+        "A\nhttps://a.com/\na", "A again\nhttps://a.com/\n", "B\nhttps://b.com/\nb", "C\nhttps://c.com/\nc",
+        "page https://a.com/"]
@@ -0,0 +1,157 @@
+import asyncio
+import itertools
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from component.crawl4ai import crawler_pool, worker_farm
+from configs.crawl4ai.types import CrawlMode, CrawlRule
+
+_pids = itertools.count(100)
+
+
+class _Process:
+    """A worker process that runs until it is killed or told to crash."""
+
+    def __init__(self):
+        self.pid = next(_pids)
+        self.alive = True
+        self.exitcode = None
+
+    def is_alive(self):
+        return self.alive
+
+    def kill(self):
+        self.alive = False
+        self.exitcode = -9
+
+
+class _Requests(list):
+
+    def put(self, message):
+        self.append(message)
+
+
+def _farm(monkeypatch, processes: int = 2):
+    """Workers without processes behind them; their requests are answered by the test."""
+
+    def _spawn(worker_id):
+        return worker_farm._Worker(worker_id=worker_id, process=_Process(), requests=_Requests())
+
+    monkeypatch.setattr(worker_farm, "_spawn", _spawn)
+    monkeypatch.setattr(worker_farm, "WORKERS", [_spawn(i) for i in range(processes)])
+    monkeypatch.setattr(worker_farm, "PENDING", {})
+    return worker_farm.WORKERS
+
+
+def _answer(worker, result):
+    (_, (request_id, _)), = [m for m in worker.requests if m[0] == worker_farm._MSG_CRAWL]
+    worker.requests.clear()
+    worker_farm._resolve(worker.worker_id, request_id, True, result)
+
+
+def test_requests_go_to_the_least_loaded_worker(monkeypatch):
+    workers = _farm(monkeypatch)
+
+    async def _run():
+        first = asyncio.create_task(worker_farm.submit(urls=["https://a.com/"], crawler_config={}))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(worker_farm.submit(urls=["https://b.com/"], crawler_config={}))
+        await asyncio.sleep(0)
+        assert [len(w.in_flight) for w in workers] == [1, 1]
+        _answer(workers[1], {"success": True, "results": ["b"]})
+        assert (await second)["results"] == ["b"]
+        third = asyncio.create_task(worker_farm.submit(urls=["https://c.com/"], crawler_config={}))
+        await asyncio.sleep(0)
+        assert [len(w.in_flight) for w in workers] == [1, 1]  # the idle worker took it
+        _answer(workers[0], {"success": True, "results": ["a"]})
+        _answer(workers[1], {"success": True, "results": ["c"]})
+        return await first, await third
+
+    first, third = asyncio.run(_run())
+    assert first["results"] == ["a"] and third["results"] == ["c"]
+    assert not worker_farm.PENDING and workers[1].completed == 2
+
+
+def test_requests_of_a_dead_worker_fail_and_the_worker_is_replaced(monkeypatch):
+    workers = _farm(monkeypatch, processes=1)
+    crashed = workers[0]
+
+    async def _run():
+        request = asyncio.create_task(worker_farm.submit(urls=["https://a.com/"], crawler_config={}))
+        await asyncio.sleep(0)
+        crashed.process.alive = False
+        worker_farm._check_workers()
+        with pytest.raises(HTTPException) as failed:
+            await request
+        return failed.value
+
+    failed = asyncio.run(_run())
+    assert failed.status_code == 503
+    assert workers[0] is not crashed and workers[0].restarts == 1 and workers[0].process.is_alive()
+    assert not worker_farm.PENDING and not crashed.in_flight
+
+
+def test_a_request_that_times_out_fails_alone(monkeypatch):
+    workers = _farm(monkeypatch, processes=1)
+    worker = workers[0]
+    monkeypatch.setattr(worker_farm.config, "CRAWLER_WORKER_TIMEOUT_MARGIN_SEC", 0.05)
+
+    async def _run():
+        healthy = asyncio.create_task(worker_farm.submit(urls=["https://b.com/"], crawler_config={}))
+        await asyncio.sleep(0)
+        # a page timeout of 100 ms for each of the two urls
+        slow = worker_farm.submit(urls=["https://a.com/1", "https://a.com/2"], crawler_config={"page_timeout": 100})
+        with pytest.raises(HTTPException) as failed:
+            await asyncio.wait_for(slow, timeout=5)
+        assert not healthy.done()
+        (_, (request_id, _)), _, cancel = worker.requests
+        assert cancel == (worker_farm._MSG_CANCEL, request_id + 1)  # the slow one is cancelled on the worker
+        worker_farm._resolve(worker.worker_id, request_id, True, {"success": True, "results": ["b"]})
+        return failed.value, await healthy
+
+    failed, healthy = asyncio.run(_run())
+    assert failed.status_code == 504 and healthy["results"] == ["b"]
+    assert workers[0] is worker and worker.process.is_alive() and worker.restarts == 0
+    assert not worker_farm.PENDING and not worker.in_flight
+
+
+def test_a_busy_worker_that_answers_no_ping_is_recycled(monkeypatch):
+    workers = _farm(monkeypatch, processes=2)
+    hung, idle = workers
+    monkeypatch.setattr(worker_farm.config, "CRAWLER_WORKER_UNRESPONSIVE_SEC", 60)
+
+    async def _run():
+        request = asyncio.create_task(worker_farm.submit(urls=["https://a.com/"], crawler_config={}))
+        await asyncio.sleep(0)
+        hung.last_seen = idle.last_seen = time.monotonic() - 120
+        worker_farm._resolve(idle.worker_id, None, True, None)  # a pong
+        worker_farm._check_workers()
+        with pytest.raises(HTTPException) as failed:
+            await request
+        return failed.value
+
+    failed = asyncio.run(_run())
+    assert failed.status_code == 503
+    assert workers[0] is not hung and not hung.process.is_alive() and workers[0].restarts == 1
+    assert workers[1] is idle and idle.completed == 0
+    assert all(worker.requests[-1] == (worker_farm._MSG_PING, None) for worker in workers)
+
+
+def test_request_timeout_follows_the_deadline_or_the_page_timeouts(monkeypatch):
+    monkeypatch.setattr(worker_farm.config, "CRAWLER_WORKER_TIMEOUT_MARGIN_SEC", 30)
+    assert worker_farm.request_timeout({"urls": ["a", "b"], "crawler_config": {"page_timeout": 20_000}}) == 70
+    assert worker_farm.request_timeout({"urls": ["a"], "crawler_config": {}}) == 90  # crawl4ai's 60 s default
+    assert worker_farm.request_timeout({"urls": ["a"], "crawler_config": {}, "deadline_sec": 5}) == 35
+
+
+def test_deep_and_adaptive_crawls_get_the_budget_of_their_page_limit(monkeypatch):
+    monkeypatch.setattr(worker_farm.config, "CRAWLER_WORKER_TIMEOUT_MARGIN_SEC", 30)
+    rules = {"https://deep.com/": CrawlRule(name="deep", url="deep.com", deep_crawl=True, deep_crawl_max_pages=5),
+             "https://adaptive.com/": CrawlRule(name="adaptive", url="adaptive.com", crawl_mode=CrawlMode.ADAPTIVE)}
+    monkeypatch.setattr(crawler_pool, "get_rule_by_url", rules.get)
+    request = {"crawler_config": {"page_timeout": 10_000}}
+    assert worker_farm.request_timeout({"urls": ["https://deep.com/"], **request}) == 80
+    assert worker_farm.request_timeout({"urls": ["https://adaptive.com/"], **request}) == 130
+    assert worker_farm.request_timeout({"urls": ["https://other.com/"], **request}) == 40
@@ -1,13 +1,18 @@
 import logging
 import time
 import uuid
-from collections.abc import Generator, Mapping
+from collections.abc import AsyncGenerator, Mapping
 from datetime import timedelta
 from typing import Any, Optional, Union
-from component.cache.redis_cache import redis_client
+from component.cache.redis_cache import async_redis_client
 
 logger = logging.getLogger(__name__)
 
+# adds the request unless the client already has its maximum of active requests
+_ENTER_LUA = """if redis.call('hlen', KEYS[1]) >= tonumber(ARGV[1]) then return 0 end
+redis.call('hset', KEYS[1], ARGV[2], ARGV[3])
+return 1"""
+
 
 class RateLimit:
     _MAX_ACTIVE_REQUESTS_KEY = "aduib_ai:rate_limit:{}:max_active_requests"
@@ -34,54 +39,59 @@ class RateLimit:
         self.client_id = client_id
         self.active_requests_key = self._ACTIVE_REQUESTS_KEY.format(client_id)
         self.max_active_requests_key = self._MAX_ACTIVE_REQUESTS_KEY.format(client_id)
-        self.last_recalculate_time = float("-inf")
-        self.flush_cache(use_local_value=True)
+        self.last_recalculate_time = float("-inf")  # the first enter flushes with the local value
 
-    def flush_cache(self, use_local_value=False):
+    async def flush_cache(self, use_local_value=False):
         if self.disabled():
             return
         self.last_recalculate_time = time.time()
-        # flush max active requests
-        if use_local_value or not redis_client.exists(self.max_active_requests_key):
-            redis_client.setex(self.max_active_requests_key, timedelta(days=1), self.max_active_requests)
-        else:
-            self.max_active_requests = int(redis_client.get(self.max_active_requests_key).decode("utf-8"))
-            redis_client.expire(self.max_active_requests_key, timedelta(days=1))
-
-        # flush max active requests (in-transit request list)
-        if not redis_client.exists(self.active_requests_key):
-            return
-        request_details = redis_client.hgetall(self.active_requests_key)
-        redis_client.expire(self.active_requests_key, timedelta(days=1))
-        timeout_requests = [
-            k
-            for k, v in request_details.items()
-            if time.time() - float(v.decode("utf-8")) > RateLimit._REQUEST_MAX_ALIVE_TIME
-        ]
-        if timeout_requests:
-            redis_client.hdel(self.active_requests_key, *timeout_requests)
-
-    def enter(self, request_id: Optional[str] = None) -> str:
+        async with async_redis_client.pipeline(transaction=False) as pipe:
+            pipe.get(self.max_active_requests_key)
+            pipe.hgetall(self.active_requests_key)
+            max_active_requests, request_details = await pipe.execute()
+
+        async with async_redis_client.pipeline(transaction=False) as pipe:
+            # flush max active requests
+            if use_local_value or max_active_requests is None:
+                pipe.setex(self.max_active_requests_key, timedelta(days=1), self.max_active_requests)
+            else:
+                self.max_active_requests = int(max_active_requests.decode("utf-8"))
+                pipe.expire(self.max_active_requests_key, timedelta(days=1))
+
+            # flush max active requests (in-transit request list)
+            if request_details:
+                pipe.expire(self.active_requests_key, timedelta(days=1))
+                timeout_requests = [
+                    k
+                    for k, v in request_details.items()
+                    if time.time() - float(v.decode("utf-8")) > RateLimit._REQUEST_MAX_ALIVE_TIME
+                ]
+                if timeout_requests:
+                    pipe.hdel(self.active_requests_key, *timeout_requests)
+            await pipe.execute()
+
+    async def enter(self, request_id: Optional[str] = None) -> str:
         if self.disabled():
             return RateLimit._UNLIMITED_REQUEST_ID
         if time.time() - self.last_recalculate_time > RateLimit._ACTIVE_REQUESTS_COUNT_FLUSH_INTERVAL:
-            self.flush_cache()
+            await self.flush_cache(use_local_value=self.last_recalculate_time == float("-inf"))
         if not request_id:
             request_id = RateLimit.gen_request_key()
 
-        active_requests_count = redis_client.hlen(self.active_requests_key)
-        if active_requests_count >= self.max_active_requests:
+        # counted and added in one round trip, concurrent requests cannot both take the last slot
+        entered = await async_redis_client.eval(_ENTER_LUA, 1, self.active_requests_key, self.max_active_requests,
+                                                request_id, str(time.time()))
+        if not entered:
             raise ValueError(
                 f"Too many requests. Please try again later. The current maximum concurrent requests allowed "
                 f"for {self.client_id} is {self.max_active_requests}."
             )
-        redis_client.hset(self.active_requests_key, request_id, str(time.time()))
         return request_id
 
-    def exit(self, request_id: str):
+    async def exit(self, request_id: str):
         if request_id == RateLimit._UNLIMITED_REQUEST_ID:
             return
-        redis_client.hdel(self.active_requests_key, request_id)
+        await async_redis_client.hdel(self.active_requests_key, request_id)
 
     def disabled(self):
         return self.max_active_requests <= 0
@@ -90,35 +100,35 @@ class RateLimit:
     def gen_request_key() -> str:
         return str(uuid.uuid4())
 
-    def generate(self, generator: Union[Generator[str, None, None], Mapping[str, Any]], request_id: str):
-        if isinstance(generator, Generator):
+    def generate(self, generator: Union[AsyncGenerator[str, None], Mapping[str, Any]], request_id: str):
+        if isinstance(generator, AsyncGenerator):
             return RateLimitGenerator(rate_limit=self, generator=generator, request_id=request_id)
         else:
             return generator
 
 
 class RateLimitGenerator:
-    def __init__(self, rate_limit: RateLimit, generator: Generator[str, None, None], request_id: str):
+    def __init__(self, rate_limit: RateLimit, generator: AsyncGenerator[str, None], request_id: str):
         self.rate_limit = rate_limit
         self.generator = generator
         self.request_id = request_id
         self.closed = False
 
-    def __iter__(self):
+    def __aiter__(self):
         return self
 
-    def __next__(self):
+    async def __anext__(self):
         if self.closed:
-            raise StopIteration
+            raise StopAsyncIteration
         try:
-            return next(self.generator)
+            return await anext(self.generator)
         except Exception:
-            self.close()
+            await self.aclose()
             raise
 
-    def close(self):
+    async def aclose(self):
         if not self.closed:
             self.closed = True
-            self.rate_limit.exit(self.request_id)
-            if self.generator is not None and hasattr(self.generator, "close"):
-                self.generator.close()
+            await self.rate_limit.exit(self.request_id)
+            if self.generator is not None and hasattr(self.generator, "aclose"):
+                await self.generator.aclose()